@@ -0,0 +1,36 @@
+"""add GiST indexes on geometry columns for bbox queries
+
+Revision ID: add_spatial_indexes
+Revises: create_bombs_table
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'add_spatial_indexes'
+down_revision: Union[str, None] = 'create_bombs_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Mismos nombres que usa GeoAlchemy2 (idx_<tabla>_<columna>), así no se duplican
+# si la tabla se creó con spatial_index=True
+SPATIAL_INDEXES = [
+    ('tanks', 'coordinates'),
+    ('bombs', 'coordinates'),
+    ('pipes', 'coordinates'),
+    ('connections', 'coordenates'),
+]
+
+
+def upgrade() -> None:
+    for table, column in SPATIAL_INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} USING GIST ({column})')
+
+
+def downgrade() -> None:
+    for table, column in SPATIAL_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS idx_{table}_{column}')
@@ -0,0 +1,53 @@
+"""trim data_upload indexes and add trigram index for taxpayer search
+
+Revision ID: data_upload_index_audit
+Revises: add_spatial_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'data_upload_index_audit'
+down_revision: Union[str, None] = 'add_spatial_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Índices que ninguna consulta usa; cada fila cargada tenía que actualizarlos todos.
+# Se conservan la llave primaria (identifier), ix_data_upload_date y ix_data_upload_cologne.
+# ix_data_upload_identifier duplica el índice de la llave primaria y ix_data_upload_taxpayer
+# (B-tree) no sirve para búsquedas '%texto%'; lo reemplaza el índice trigram.
+# La búsqueda del listado hace taxpayer ILIKE OR cologne ILIKE: cologne también
+# necesita índice trigram, si no el OR no puede usar un BitmapOr y lee toda la tabla.
+UNUSED_INDEXES = [
+    'siaf', 'municipality', 'department', 'institutional_classification',
+    'report', 'hour', 'seriereport', 'user', 'identifier', 'taxpayer',
+    'cat_service', 'cannon', 'excess', 'total', 'status',
+]
+
+
+def upgrade() -> None:
+    for column in UNUSED_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS ix_data_upload_{column}')
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_data_upload_taxpayer_trgm '
+        'ON data_upload USING gin (taxpayer gin_trgm_ops)'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_data_upload_cologne_trgm '
+        'ON data_upload USING gin (cologne gin_trgm_ops)'
+    )
+    op.execute('CREATE INDEX IF NOT EXISTS ix_data_upload_date ON data_upload (date)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_data_upload_cologne ON data_upload (cologne)')
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_data_upload_cologne_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_data_upload_taxpayer_trgm')
+    for column in UNUSED_INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_data_upload_{column} ON data_upload ("{column}")')
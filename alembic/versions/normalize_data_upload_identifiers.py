@@ -0,0 +1,51 @@
+"""normalize numeric data_upload identifiers stored as '12345.0'
+
+Revision ID: normalize_data_upload_identifiers
+Revises: trigram_search_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'normalize_data_upload_identifiers'
+down_revision: Union[str, None] = 'trigram_search_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# El procesador anterior convertía IDENTIFICA a texto según el tipo que pandas
+# infería para la columna: '12345.0' si la columna tenía vacíos y '12345' si no.
+# El procesador actual (cell_text) siempre produce '12345'; sin esta migración
+# la siguiente carga insertaría un duplicado en lugar de actualizar la fila.
+FLOAT_KEY = r"identifier ~ '^[0-9]+\.0$'"
+NORMALIZED_KEY = r"regexp_replace(identifier, '\.0$', '')"
+
+
+def upgrade() -> None:
+    # Si existen ambas formas se conserva la fila actualizada más recientemente
+    op.execute(
+        f"""
+        DELETE FROM data_upload AS normalized
+        USING data_upload AS legacy
+        WHERE legacy.{FLOAT_KEY}
+          AND normalized.identifier = regexp_replace(legacy.identifier, '\\.0$', '')
+          AND COALESCE(legacy.updated_at, legacy.created_at) > COALESCE(normalized.updated_at, normalized.created_at)
+        """
+    )
+    op.execute(
+        f"""
+        DELETE FROM data_upload AS legacy
+        USING data_upload AS normalized
+        WHERE legacy.{FLOAT_KEY}
+          AND normalized.identifier = regexp_replace(legacy.identifier, '\\.0$', '')
+        """
+    )
+    op.execute(f"UPDATE data_upload SET identifier = {NORMALIZED_KEY} WHERE {FLOAT_KEY}")
+
+
+def downgrade() -> None:
+    # No se puede saber qué filas tenían la forma '12345.0'; las llaves normalizadas se quedan
+    pass
@@ -0,0 +1,110 @@
+"""partition logs by month on created_at and add report indexes
+
+Revision ID: partition_logs_table
+Revises: data_upload_index_audit
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'partition_logs_table'
+down_revision: Union[str, None] = 'data_upload_index_audit'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Meses futuros que se dejan creados; luego los mantiene app/scripts/logs/logs_maintenance.py
+MONTHS_AHEAD = 3
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'logs')"
+    ).scalar()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if _is_partitioned(conn):
+        return
+
+    # La llave primaria de una tabla particionada debe incluir la columna de partición
+    op.execute("ALTER TABLE logs RENAME TO logs_legacy")
+    op.execute("ALTER SEQUENCE IF EXISTS logs_log_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE logs (
+            log_id integer NOT NULL DEFAULT nextval('logs_log_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id_user),
+            action varchar(50) NOT NULL,
+            entity varchar(50),
+            entity_id integer,
+            description varchar(255),
+            created_at timestamp NOT NULL DEFAULT now(),
+            CONSTRAINT logs_partitioned_pkey PRIMARY KEY (log_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE logs_log_id_seq OWNED BY logs.log_id")
+
+    # Una partición por mes desde el log más antiguo hasta MONTHS_AHEAD meses adelante
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', COALESCE((SELECT min(created_at) FROM logs_legacy), now()));
+            last_month date := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF logs FOR VALUES FROM (%L) TO (%L)',
+                    'logs_p' || to_char(month_start, 'YYYYMM'), month_start, month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT")
+
+    op.execute("""
+        INSERT INTO logs (log_id, user_id, action, entity, entity_id, description, created_at)
+        SELECT log_id, user_id, action, entity, entity_id, description, COALESCE(created_at, now())
+        FROM logs_legacy
+    """)
+    op.execute("DROP TABLE logs_legacy")
+
+    # Reportes: filtro por entidad + rango de fechas, y "actividad reciente" ordenada por fecha
+    op.execute("CREATE INDEX IF NOT EXISTS ix_logs_entity_created_at ON logs (entity, created_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_logs_created_at_desc ON logs (created_at DESC)")
+    op.execute("ANALYZE logs")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if not _is_partitioned(conn):
+        return
+
+    op.execute("ALTER TABLE logs RENAME TO logs_partitioned")
+    op.execute("ALTER SEQUENCE logs_log_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE logs (
+            log_id integer PRIMARY KEY DEFAULT nextval('logs_log_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id_user),
+            action varchar(50) NOT NULL,
+            entity varchar(50),
+            entity_id integer,
+            description varchar(255),
+            created_at timestamp
+        )
+    """)
+    op.execute("ALTER SEQUENCE logs_log_id_seq OWNED BY logs.log_id")
+    op.execute("""
+        INSERT INTO logs (log_id, user_id, action, entity, entity_id, description, created_at)
+        SELECT log_id, user_id, action, entity, entity_id, description, created_at
+        FROM logs_partitioned
+    """)
+    op.execute("DROP TABLE logs_partitioned CASCADE")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_logs_log_id ON logs (log_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_logs_entity_created_at ON logs (entity, created_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_logs_created_at_desc ON logs (created_at DESC)")
@@ -0,0 +1,44 @@
+"""add trigram indexes for text search on infrastructure entities
+
+Revision ID: trigram_search_indexes
+Revises: add_refresh_tokens
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'trigram_search_indexes'
+down_revision: Union[str, None] = 'add_refresh_tokens'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Columnas que filtran los listados con ILIKE '%texto%' y el endpoint /search.
+# data_upload.taxpayer ya tiene ix_data_upload_taxpayer_trgm (data_upload_index_audit).
+TRIGRAM_COLUMNS = {
+    'pipes': ['material', 'observations'],
+    'connections': ['material', 'connection_type', 'pressure_nominal', 'installed_by', 'description'],
+    'tanks': ['name', 'connections'],
+    'bombs': ['name', 'connections'],
+    'sectors': ['name', 'description'],
+    'interventions': ['description'],
+}
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.execute(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm '
+                f'ON {table} USING gin ({column} gin_trgm_ops)'
+            )
+
+
+def downgrade() -> None:
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}_trgm')
@@ -10,13 +10,19 @@ from app.routers import permsission_router,rol_router, user_router, report_route
 from app.routers import pipes_router, connection_router,  interventions_router
 from app.routers import data_upload_router
 from app.routers import map_router, sector_router, assignments_router
+from app.routers import admin_router, network_router, search_router
 from app.routers.dashboard.dashboard import router as dashboard_router
+from app.jobs.runner import shutdown_executor
+from app.utils.audit_writer import shutdown_audit_writer
+from app.scripts.logs.logs_maintenance import is_partitioned as is_logs_partitioned, ensure_partitions as ensure_logs_partitions
 
 #Aqui se importan los modelos necesarios para la inicialización de datos
 from app.models.type_employee.type_employees import TypeEmployee
 from app.models.permissions.permissions import Permissions
 from app.models.employee.employee import Employee
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash, shutdown_password_executor
+from app.utils.response import ORJSONResponse
+from app.controllers.auth.auth_controller import purge_expired_refresh_tokens
 from app.models.user.user import Username
 from app.models.rol.rol import Rol
 
@@ -180,9 +186,35 @@ async def lifespan(app: FastAPI):
         db.rollback()
     finally:
         db.close()
+
+    # Refresh tokens vencidos (la tabla solo guarda jti, familia y vencimiento)
+    db = SessionLocal()
+    try:
+        purge_expired_refresh_tokens(db)
+    except Exception as e:
+        db.rollback()
+        print(f"No se pudieron eliminar los refresh tokens vencidos: {e}")
+    finally:
+        db.close()
+
+    # Particiones mensuales de logs por adelantado (si la tabla ya está particionada);
+    # ensure_partitions toma un candado consultivo, los workers no compiten entre sí
+    try:
+        with engine.begin() as conn:
+            if is_logs_partitioned(conn):
+                ensure_logs_partitions(conn)
+    except Exception as e:
+        print(f"No se pudieron crear las particiones de logs: {e}")
     
     yield
 
+    # Detener el pool de procesos de reportes en segundo plano
+    shutdown_executor()
+    # Escribir los eventos de bitácora pendientes
+    shutdown_audit_writer()
+    # Detener el pool de bcrypt
+    shutdown_password_executor()
+
 app = FastAPI(
     lifespan=lifespan,
     title="API SIG Backend",
@@ -195,7 +227,8 @@ app = FastAPI(
         "como externos. Además, facilita la gestión eficiente de la información geoespacial, permitiendo operaciones "
         "de consulta, actualización y análisis de datos espaciales, así como la interoperabilidad con otras plataformas."
     ),
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 app.add_middleware(
     CORSMiddleware,
@@ -225,6 +258,9 @@ api_version.include_router(map_router)
 api_version.include_router(dashboard_router)
 api_version.include_router(sector_router)
 api_version.include_router(assignments_router)
+api_version.include_router(admin_router)
+api_version.include_router(network_router)
+api_version.include_router(search_router)
 #-----
 
 
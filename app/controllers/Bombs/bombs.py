@@ -8,63 +8,71 @@ from sqlalchemy import func, or_
 from app.utils.response import existence_response_dict
 from app.utils.logger import create_log
 from app.schemas.user.user import UserLogin
+from app.network.graph import sync_bomb
+from app.utils.tile_cache import entity_bounds, invalidate_entity_tiles
+from app.utils.geometry import point_lon_lat
+from app.utils.pagination import paginate
+from app.utils.fieldsets import parse_fields, project, rows_to_dicts
+from app.utils.spatial import BBox, apply_bbox, apply_point_thinning
 
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
+# Columnas del listado (?fields=)
+LIST_COLUMNS = {
+    "id_bombs": Bombs.id_bombs,
+    "name": Bombs.name,
+    "latitude": func.ST_Y(Bombs.coordinates),
+    "longitude": func.ST_X(Bombs.coordinates),
+    "connections": Bombs.connections,
+    "photography": Bombs.photography,
+    "sector_id": Bombs.sector_id,
+    "active": Bombs.active,
+    "created_at": Bombs.created_at,
+    "updated_at": Bombs.updated_at,
+}
+LIST_FIELDS = list(LIST_COLUMNS)
+
+
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, bbox: Optional[BBox] = None, zoom: Optional[int] = None, cursor: Optional[str] = None, total_mode: str = "exact", fields: Optional[str] = None):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
-
-    offset = (page - 1) * limit
     
-    # Construir query base con coordenadas
-    query = db.query(
-        Bombs,
-        func.ST_X(Bombs.coordinates).label('longitude'),
-        func.ST_Y(Bombs.coordinates).label('latitude')
-    )
+    # Solo las columnas pedidas van al SELECT
+    selected = parse_fields(fields, LIST_FIELDS, "id_bombs")
+    query = project(db, LIST_COLUMNS, selected)
     
     # Aplicar búsqueda si se proporciona
     if search and search.strip():
         search_term = f"%{search.strip().lower()}%"
         query = query.filter(
             or_(
-                func.lower(Bombs.name).like(search_term),
+                Bombs.name.ilike(search_term),
                 # El modelo Bombs no tiene un campo 'connections' por defecto, 
                 # asumo que lo tiene o usamos el que has pasado en el modelo Tank
-                func.lower(func.coalesce(Bombs.connections, '')).like(search_term) 
+                Bombs.connections.ilike(search_term) 
             )
         )
     
-    # Contar total antes de paginar
-    total = query.count()
-    
-    # Aplicar paginación
-    bombs = query.order_by(Bombs.id_bombs.desc()).offset(offset).limit(limit).all()
+    # Modo viewport: solo lo que intersecta el bbox, con raleo de puntos en zoom bajo
+    query = apply_bbox(query, Bombs.coordinates, bbox)
+    query = apply_point_thinning(query, Bombs.coordinates, Bombs.id_bombs, zoom)
+
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip()) or bbox is not None or zoom is not None
+    bombs, total, page_info = paginate(query, Bombs.id_bombs, page, limit, cursor, total_mode, filtered)
 
-    if not bombs and not search:
+    if not bombs and not search and bbox is None and not cursor:
         raise HTTPException(
             status_code=404,
             detail=existence_response_dict(False, "No hay bombas disponibles"),
             headers={"X-Error": "No hay bombas disponibles"}
         )
 
-    bomb_list = [
-        {
-            "id_bombs": t.id_bombs, 
-            "name": t.name,
-            "latitude": lat,
-            "longitude": lon,
-            "connections": t.connections,
-            "photography": list(t.photography or []),
-            "sector_id": t.sector_id,
-            "active": t.active,
-            "created_at": t.created_at,
-            "updated_at": t.updated_at
-        }
-        for t, lon, lat in bombs
-    ]
+    bomb_list = rows_to_dicts(bombs, LIST_COLUMNS, selected)
+    if "photography" in selected:
+        for row in bomb_list:
+            row["photography"] = list(row["photography"] or [])
 
-    return bomb_list, total
+    return bomb_list, total, page_info
 
 
 def get_by_id(db: Session, bomb_id: int):
@@ -121,11 +129,10 @@ def create(db: Session, bomb_data: BombsBase, current_user: UserLogin):
         db.add(new_bomb)
         db.commit()
         db.refresh(new_bomb)
+        sync_bomb(new_bomb)
+        invalidate_entity_tiles(db, Bombs, new_bomb.id_bombs)
 
-        longitude, latitude = db.query(
-            func.ST_X(new_bomb.coordinates),
-            func.ST_Y(new_bomb.coordinates)
-        ).first()
+        longitude, latitude = point_lon_lat(new_bomb.coordinates)
 
         bomb_dict = {
             "id_bombs": new_bomb.id_bombs,
@@ -167,6 +174,9 @@ def update(db: Session, bomb_id: int, bomb_data: BombsUpdate, current_user: User
             headers={"X-Error": "La bomba no existe"}
         )
 
+    # Rectángulo de la geometría anterior, para invalidar sus teselas si se mueve
+    previous_bounds = entity_bounds(db, Bombs, bomb_id)
+
     try:
         # Usamos model_dump() y exclude_unset=True para actualizar solo los campos enviados
         update_data = bomb_data.model_dump(exclude_unset=True)
@@ -183,11 +193,10 @@ def update(db: Session, bomb_id: int, bomb_data: BombsUpdate, current_user: User
 
         db.commit()
         db.refresh(bomb)
+        sync_bomb(bomb)
+        invalidate_entity_tiles(db, Bombs, bomb.id_bombs, previous_bounds)
 
-        longitude, latitude = db.query(
-            func.ST_X(bomb.coordinates),
-            func.ST_Y(bomb.coordinates)
-        ).first()
+        longitude, latitude = point_lon_lat(bomb.coordinates)
 
         bomb_dict = {
             "id_bombs": bomb.id_bombs,
@@ -234,6 +243,8 @@ def toggle_state(db: Session, bomb_id: int, current_user: UserLogin):
 
     db.commit()
     db.refresh(bomb)
+    sync_bomb(bomb)
+    invalidate_entity_tiles(db, Bombs, bomb.id_bombs)
     
     status = "inactivo" if bomb.active is False else "activo"
     
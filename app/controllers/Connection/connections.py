@@ -10,28 +10,65 @@ from app.utils.response import success_response, error_response, existence_respo
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.schemas.user.user import UserLogin
 from app.models.pipes.pipes import Pipes
+from app.models.pipes.pipe_connections import pipe_connections
 from app.utils.logger import create_log
+from app.network.graph import sync_connection
+from app.utils.tile_cache import entity_bounds, invalidate_entity_tiles
+from app.utils.geometry import point_lon_lat
+from app.utils.spatial import BBox, apply_bbox, apply_point_thinning
+from app.utils.pagination import paginate
+from app.utils.fieldsets import parse_fields, project, rows_to_dicts
 
-def get_all(db: Session, page: int = 1, limit: int = 10000, search: Optional[str] = None):
+# Columnas del listado (?fields=); pipes es un campo de relación
+LIST_COLUMNS = {
+    "id_connection": Connection.id_connection,
+    "latitude": func.ST_Y(Connection.coordenates),
+    "longitude": func.ST_X(Connection.coordenates),
+    "material": Connection.material,
+    "diameter_mn": Connection.diameter_mn,
+    "pressure_nominal": Connection.pressure_nominal,
+    "connection_type": Connection.connection_type,
+    "depth_m": Connection.depth_m,
+    "installed_date": Connection.installed_date,
+    "installed_by": Connection.installed_by,
+    "description": Connection.description,
+    "sector_id": Connection.sector_id,
+    "active": Connection.active,
+    "created_at": Connection.created_at,
+    "updated_at": Connection.updated_at,
+}
+LIST_FIELDS = [*LIST_COLUMNS, "pipes"]
+
+
+def _pipes_by_connection(db: Session, connection_ids: List[int]) -> dict:
+    # Tuberías de toda la página en una sola consulta, en vez de una por conexión
+    pipes = {connection_id: [] for connection_id in connection_ids}
+    rows = db.query(pipe_connections.c.connection_id, Pipes.id_pipes, Pipes.material, Pipes.diameter) \
+        .join(Pipes, Pipes.id_pipes == pipe_connections.c.pipe_id) \
+        .filter(pipe_connections.c.connection_id.in_(connection_ids)) \
+        .order_by(pipe_connections.c.connection_id, Pipes.id_pipes).all()
+    for connection_id, id_pipes, material, diameter in rows:
+        pipes[connection_id].append({"id_pipes": id_pipes, "material": material, "diameter": diameter})
+    return pipes
+
+
+def get_all(db: Session, page: int = 1, limit: int = 10000, search: Optional[str] = None, bbox: Optional[BBox] = None, zoom: Optional[int] = None, cursor: Optional[str] = None, total_mode: str = "exact", fields: Optional[str] = None):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
-
-    offset = (page - 1) * limit
     
-    query = db.query(
-        Connection,
-        func.ST_X(Connection.coordenates).label('longitude'),
-        func.ST_Y(Connection.coordenates).label('latitude')
-    )
+    # Solo las columnas pedidas van al SELECT
+    selected = parse_fields(fields, LIST_FIELDS, "id_connection")
+    query = project(db, LIST_COLUMNS, selected)
     
     if search and search.strip():
+        # ILIKE directo sobre la columna para que lo atiendan los índices trigram
         search_term = f"%{search.strip().lower()}%"
         search_filters = [
-            func.lower(func.coalesce(Connection.material, '')).like(search_term),
-            func.lower(func.coalesce(Connection.connection_type, '')).like(search_term),
-            func.lower(func.coalesce(Connection.pressure_nominal, '')).like(search_term),
-            func.lower(func.coalesce(Connection.installed_by, '')).like(search_term),
-            func.lower(func.coalesce(Connection.description, '')).like(search_term)
+            Connection.material.ilike(search_term),
+            Connection.connection_type.ilike(search_term),
+            Connection.pressure_nominal.ilike(search_term),
+            Connection.installed_by.ilike(search_term),
+            Connection.description.ilike(search_term)
         ]
         
         try:
@@ -42,63 +79,24 @@ def get_all(db: Session, page: int = 1, limit: int = 10000, search: Optional[str
         
         query = query.filter(or_(*search_filters))
 
-    count_query = db.query(Connection)
-    if search and search.strip():
-        search_term = f"%{search.strip().lower()}%"
-        search_filters = [
-            func.lower(func.coalesce(Connection.material, '')).like(search_term),
-            func.lower(func.coalesce(Connection.connection_type, '')).like(search_term),
-            func.lower(func.coalesce(Connection.pressure_nominal, '')).like(search_term),
-            func.lower(func.coalesce(Connection.installed_by, '')).like(search_term),
-            func.lower(func.coalesce(Connection.description, '')).like(search_term)
-        ]
-        
-        try:
-            search_id = int(search.strip())
-            search_filters.append(Connection.id_connection == search_id)
-        except ValueError:
-            pass
-        
-        count_query = count_query.filter(or_(*search_filters))
-    
-    total = count_query.count()
-    
-    connections = query.order_by(Connection.id_connection.desc()).offset(offset).limit(limit).all()
+    # Modo viewport: solo lo que intersecta el bbox, con raleo de puntos en zoom bajo
+    query = apply_bbox(query, Connection.coordenates, bbox)
+    query = apply_point_thinning(query, Connection.coordenates, Connection.id_connection, zoom)
+
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip()) or bbox is not None or zoom is not None
+    connections, total, page_info = paginate(query, Connection.id_connection, page, limit, cursor, total_mode, filtered)
 
     # No lanzar error si no hay conexiones - simplemente devolver lista vacía
     # Esto es válido cuando no hay datos en la BD o cuando los filtros no coinciden
 
-    connection_response = []
-
-    for conn, longitude, latitude in connections:
-        conn_data = {
-            "id_connection": conn.id_connection,
-            "latitude": latitude,
-            "longitude": longitude,
-            "material": conn.material,
-            "diameter_mn": conn.diameter_mn,
-            "pressure_nominal": conn.pressure_nominal,
-            "connection_type": conn.connection_type,
-            "depth_m": conn.depth_m,
-            "installed_date": conn.installed_date,
-            "installed_by": conn.installed_by,
-            "description": conn.description,
-            "sector_id": conn.sector_id,
-            "active": conn.active,
-            "created_at": conn.created_at,
-            "updated_at": conn.updated_at,
-            "pipes": [
-                {
-                    "id_pipes": pipe.id_pipes,
-                    "material": pipe.material,
-                    "diameter": pipe.diameter
-                }
-                for pipe in conn.pipes
-            ],
-        }
-        connection_response.append(conn_data)
+    connection_response = rows_to_dicts(connections, LIST_COLUMNS, selected)
+    if "pipes" in selected and connection_response:
+        pipes = _pipes_by_connection(db, [row["id_connection"] for row in connection_response])
+        for row in connection_response:
+            row["pipes"] = pipes[row["id_connection"]]
     
-    return connection_response, total
+    return connection_response, total, page_info
 
 
 def get_by_id(db: Session, id_connection: int):
@@ -166,6 +164,8 @@ def create(db: Session, data: ConnectionBase,current_user: UserLogin):
         db.add(new_connection)
         db.commit()
         db.refresh(new_connection)
+        sync_connection(new_connection)
+        invalidate_entity_tiles(db, Connection, new_connection.id_connection)
         create_log(
             db,
             user_id=current_user.id_user,
@@ -204,6 +204,9 @@ def update(db: Session, id_connection: int, data, current_user: UserLogin):
     if not connection:
         raise HTTPException(status_code=404, detail="La conexión no existe")
 
+    # Rectángulo de la geometría anterior, para invalidar sus teselas si se mueve
+    previous_bounds = entity_bounds(db, Connection, id_connection)
+
     try:
         if data.latitude is not None and data.longitude is not None:
             connection.coordenates = f'SRID=4326;POINT({data.longitude} {data.latitude})'
@@ -223,6 +226,9 @@ def update(db: Session, id_connection: int, data, current_user: UserLogin):
         connection.updated_at = datetime.now()
         db.commit()
         db.refresh(connection)
+        sync_connection(connection)
+        invalidate_entity_tiles(db, Connection, connection.id_connection, previous_bounds)
+        longitude, latitude = point_lon_lat(connection.coordenates)
 
         create_log(
             db,
@@ -233,9 +239,6 @@ def update(db: Session, id_connection: int, data, current_user: UserLogin):
             description=f"El usuario {current_user.user} actualizó la conexión {connection.id_connection}"
         )
 
-        longitude = db.scalar(func.ST_X(connection.coordenates))
-        latitude = db.scalar(func.ST_Y(connection.coordenates))
-
         response = {
             "id_connection": connection.id_connection,
             "latitude": latitude,
@@ -275,6 +278,8 @@ def toggle_state(db: Session, id_connection: int,current_user: UserLogin):
     connection.updated_at = datetime.now()
     db.commit()
     db.refresh(connection)
+    sync_connection(connection)
+    invalidate_entity_tiles(db, Connection, connection.id_connection)
     
     status = ""
     if connection.active is False:
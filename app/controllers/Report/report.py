@@ -1,6 +1,7 @@
 from app.models.log.logs import Logs
 from app.models.sector.sector import Sector
 from app.models.pipes.pipes import Pipes
+from app.models.pipes.pipe_connections import pipe_connections
 from app.models.connection.connections import Connection
 from app.models.intervention_entities.intervention_entities import Intervention_entities
 from app.models.assignments.assignments import Assignment
@@ -8,11 +9,130 @@ from app.models.interventions.interventions import Interventions
 from app.models.tanks.tanks import Tank
 from app.models.employee.employee import Employee
 from app.models.type_employee.type_employees import TypeEmployee
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, select, and_
 from app.exports.excel_exporter import ExcelExporter
+from app.models.user.user import Username
+from app.utils.geometry import to_wkt
+import tempfile
+import os
+
+# Filas de logs que se traen por lote al exportar a Excel
+EXCEL_EXPORT_BATCH_SIZE = int(os.getenv("EXCEL_EXPORT_BATCH_SIZE", "2000"))
+
+
+# ----- Consultas compartidas por los reportes -----
+# Cada reporte usa un número fijo de sentencias: los conteos se agrupan en
+# subconsultas y se unen con LEFT JOIN en lugar de consultar fila por fila.
+
+def _count_by(column):
+    """Subconsulta (entity_id, total) con el número de filas agrupadas por `column`"""
+    return (
+        select(column.label("entity_id"), func.count().label("total"))
+        .where(column.isnot(None))
+        .group_by(column)
+        .subquery()
+    )
+
+
+def _interventions_with_assignment(db: Session, entity_filter, start_date: datetime, finish_date: datetime):
+    """Intervenciones de una entidad con su primera asignación y el empleado asignado"""
+    first_assignment = (
+        select(
+            Assignment.intervention_id,
+            Assignment.employee_id,
+            Assignment.status,
+            Assignment.notes,
+            func.row_number().over(
+                partition_by=Assignment.intervention_id,
+                order_by=Assignment.id_assignment
+            ).label("rank")
+        )
+        .subquery()
+    )
+
+    rows = (
+        db.query(
+            Interventions,
+            first_assignment.c.status,
+            first_assignment.c.notes,
+            Employee.first_name,
+            Employee.last_name
+        )
+        .join(Intervention_entities, Intervention_entities.d_interventions == Interventions.id_interventions)
+        .outerjoin(first_assignment, and_(
+            first_assignment.c.intervention_id == Interventions.id_interventions,
+            first_assignment.c.rank == 1
+        ))
+        .outerjoin(Employee, Employee.id_employee == first_assignment.c.employee_id)
+        .filter(
+            entity_filter,
+            Interventions.created_at >= start_date,
+            Interventions.created_at <= finish_date
+        )
+        .all()
+    )
+
+    return [
+        {
+            "id_intervention": intervention.id_interventions,
+            "description": intervention.description,
+            "status": intervention.status,
+            "start_date": intervention.start_date,
+            "end_date": intervention.end_date,
+            "photography": intervention.photography,
+            "assigned_to": f"{first_name} {last_name}" if first_name is not None else None,
+            "assignment_status": assignment_status,
+            "assignment_notes": assignment_notes
+        }
+        for intervention, assignment_status, assignment_notes, first_name, last_name in rows
+    ]
+
+
+def _assignment_status_totals(db: Session, employee_id: int, start_date: datetime, finish_date: datetime):
+    """Totales de asignaciones de un empleado por estado en una sola consulta"""
+    total, assigned, in_progress, completed = (
+        db.query(
+            func.count(Assignment.id_assignment),
+            func.count(Assignment.id_assignment).filter(Assignment.status == "ASIGNADO"),
+            func.count(Assignment.id_assignment).filter(Assignment.status == "EN PROCESO"),
+            func.count(Assignment.id_assignment).filter(Assignment.status == "COMPLETADO")
+        )
+        .filter(
+            Assignment.employee_id == employee_id,
+            Assignment.assigned_at >= start_date,
+            Assignment.assigned_at <= finish_date
+        )
+        .one()
+    )
+    return {
+        "total_trabajos": total,
+        "asignado": assigned,
+        "en_proceso": in_progress,
+        "completado": completed,
+    }
+
+
+def _employee_activity(db: Session, type_name: str, start_date: datetime, finish_date: datetime, order_by_activity: bool = True):
+    """Empleados de un tipo con su número de asignaciones en el rango (incluye los que tienen 0)"""
+    total = func.count(Assignment.id_assignment).label("total")
+    query = (
+        db.query(Employee.id_employee, Employee.first_name, Employee.last_name, total)
+        .join(TypeEmployee, TypeEmployee.id_type_employee == Employee.id_type_employee)
+        .outerjoin(Assignment, and_(
+            Assignment.employee_id == Employee.id_employee,
+            Assignment.assigned_at >= start_date,
+            Assignment.assigned_at <= finish_date
+        ))
+        .filter(TypeEmployee.name == type_name)
+        .group_by(Employee.id_employee, Employee.first_name, Employee.last_name)
+    )
+    if order_by_activity:
+        query = query.order_by(total.desc(), Employee.id_employee)
+    return query.all()
 
 
 #Priemros 3 reportes
@@ -92,10 +212,25 @@ def get_logs_detail_controller(db: Session, date_start: str, date_finish: str, n
         )
 
 
-def get_available_entities_controller(db: Session):
+# Las entidades de la bitácora casi no cambian; el DISTINCT recorre toda la tabla logs
+_entities_cache = {
+    "data": None,
+    "timestamp": None,
+    "ttl": int(os.getenv("LOG_ENTITIES_CACHE_TTL", "300"))
+}
+
+
+async def get_available_entities_controller(db: AsyncSession):
+    now = datetime.utcnow()
+    if _entities_cache["data"] is not None and _entities_cache["timestamp"] is not None:
+        if (now - _entities_cache["timestamp"]).total_seconds() < _entities_cache["ttl"]:
+            return _entities_cache["data"]
     try:
-        entities = db.query(Logs.entity).distinct().filter(Logs.entity.isnot(None)).all()
-        return [entity[0] for entity in entities]
+        result = await db.execute(select(Logs.entity).distinct().where(Logs.entity.isnot(None)))
+        entities = [entity[0] for entity in result.all()]
+        _entities_cache["data"] = entities
+        _entities_cache["timestamp"] = now
+        return entities
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -107,6 +242,9 @@ def export_logs_to_excel_controller(db: Session, date_start: str, date_finish: s
     """
     Exporta logs a Excel con formato profesional
     
+    Los logs se leen por lotes (yield_per) y se escriben en modo write-only
+    a un archivo temporal, así la memoria no crece con el número de filas.
+    
     Args:
         db: Sesión de base de datos
         date_start: Fecha de inicio (formato ISO)
@@ -115,7 +253,7 @@ def export_logs_to_excel_controller(db: Session, date_start: str, date_finish: s
         user_info: Información del usuario (opcional)
     
     Returns:
-        BytesIO: Buffer con el archivo Excel generado
+        str: Ruta del archivo .xlsx temporal (quien lo consume debe eliminarlo)
     """
     try:
         start_date = datetime.fromisoformat(date_start.replace('Z', '+00:00'))
@@ -127,19 +265,36 @@ def export_logs_to_excel_controller(db: Session, date_start: str, date_finish: s
                 detail="La fecha de inicio debe ser anterior a la fecha final"
             )
 
-        # Consultar logs con los mismos filtros que get_logs_detail_controller
-        logs = db.query(Logs).filter(
+        # Mismos filtros que get_logs_detail_controller
+        filters_clause = and_(
             Logs.entity == name_entity,
             Logs.created_at >= start_date,
             Logs.created_at <= finish_date
-        ).order_by(Logs.created_at.desc()).all()
+        )
 
-        if not logs:
+        if db.query(Logs.log_id).filter(filters_clause).first() is None:
             raise HTTPException(
                 status_code=404,
                 detail="No se encontraron registros para exportar"
             )
 
+        # Solo las columnas del reporte, con el nombre de usuario en la misma consulta
+        logs = (
+            db.query(
+                Logs.log_id,
+                Logs.created_at,
+                Username.user.label("username"),
+                Logs.action,
+                Logs.entity,
+                Logs.entity_id,
+                Logs.description
+            )
+            .outerjoin(Username, Username.id_user == Logs.user_id)
+            .filter(filters_clause)
+            .order_by(Logs.created_at.desc())
+            .execution_options(yield_per=EXCEL_EXPORT_BATCH_SIZE)
+        )
+
         # Preparar filtros para el exportador
         filters = {
             'date_start': date_start,
@@ -148,14 +303,20 @@ def export_logs_to_excel_controller(db: Session, date_start: str, date_finish: s
         }
 
         # Generar Excel usando el exportador
-        exporter = ExcelExporter()
-        excel_buffer = exporter.export_logs(
-            logs=logs,
-            filters=filters,
-            user_info=user_info
-        )
-
-        return excel_buffer
+        fd, path = tempfile.mkstemp(prefix="logs_", suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as output:
+                ExcelExporter().export_logs_streaming(
+                    logs,
+                    output,
+                    filters=filters,
+                    user_info=user_info
+                )
+        except Exception:
+            os.remove(path)
+            raise
+
+        return path
 
     except ValueError as e:
         raise HTTPException(
@@ -179,28 +340,29 @@ def report_pipes_by_sector(db: Session, id_sector: int):
     if not sector:
         raise HTTPException(404, "Sector no encontrado")
 
+    # Conteos agrupados una sola vez y unidos a las tuberías del sector
+    connections_count = (
+        select(pipe_connections.c.pipe_id, func.count().label("total"))
+        .group_by(pipe_connections.c.pipe_id)
+        .subquery()
+    )
+    interventions_count = _count_by(Intervention_entities.id_pipes)
+
     pipes = (
-        db.query(Pipes)
+        db.query(
+            Pipes.id_pipes, Pipes.material, Pipes.diameter, Pipes.size, Pipes.installation_date,
+            Pipes.distance, Pipes.observations, Pipes.active,
+            func.coalesce(connections_count.c.total, 0).label("total_connections"),
+            func.coalesce(interventions_count.c.total, 0).label("total_interventions")
+        )
+        .outerjoin(connections_count, connections_count.c.pipe_id == Pipes.id_pipes)
+        .outerjoin(interventions_count, interventions_count.c.entity_id == Pipes.id_pipes)
         .filter(Pipes.sector_id == id_sector)
         .all()
     )
 
-    result = []
-
-    for pipe in pipes:
-
-        # total de conexiones asociadas
-        total_connections = db.query(Connection)\
-            .join(Connection.pipes)\
-            .filter(Pipes.id_pipes == pipe.id_pipes)\
-            .count()
-
-        # total de intervenciones en esta tubería
-        total_interventions = db.query(Intervention_entities)\
-            .filter(Intervention_entities.id_pipes == pipe.id_pipes)\
-            .count()
-
-        result.append({
+    result = [
+        {
             "id_pipes": pipe.id_pipes,
             "material": pipe.material,
             "diameter": float(pipe.diameter),
@@ -209,9 +371,11 @@ def report_pipes_by_sector(db: Session, id_sector: int):
             "distance": float(pipe.distance) if pipe.distance else None,
             "observations": pipe.observations,
             "active": pipe.active,
-            "total_connections": total_connections,
-            "total_interventions": total_interventions
-        })
+            "total_connections": pipe.total_connections,
+            "total_interventions": pipe.total_interventions
+        }
+        for pipe in pipes
+    ]
 
     return {
         "sector": {
@@ -241,43 +405,10 @@ def report_interventions_by_pipes(db: Session, id_pipes: int, date_start: str, d
     if not pipe:
         raise HTTPException(404, "Tubería no encontrada")
 
-    # Obtener entidades relacionadas a esa tubería
-    entities = (
-        db.query(Intervention_entities)
-        .join(Interventions, Interventions.id_interventions == Intervention_entities.d_interventions)
-        .filter(Intervention_entities.id_pipes == id_pipes)
-        .filter(Interventions.created_at >= start_date)
-        .filter(Interventions.created_at <= finish_date)
-        .all()
+    interventions_list = _interventions_with_assignment(
+        db, Intervention_entities.id_pipes == id_pipes, start_date, finish_date
     )
 
-    interventions_list = []
-
-    for entity in entities:
-        intervention = entity.intervention
-
-        # obtener asignación + empleado
-        assignment = (
-            db.query(Assignment)
-            .filter(Assignment.intervention_id == intervention.id_interventions)
-            .first()
-        )
-
-        employee = assignment.employee if assignment else None
-
-        interventions_list.append({
-            "id_intervention": intervention.id_interventions,
-            "description": intervention.description,
-            "status": intervention.status,
-            "start_date": intervention.start_date,
-            "end_date": intervention.end_date,
-            "photography": intervention.photography,
-
-            "assigned_to": f"{employee.first_name} {employee.last_name}" if employee else None,
-            "assignment_status": assignment.status if assignment else None,
-            "assignment_notes": assignment.notes if assignment else None
-        })
-
     return {
         "pipe": {
             "id_pipes": pipe.id_pipes,
@@ -309,41 +440,10 @@ def report_interventions_by_connections(db: Session, id_connection: int, date_st
     if not connection:
         raise HTTPException(404, "Conexión no encontrada")
 
-    # Obtener entidades relacionadas a esa conexión con filtro por fecha
-    entities = (
-        db.query(Intervention_entities)
-        .join(Interventions, Interventions.id_interventions == Intervention_entities.d_interventions)
-        .filter(Intervention_entities.id_connection == id_connection)
-        .filter(Interventions.created_at >= start_date)
-        .filter(Interventions.created_at <= finish_date)
-        .all()
+    interventions_list = _interventions_with_assignment(
+        db, Intervention_entities.id_connection == id_connection, start_date, finish_date
     )
 
-    interventions_list = []
-
-    for entity in entities:
-        intervention = entity.intervention
-
-        assignment = (
-            db.query(Assignment)
-            .filter(Assignment.intervention_id == intervention.id_interventions)
-            .first()
-        )
-
-        employee = assignment.employee if assignment else None
-
-        interventions_list.append({
-            "id_intervention": intervention.id_interventions,
-            "description": intervention.description,
-            "status": intervention.status,
-            "start_date": intervention.start_date,
-            "end_date": intervention.end_date,
-            "photography": intervention.photography,
-            "assigned_to": f"{employee.first_name} {employee.last_name}" if employee else None,
-            "assignment_status": assignment.status if assignment else None,
-            "assignment_notes": assignment.notes if assignment else None
-        })
-
     return {
         "connection": {
             "id_connection": connection.id_connection,
@@ -358,38 +458,52 @@ def report_interventions_by_connections(db: Session, id_connection: int, date_st
 #Reporte 5: Reporte comparativo de sectores
 def report_sector_comparative(db: Session):
 
-    sectors = db.query(Sector).all()
-    if not sectors:
-        raise HTTPException(404, "No hay sectores registrados")
-
-    report = []
+    pipes_count = _count_by(Pipes.sector_id)
+    connections_count = _count_by(Connection.sector_id)
 
-    for sector in sectors:
-        
-        pipes = db.query(Pipes).filter(Pipes.sector_id == sector.id_sector).all()
-        connections = db.query(Connection).filter(Connection.sector_id == sector.id_sector).all()
-
-        # Intervenciones en tuberías del sector
-        pipes_ids = [p.id_pipes for p in pipes]
-        connections_ids = [c.id_connection for c in connections]
-
-        interventions_pipes = db.query(Intervention_entities)\
-            .filter(Intervention_entities.id_pipes.in_(pipes_ids))\
-            .count()
+    interventions_pipes_count = (
+        select(Pipes.sector_id.label("entity_id"), func.count().label("total"))
+        .join(Intervention_entities, Intervention_entities.id_pipes == Pipes.id_pipes)
+        .group_by(Pipes.sector_id)
+        .subquery()
+    )
+    interventions_connections_count = (
+        select(Connection.sector_id.label("entity_id"), func.count().label("total"))
+        .join(Intervention_entities, Intervention_entities.id_connection == Connection.id_connection)
+        .group_by(Connection.sector_id)
+        .subquery()
+    )
 
-        interventions_connections = db.query(Intervention_entities)\
-            .filter(Intervention_entities.id_connection.in_(connections_ids))\
-            .count()
+    sectors = (
+        db.query(
+            Sector.id_sector,
+            Sector.name,
+            func.coalesce(pipes_count.c.total, 0).label("total_pipes"),
+            func.coalesce(connections_count.c.total, 0).label("total_connections"),
+            func.coalesce(interventions_pipes_count.c.total, 0).label("interventions_pipes"),
+            func.coalesce(interventions_connections_count.c.total, 0).label("interventions_connections")
+        )
+        .outerjoin(pipes_count, pipes_count.c.entity_id == Sector.id_sector)
+        .outerjoin(connections_count, connections_count.c.entity_id == Sector.id_sector)
+        .outerjoin(interventions_pipes_count, interventions_pipes_count.c.entity_id == Sector.id_sector)
+        .outerjoin(interventions_connections_count, interventions_connections_count.c.entity_id == Sector.id_sector)
+        .all()
+    )
+    if not sectors:
+        raise HTTPException(404, "No hay sectores registrados")
 
-        report.append({
+    report = [
+        {
             "sector_id": sector.id_sector,
             "sector_name": sector.name,
-            "total_pipes": len(pipes),
-            "total_connections": len(connections),
-            "interventions_pipes": interventions_pipes,
-            "interventions_connections": interventions_connections,
-            "interventions_total": interventions_pipes + interventions_connections
-        })
+            "total_pipes": sector.total_pipes,
+            "total_connections": sector.total_connections,
+            "interventions_pipes": sector.interventions_pipes,
+            "interventions_connections": sector.interventions_connections,
+            "interventions_total": sector.interventions_pipes + sector.interventions_connections
+        }
+        for sector in sectors
+    ]
 
     return {
         "total_sectors": len(report),
@@ -547,7 +661,7 @@ def report_tanks(db: Session):
             result.append({
                 "id_tank": tank.id_tank,
                 "name": tank.name,
-                "coordinates": db.scalar(func.ST_AsText(tank.coordinates)) if tank.coordinates else None,
+                "coordinates": to_wkt(tank.coordinates),
                 "photos": tank.photography,
                 "created_at": tank.created_at
             })
@@ -563,38 +677,47 @@ def report_tanks(db: Session):
 #Reporte 11: Reporte de estado por tanque
 def report_tank_status(db: Session):
     try:
-        tanks = db.query(Tank).all()
-        result = []
+        interventions_count = _count_by(Intervention_entities.id_tank)
 
-        for tank in tanks:
-            # Total de intervenciones asociadas
-            total_interventions = (
-                db.query(Intervention_entities)
-                .filter(Intervention_entities.id_tank == tank.id_tank)
-                .count()
+        # Última intervención de cada tanque con row_number() por tanque
+        ranked = (
+            select(
+                Intervention_entities.id_tank.label("tank_id"),
+                Interventions.description,
+                func.row_number().over(
+                    partition_by=Intervention_entities.id_tank,
+                    order_by=Interventions.created_at.desc()
+                ).label("rank")
             )
+            .join(Interventions, Interventions.id_interventions == Intervention_entities.d_interventions)
+            .where(Intervention_entities.id_tank.isnot(None))
+            .subquery()
+        )
 
-            # Última intervención
-            last_intervention = (
-                db.query(Intervention_entities)
-                .filter(Intervention_entities.id_tank == tank.id_tank)
-                .join(Interventions, Interventions.id_interventions == Intervention_entities.d_interventions)
-                .order_by(Interventions.created_at.desc())
-                .first()
+        tanks = (
+            db.query(
+                Tank,
+                func.coalesce(interventions_count.c.total, 0).label("total_interventions"),
+                ranked.c.description
             )
+            .outerjoin(interventions_count, interventions_count.c.entity_id == Tank.id_tank)
+            .outerjoin(ranked, and_(ranked.c.tank_id == Tank.id_tank, ranked.c.rank == 1))
+            .all()
+        )
 
-            result.append({
+        return [
+            {
                 "id_tank": tank.id_tank,
                 "name": tank.name,
                 "state": "ACTIVO" if tank.active else "INACTIVO",
-                "coordinates": db.scalar(func.ST_AsText(tank.coordinates)) if tank.coordinates else None,
+                "coordinates": to_wkt(tank.coordinates),
                 "photos": tank.photography,
                 "created_at": tank.created_at,
                 "total_interventions": total_interventions,
-                "last_intervention": last_intervention.intervention.description if last_intervention else None
-            })
-
-        return result
+                "last_intervention": last_description
+            }
+            for tank, total_interventions, last_description in tanks
+        ]
 
     except Exception as e:
         raise HTTPException(500, f"Error al generar reporte de estado de tanques: {str(e)}")
@@ -602,28 +725,32 @@ def report_tank_status(db: Session):
 #Reporte 12: Reporte de desvios
 def report_deviations(db: Session):
     try:
-        connections = db.query(Connection).all()
-        result = []
+        interventions_count = _count_by(Intervention_entities.id_connection)
 
-        for conn in connections:
-            total_interventions = (
-                db.query(Intervention_entities)
-                .filter(Intervention_entities.id_connection == conn.id_connection)
-                .count()
+        connections = (
+            db.query(
+                Connection,
+                Sector.name,
+                func.coalesce(interventions_count.c.total, 0).label("total_interventions")
             )
+            .outerjoin(Sector, Sector.id_sector == Connection.sector_id)
+            .outerjoin(interventions_count, interventions_count.c.entity_id == Connection.id_connection)
+            .all()
+        )
 
-            result.append({
+        return [
+            {
                 "id_connection": conn.id_connection,
-                "sector": conn.sector.name if conn.sector else None,
+                "sector": sector_name,
                 "material": conn.material,
                 "type": conn.connection_type,
                 "installed_date": conn.installed_date,
-                "coordinates": db.scalar(func.ST_AsText(conn.coordenates)) if conn.coordenates else None,
+                "coordinates": to_wkt(conn.coordenates),
                 "active": conn.active,
                 "total_interventions": total_interventions
-            })
-
-        return result
+            }
+            for conn, sector_name, total_interventions in connections
+        ]
 
     except Exception as e:
         raise HTTPException(500, f"Error al generar reporte de desvíos: {str(e)}")
@@ -637,6 +764,7 @@ def report_assigned_jobs(db: Session, date_start: str, date_finish: str):
 
         assignments = (
             db.query(Assignment)
+            .options(joinedload(Assignment.employee), joinedload(Assignment.intervention))
             .filter(
                 Assignment.assigned_at >= start_date,
                 Assignment.assigned_at <= finish_date
@@ -685,6 +813,7 @@ def report_assigned_jobs_by_status(db: Session, date_start: str, date_finish: st
 
         assignments = (
             db.query(Assignment)
+            .options(joinedload(Assignment.employee), joinedload(Assignment.intervention))
             .filter(
                 Assignment.assigned_at >= start_date,
                 Assignment.assigned_at <= finish_date
@@ -736,30 +865,22 @@ def report_plumber(db: Session, employee_id: int, date_start: str, date_finish:
         start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
         finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-        employee = db.query(Employee).filter(Employee.id_employee == employee_id).first()
+        employee = (
+            db.query(Employee)
+            .options(joinedload(Employee.type_employee))
+            .filter(Employee.id_employee == employee_id)
+            .first()
+        )
         if not employee:
             raise HTTPException(404, "Empleado no encontrado")
 
         if employee.type_employee.name.lower() != "fontanero":
             raise HTTPException(400, "El empleado no es fontanero")
 
-        assignments = (
-            db.query(Assignment)
-            .filter(
-                Assignment.employee_id == employee_id,
-                Assignment.assigned_at >= start_date,
-                Assignment.assigned_at <= finish_date
-            )
-            .all()
-        )
-
         return {
             "id_employee": employee.id_employee,
             "name": f"{employee.first_name} {employee.last_name}",
-            "total_trabajos": len(assignments),
-            "asignado": sum(a.status == "ASIGNADO" for a in assignments),
-            "en_proceso": sum(a.status == "EN PROCESO" for a in assignments),
-            "completado": sum(a.status == "COMPLETADO" for a in assignments),
+            **_assignment_status_totals(db, employee_id, start_date, finish_date)
         }
 
     except Exception as e:
@@ -773,32 +894,14 @@ def report_top_plumbers(db: Session, date_start: str, date_finish: str):
     start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
     finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-    plumbers = (
-        db.query(Employee)
-        .join(TypeEmployee, TypeEmployee.id_type_employee == Employee.id_type_employee)
-        .filter(TypeEmployee.name == "Fontanero")
-        .all()
-    )
-
-    results = []
-
-    for emp in plumbers:
-        count = (
-            db.query(Assignment)
-            .filter(
-                Assignment.employee_id == emp.id_employee,
-                Assignment.assigned_at >= start_date,
-                Assignment.assigned_at <= finish_date
-            )
-            .count()
-        )
-        results.append({
+    return [
+        {
             "employee": f"{emp.first_name} {emp.last_name}",
             "id_employee": emp.id_employee,
-            "total_trabajos": count
-        })
-
-    return sorted(results, key=lambda x: x["total_trabajos"], reverse=True)
+            "total_trabajos": emp.total
+        }
+        for emp in _employee_activity(db, "Fontanero", start_date, finish_date)
+    ]
 
 
 #Reporte 18: Reporte de operadores
@@ -807,30 +910,22 @@ def report_operator(db: Session, employee_id: int, date_start: str, date_finish:
     start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
     finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-    employee = db.query(Employee).filter(Employee.id_employee == employee_id).first()
+    employee = (
+        db.query(Employee)
+        .options(joinedload(Employee.type_employee))
+        .filter(Employee.id_employee == employee_id)
+        .first()
+    )
     if not employee:
         raise HTTPException(404, "Empleado no encontrado")
 
     if employee.type_employee.name.lower() != "operador":
         raise HTTPException(400, "El empleado no es operador")
 
-    assignments = (
-        db.query(Assignment)
-        .filter(
-            Assignment.employee_id == employee_id,
-            Assignment.assigned_at >= start_date,
-            Assignment.assigned_at <= finish_date
-        )
-        .all()
-    )
-
     return {
         "id_employee": employee.id_employee,
         "name": f"{employee.first_name} {employee.last_name}",
-        "total_trabajos": len(assignments),
-        "asignado": sum(a.status == "ASIGNADO" for a in assignments),
-        "en_proceso": sum(a.status == "EN PROCESO" for a in assignments),
-        "completado": sum(a.status == "COMPLETADO" for a in assignments),
+        **_assignment_status_totals(db, employee_id, start_date, finish_date)
     }
 
 
@@ -839,32 +934,14 @@ def report_top_operators(db: Session, date_start: str, date_finish: str):
     start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
     finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-    operators = (
-        db.query(Employee)
-        .join(TypeEmployee, TypeEmployee.id_type_employee == Employee.id_type_employee)
-        .filter(TypeEmployee.name == "Operador")
-        .all()
-    )
-
-    results = []
-
-    for emp in operators:
-        count = (
-            db.query(Assignment)
-            .filter(
-                Assignment.employee_id == emp.id_employee,
-                Assignment.assigned_at >= start_date,
-                Assignment.assigned_at <= finish_date
-            )
-            .count()
-        )
-        results.append({
+    return [
+        {
             "employee": f"{emp.first_name} {emp.last_name}",
             "id_employee": emp.id_employee,
-            "total_trabajos": count
-        })
-
-    return sorted(results, key=lambda x: x["total_trabajos"], reverse=True)
+            "total_trabajos": emp.total
+        }
+        for emp in _employee_activity(db, "Operador", start_date, finish_date)
+    ]
 
 
 #Reporte 20: Reporte de Lectores
@@ -872,32 +949,14 @@ def report_readers(db: Session, date_start: str, date_finish: str):
     start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
     finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-    readers = (
-        db.query(Employee)
-        .join(TypeEmployee, TypeEmployee.id_type_employee == Employee.id_type_employee)
-        .filter(TypeEmployee.name == "Lector")
-        .all()
-    )
-
-    result = []
-
-    for emp in readers:
-        actividad = (
-            db.query(Assignment)
-            .filter(
-                Assignment.employee_id == emp.id_employee,
-                Assignment.assigned_at >= start_date,
-                Assignment.assigned_at <= finish_date
-            )
-            .count()
-        )
-        result.append({
+    return [
+        {
             "id_employee": emp.id_employee,
             "nombre": f"{emp.first_name} {emp.last_name}",
-            "actividad": actividad
-        })
-
-    return result
+            "actividad": emp.total
+        }
+        for emp in _employee_activity(db, "Lector", start_date, finish_date, order_by_activity=False)
+    ]
 
 #Repote 21: Reporte de Lectores más activos
 def report_top_readers(db: Session, date_start: str, date_finish: str):
@@ -905,33 +964,14 @@ def report_top_readers(db: Session, date_start: str, date_finish: str):
     start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
     finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-    readers = (
-        db.query(Employee)
-        .join(TypeEmployee)
-        .filter(TypeEmployee.name == "Lector")
-        .all()
-    )
-
-    results = []
-
-    for emp in readers:
-        count = (
-            db.query(Assignment)
-            .filter(
-                Assignment.employee_id == emp.id_employee,
-                Assignment.assigned_at >= start_date,
-                Assignment.assigned_at <= finish_date
-            )
-            .count()
-        )
-
-        results.append({
+    return [
+        {
             "employee": f"{emp.first_name} {emp.last_name}",
             "id_employee": emp.id_employee,
-            "total_trabajos": count
-        })
-
-    return sorted(results, key=lambda x: x["total_trabajos"], reverse=True)
+            "total_trabajos": emp.total
+        }
+        for emp in _employee_activity(db, "Lector", start_date, finish_date)
+    ]
 
 
 #Reporte 22: Reporte de encargados de limpieza
@@ -970,30 +1010,11 @@ def report_top_cleaners(db: Session, date_start: str, date_finish: str):
     start_date = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
     finish_date = datetime.fromisoformat(date_finish.replace("Z", "+00:00"))
 
-    cleaners = (
-        db.query(Employee)
-        .join(TypeEmployee)
-        .filter(TypeEmployee.name == "Encargado de limpieza")
-        .all()
-    )
-
-    results = []
-
-    for emp in cleaners:
-        count = (
-            db.query(Assignment)
-            .filter(
-                Assignment.employee_id == emp.id_employee,
-                Assignment.assigned_at >= start_date,
-                Assignment.assigned_at <= finish_date
-            )
-            .count()
-        )
-
-        results.append({
+    return [
+        {
             "id_employee": emp.id_employee,
             "nombre": f"{emp.first_name} {emp.last_name}",
-            "actividad": count
-        })
-
-    return sorted(results, key=lambda x: x["actividad"], reverse=True)
+            "actividad": emp.total
+        }
+        for emp in _employee_activity(db, "Encargado de limpieza", start_date, finish_date)
+    ]
@@ -1,5 +1,6 @@
 from app.models.permissions.permissions import Permissions
 from app.utils.response import existence_response_dict
+from app.utils.pagination import paginate
 from app.schemas.user.user import UserLogin
 from app.schemas.rol.rol import RolCreate, RolUpdate
 from app.utils.logger import create_log
@@ -10,11 +11,9 @@ from fastapi import HTTPException
 from datetime import datetime
 from typing import Optional, List, Dict
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, cursor: Optional[str] = None, total_mode: str = "exact"):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
-
-    offset = (page - 1) * limit
     
     # Construir query base
     query = db.query(Rol)
@@ -30,20 +29,18 @@ def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
             )
         )
     
-    # Contar total antes de paginar
-    total = query.count()
-    
-    # Aplicar paginación
-    roles = query.order_by(Rol.id_rol.desc()).offset(offset).limit(limit).all()
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip())
+    roles, total, page_info = paginate(query, Rol.id_rol, page, limit, cursor, total_mode, filtered)
 
     # Si no hay resultados pero hay búsqueda, no es un error, solo no hay coincidencias
-    if not roles and not search:
+    if not roles and not search and not cursor:
         raise HTTPException(
             status_code=404,
             detail=existence_response_dict(False, "No hay roles disponibles"),
             headers={"X-Error": "No hay roles disponibles"}
         )
-    return roles, total
+    return roles, total, page_info
 
 def get_by_id(db: Session, rol_id: int):
     rol = db.query(Rol).filter(Rol.id_rol == rol_id).first()
@@ -8,62 +8,70 @@ from sqlalchemy import func, or_
 from app.utils.response import existence_response_dict
 from app.utils.logger import create_log
 from app.schemas.user.user import UserLogin
+from app.network.graph import sync_tank
+from app.utils.tile_cache import entity_bounds, invalidate_entity_tiles
+from app.utils.geometry import point_lon_lat
+from app.utils.pagination import paginate
+from app.utils.fieldsets import parse_fields, project, rows_to_dicts
+from app.utils.spatial import BBox, apply_bbox, apply_point_thinning
 
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
+# Columnas del listado (?fields=)
+LIST_COLUMNS = {
+    "id_tank": Tank.id_tank,
+    "name": Tank.name,
+    "latitude": func.ST_Y(Tank.coordinates),
+    "longitude": func.ST_X(Tank.coordinates),
+    "connections": Tank.connections,
+    "photography": Tank.photography,
+    "sector_id": Tank.sector_id,
+    "active": Tank.active,
+    "created_at": Tank.created_at,
+    "updated_at": Tank.updated_at,
+}
+LIST_FIELDS = list(LIST_COLUMNS)
+
+
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, bbox: Optional[BBox] = None, zoom: Optional[int] = None, cursor: Optional[str] = None, total_mode: str = "exact", fields: Optional[str] = None):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
-
-    offset = (page - 1) * limit
     
-    # Construir query base con coordenadas
-    query = db.query(
-        Tank,
-        func.ST_X(Tank.coordinates).label('longitude'),
-        func.ST_Y(Tank.coordinates).label('latitude')
-    )
+    # Solo las columnas pedidas van al SELECT
+    selected = parse_fields(fields, LIST_FIELDS, "id_tank")
+    query = project(db, LIST_COLUMNS, selected)
     
     # Aplicar búsqueda si se proporciona
     if search and search.strip():
         search_term = f"%{search.strip().lower()}%"
         query = query.filter(
             or_(
-                func.lower(Tank.name).like(search_term),
-                func.lower(func.coalesce(Tank.connections, '')).like(search_term)
+                Tank.name.ilike(search_term),
+                Tank.connections.ilike(search_term)
             )
         )
     
-    # Contar total antes de paginar
-    total = query.count()
-    
-    # Aplicar paginación
-    tanks = query.order_by(Tank.id_tank.desc()).offset(offset).limit(limit).all()
+    # Modo viewport: solo lo que intersecta el bbox, con raleo de puntos en zoom bajo
+    query = apply_bbox(query, Tank.coordinates, bbox)
+    query = apply_point_thinning(query, Tank.coordinates, Tank.id_tank, zoom)
+
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip()) or bbox is not None or zoom is not None
+    tanks, total, page_info = paginate(query, Tank.id_tank, page, limit, cursor, total_mode, filtered)
 
     # Si no hay resultados pero hay búsqueda, no es un error, solo no hay coincidencias
-    if not tanks and not search:
+    if not tanks and not search and bbox is None and not cursor:
         raise HTTPException(
             status_code=404,
             detail=existence_response_dict(False, "No hay tanques disponibles"),
             headers={"X-Error": "No hay tanques disponibles"}
         )
 
-    tank_list = [
-        {
-            "id_tank": t.id_tank,
-            "name": t.name,
-            "latitude": lat,
-            "longitude": lon,
-            "connections": t.connections,
-            "photography": list(t.photography or []),
-            "sector_id": t.sector_id,
-            "active": t.active,
-            "created_at": t.created_at,
-            "updated_at": t.updated_at
-        }
-        for t, lon, lat in tanks
-    ]
+    tank_list = rows_to_dicts(tanks, LIST_COLUMNS, selected)
+    if "photography" in selected:
+        for row in tank_list:
+            row["photography"] = list(row["photography"] or [])
 
-    return tank_list, total
+    return tank_list, total, page_info
 
 
 def get_by_id(db: Session, tank_id: int):
@@ -120,11 +128,10 @@ def create(db: Session, tank_data: TankBase,current_user: UserLogin):
         db.add(new_tank)
         db.commit()
         db.refresh(new_tank)
+        sync_tank(new_tank)
+        invalidate_entity_tiles(db, Tank, new_tank.id_tank)
 
-        longitude, latitude = db.query(
-            func.ST_X(new_tank.coordinates),
-            func.ST_Y(new_tank.coordinates)
-        ).first()
+        longitude, latitude = point_lon_lat(new_tank.coordinates)
 
         tank_dict = {
             "id_tank": new_tank.id_tank,
@@ -166,6 +173,9 @@ def update(db: Session, tank_id: int, tank_data: TankUpdate,current_user: UserLo
             headers={"X-Error": "El tanque no existe"}
         )
 
+    # Rectángulo de la geometría anterior, para invalidar sus teselas si se mueve
+    previous_bounds = entity_bounds(db, Tank, tank_id)
+
     try:
         update_data = tank_data.dict(exclude_unset=True)
 
@@ -181,11 +191,10 @@ def update(db: Session, tank_id: int, tank_data: TankUpdate,current_user: UserLo
 
         db.commit()
         db.refresh(tank)
+        sync_tank(tank)
+        invalidate_entity_tiles(db, Tank, tank.id_tank, previous_bounds)
 
-        longitude, latitude = db.query(
-            func.ST_X(tank.coordinates),
-            func.ST_Y(tank.coordinates)
-        ).first()
+        longitude, latitude = point_lon_lat(tank.coordinates)
 
         tank_dict = {
             "id_tank": tank.id_tank,
@@ -232,6 +241,8 @@ def toggle_state(db: Session, tank_id: int,current_user: UserLogin):
 
     db.commit()
     db.refresh(tank)
+    sync_tank(tank)
+    invalidate_entity_tiles(db, Tank, tank.id_tank)
     status = ""
     if tank.active is False:
         status = "inactivo"
@@ -9,14 +9,14 @@ from app.models.interventions.interventions import Interventions
 from app.schemas.assignments.assignments import AssignmentBase, AssignmentUpdate
 from app.schemas.user.user import UserLogin
 from app.utils.response import existence_response_dict
+from app.utils.pagination import paginate
 from app.utils.logger import create_log
 
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, cursor: Optional[str] = None, total_mode: str = "exact"):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
     
-    offset = (page - 1) * limit
     query = db.query(Assignment)
 
     if search and search.strip():
@@ -28,16 +28,11 @@ def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
             )
         )
 
-    total = query.count()
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip())
+    assignments, total, page_info = paginate(query, Assignment.id_assignment, page, limit, cursor, total_mode, filtered)
 
-    assignments = (
-        query.order_by(Assignment.id_assignment.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-
-    if not assignments and not search:
+    if not assignments and not search and not cursor:
         raise HTTPException(
             status_code=404,
             detail=existence_response_dict(False, "No hay asignaciones disponibles"),
@@ -59,7 +54,7 @@ def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
         for a in assignments
     ]
 
-    return assignments_list, total
+    return assignments_list, total, page_info
 
 
 def get_by_id(db: Session, id_assignment: int):
@@ -2,12 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session, joinedload
 from app.utils.auth import (
-    verify_password,
+    verify_and_update_password_async,
     verify_token,
+    create_refresh_token,
+    decode_refresh_token,
+    REFRESH_TOKEN_EXPIRE_DAYS,
 )
+from app.models.refresh_token.refresh_token import RefreshToken
+from datetime import datetime, timedelta
+import uuid
 from app.schemas.user.user import UserResponse
 from app.models.user.user import Username as username_model
-from app.db.database import get_db
+from app.models.rol.rol import Rol
+from app.utils.principal_cache import principal_cache, snapshot_principal
+from app.utils.permissions import permission_registry
+from app.db.database import get_db, run_in_db_thread
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
@@ -18,22 +27,104 @@ def get_user(db: Session, email: str): #Esta función es para obtener al usuario
 
 def get_user_with_permissions(db: Session, email: str): #Obtener usuario con rol y permisos cargados
     return db.query(username_model).options(
-        joinedload(username_model.rol).joinedload(username_model.rol.property.mapper.class_.permissions)
+        joinedload(username_model.rol).joinedload(Rol.permissions)
     ).filter(username_model.email == email).first()
 
-def authenticate_user(db: Session, username: str, password: str): #Esto sirve para autenticar al usuario
-    # Buscar por email o por nombre de usuario
-    user = db.query(username_model).filter(
+def get_login_user(db: Session, username: str): #Buscar por email o por nombre de usuario
+    return db.query(username_model).filter(
         (username_model.email == username) | (username_model.user == username)
     ).first()
+
+def update_password_hash(db: Session, user, new_hash: str): #Guardar el hash regenerado con el costo actual
+    user.password_hash = new_hash
+    db.commit()
+    db.refresh(user)
+
+async def authenticate_user(db: Session, username: str, password: str): #Esto sirve para autenticar al usuario
+    # La consulta va al pool de BD y bcrypt a su propio pool, el event loop no se bloquea
+    user = await run_in_db_thread(get_login_user, db, username)
     if not user: 
         return False
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password_async(password, user.password_hash)
+    if not valid:
         return False
     if not user.active: #Ver si se agrega, un mensaje que diga que el usuario no está activo
         return False
+    if new_hash:
+        # El costo de bcrypt cambió (BCRYPT_ROUNDS): se actualiza el hash de forma transparente
+        await run_in_db_thread(update_password_hash, db, user, new_hash)
     return user
 
+def _refresh_exception():
+    return HTTPException(
+        status_code = status.HTTP_401_UNAUTHORIZED,
+        detail = "Refresh token inválido o expirado",
+        headers = {"WWW-Authenticate": "Bearer"},
+    )
+
+def _issue_refresh_token(db: Session, user, family_id: str = None) -> str: #Registra el jti sin confirmar la transacción
+    jti = uuid.uuid4().hex
+    family_id = family_id or uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(jti=jti, family_id=family_id, user_id=user.id_user, expires_at=expires_at))
+    return create_refresh_token(user.email, jti, family_id, expires_at)
+
+def issue_refresh_token(db: Session, user) -> str: #Nuevo refresh token (nueva familia) al iniciar sesión
+    token = _issue_refresh_token(db, user)
+    db.commit()
+    return token
+
+def _revoke_family(db: Session, family_id: str):
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+def rotate_refresh_token(db: Session, token: str): #Cambia un refresh token válido por uno nuevo de la misma familia
+    credentials_exception = _refresh_exception()
+    payload = decode_refresh_token(token, credentials_exception)
+
+    # FOR UPDATE: dos rotaciones simultáneas del mismo token no pueden ganar ambas
+    stored = db.query(RefreshToken).filter(RefreshToken.jti == payload["jti"]).with_for_update().first()
+    if stored is None or stored.family_id != payload["fam"]:
+        raise credentials_exception
+    if stored.revoked_at is not None:
+        # Reutilización de un token ya rotado: posible robo, se revoca toda la familia
+        _revoke_family(db, stored.family_id)
+        db.commit()
+        raise credentials_exception
+    if stored.expires_at <= datetime.utcnow():
+        raise credentials_exception
+
+    user = db.query(username_model).filter(username_model.id_user == stored.user_id).first()
+    if user is None or not user.active:
+        raise credentials_exception
+
+    stored.revoked_at = datetime.utcnow()
+    new_token = _issue_refresh_token(db, user, stored.family_id)
+    email = user.email
+    db.commit()
+    return email, new_token
+
+def revoke_refresh_token(db: Session, token: str, email: str): #Cierra la sesión: revoca la familia del refresh token
+    payload = decode_refresh_token(token, _refresh_exception())
+    # Un usuario solo puede cerrar sus propias sesiones
+    if payload["sub"] != email:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="El refresh token no pertenece al usuario actual"
+        )
+    _revoke_family(db, payload["fam"])
+    db.commit()
+    return payload["sub"]
+
+def purge_expired_refresh_tokens(db: Session) -> int: #Elimina los refresh tokens vencidos
+    deleted = db.query(RefreshToken).filter(
+        RefreshToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
 def get_current_user(token: str = Depends(oauth2_scheme),db: Session = Depends(get_db)): #Esto nos ayuda para obtener el usuario actual del token
     credentials_exception = HTTPException(
         status_code = status.HTTP_401_UNAUTHORIZED,
@@ -41,18 +132,38 @@ def get_current_user(token: str = Depends(oauth2_scheme),db: Session = Depends(g
         headers = {"WWW-Authenticate": "Bearer"},
     )
     email = verify_token(token, credentials_exception)
-    user = get_user(db, email=email)
+
+    # La mayoría de requests se resuelven desde la caché sin consultar la BD
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    version = principal_cache.current_version()
+    user = get_user_with_permissions(db, email=email)
     if user is None: 
         raise credentials_exception
-    
-    from app.models.rol.rol import Rol
-    user_with_rol = db.query(username_model).options(
-        joinedload(username_model.rol).joinedload(Rol.permissions)
-    ).filter(username_model.id_user == user.id_user).first()
-    
-    return user_with_rol if user_with_rol else user
+
+    principal = snapshot_principal(user)
+    principal_cache.put(email, principal, version)
+    return principal
 
 def get_current_active_user(current_user: UserResponse = Depends(get_current_user)): #Esto nos sirve para verificar si el usuario está activo
     if not current_user.active:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_current_admin_user(current_user = Depends(get_current_active_user)): #Restringe el acceso a usuarios con rol Administrador
+    if not current_user.rol or current_user.rol.name != "Administrador":
+        raise HTTPException(status_code=403, detail="Acceso restringido a administradores")
+    return current_user
+
+def require_permission(name: str): #Dependencia que exige un permiso del rol del usuario
+    bit = permission_registry.bit(name)
+
+    # async: la verificación es un AND sobre la máscara ya compilada, no necesita hilo
+    async def dependency(current_user = Depends(get_current_active_user)):
+        if not getattr(current_user, "permission_mask", 0) & bit:
+            raise HTTPException(status_code=403, detail=f"No tiene el permiso requerido: {name}")
+        return current_user
+
+    return dependency
@@ -1,12 +1,15 @@
 from fastapi import HTTPException
 from app.models.data_upload.data_upload import Data_upload
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from app.schemas.data_upload.data_upload import Data_uploadBase, Data_uploadCreate, Data_uploadResponse, Data_uploadUpdate
 from app.db.database import get_db
 from sqlalchemy.orm import Session
+from sqlalchemy import literal_column, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import Depends
 from app.utils.response import success_response, error_response, existence_response_dict
+from app.utils.pagination import paginate
 from app.utils.logger import create_log
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.schemas.user.user import UserLogin
@@ -21,21 +24,40 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 # importar el script
 from app.scripts.data_upload.data_upload import process_excel_from_content
 
-def get_all(db: Session, page: int, limit: int):
+# Campos de Data_uploadResponse: las filas del listado salen como dicts
+# listos para ORJSONResponse, sin validar cada una con pydantic
+RESPONSE_FIELDS = tuple(Data_uploadResponse.model_fields)
+
+
+def _to_dict(data_upload: Data_upload) -> dict:
+    return {field: getattr(data_upload, field) for field in RESPONSE_FIELDS}
+
+
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, cursor: Optional[str] = None, total_mode: str = "exact"):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="Página y límite deben ser mayores que 0")
     
     try:
-        offset = (page - 1) * limit
-        data_uploads = db.query(Data_upload).offset(offset).limit(limit).all()
         query = db.query(Data_upload)
-        total = query.count()
-        return data_uploads, total
+        # Búsqueda por contribuyente (índice trigram), colonia o identificador
+        if search and search.strip():
+            search_term = f"%{search.strip()}%"
+            query = query.filter(or_(
+                Data_upload.taxpayer.ilike(search_term),
+                Data_upload.cologne.ilike(search_term),
+                Data_upload.identifier == search.strip()
+            ))
+        # Página y total en una sola consulta (o keyset si viene cursor), por identifier descendente
+        filtered = bool(search and search.strip())
+        data_uploads, total, page_info = paginate(query, Data_upload.identifier, page, limit, cursor, total_mode, filtered)
+        return [_to_dict(du) for du in data_uploads], total, page_info
     except Exception as e:
         # Si la tabla no existe, devolver lista vacía en lugar de error
         error_str = str(e).lower()
         if 'does not exist' in error_str or 'undefinedtable' in error_str or 'relation' in error_str:
-            return [], 0
+            if cursor is not None:
+                return [], None, {"next_cursor": None, "prev_cursor": None}
+            return [], 0, None
         # Para otros errores, relanzar
         raise
 
@@ -46,97 +68,81 @@ def get_by_identifier(db: Session, identifier: str):
     return data_upload
 
 
-def create_bulk(db: Session, data_list: List[Data_uploadCreate], current_user: UserLogin):
-    """Crea múltiples registros a la vez o actualiza si ya existen"""
-    created_records = []
-    updated_records = []
-    
+# Filas por sentencia INSERT ... ON CONFLICT (17 parámetros por fila)
+BULK_UPSERT_BATCH_SIZE = int(os.getenv("DATA_UPLOAD_BATCH_SIZE", "1000"))
+
+# Columnas que se sobrescriben cuando el identifier ya existe
+_UPSERT_COLUMNS = [
+    "siaf", "municipality", "department", "institutional_classification",
+    "report", "date", "hour", "seriereport", "user",
+    "taxpayer", "cologne", "cat_service", "cannon", "excess", "total",
+]
+
+
+def create_bulk(db: Session, data_list: List[Data_uploadCreate], current_user: UserLogin, write_log: bool = True):
+    """
+    Crea múltiples registros a la vez o actualiza si ya existen
+
+    Usa INSERT ... ON CONFLICT (identifier) DO UPDATE por lotes; RETURNING
+    (xmax = 0) indica si PostgreSQL insertó la fila (True) o la actualizó.
+    Devuelve (creados, actualizados). Con write_log=False no registra el log
+    (la carga por lotes lo registra una sola vez al terminar).
+    """
+    now = datetime.now()
+
+    # Un identifier repetido en el archivo se queda con la última fila,
+    # ON CONFLICT no puede tocar la misma fila dos veces en una sentencia
+    rows = {}
     for data in data_list:
-        # Verificar si ya existe por identifier (clave primaria)
-        existing = db.query(Data_upload).filter(
-            Data_upload.identifier == data.identifier
-        ).first()
-        
-        if existing:
-            # Actualizar registro existente
-            existing.siaf = data.siaf
-            existing.municipality = data.municipality
-            existing.department = data.department
-            existing.institutional_classification = data.institutional_classification
-            existing.report = data.report
-            existing.date = data.date
-            existing.hour = data.hour
-            existing.seriereport = data.seriereport
-            existing.user = data.user
-            existing.taxpayer = data.taxpayer
-            existing.cologne = data.cologne
-            existing.cat_service = data.cat_service
-            existing.cannon = data.cannon
-            existing.excess = data.excess
-            existing.total = data.total
-            existing.updated_at = datetime.now()
-            # Marcar como actualizado agregando un atributo temporal
-            setattr(existing, '_was_updated', True)
-            updated_records.append(existing)
-            continue
-        
-        # Crear nuevo registro
-        new_data_upload = Data_upload(
-            # Encabezado
-            siaf=data.siaf,
-            municipality=data.municipality,
-            department=data.department,
-            institutional_classification=data.institutional_classification,
-            report=data.report,
-            date=data.date,
-            hour=data.hour,
-            seriereport=data.seriereport,
-            user=data.user,
-            # Información del servicio
-            identifier=data.identifier,
-            taxpayer=data.taxpayer,
-            cologne=data.cologne,
-            cat_service=data.cat_service,
-            cannon=data.cannon,
-            excess=data.excess,
-            total=data.total,
-            status=True,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
-        
-        db.add(new_data_upload)
-        setattr(new_data_upload, '_was_updated', False)
-        created_records.append(new_data_upload)
-    
-    db.commit()
-    
-    # Refresh todos los registros creados y actualizados
-    for record in created_records:
-        db.refresh(record)
-    for record in updated_records:
-        db.refresh(record)
-    
+        row = {column: getattr(data, column) for column in _UPSERT_COLUMNS}
+        row.update(identifier=data.identifier, status=True, created_at=now, updated_at=now)
+        rows[data.identifier] = row
+    rows = list(rows.values())
+
+    stmt = pg_insert(Data_upload)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Data_upload.identifier],
+        set_={
+            **{column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            "updated_at": stmt.excluded.updated_at
+        }
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+    created_count = 0
+    updated_count = 0
+    try:
+        for start in range(0, len(rows), BULK_UPSERT_BATCH_SIZE):
+            batch = rows[start:start + BULK_UPSERT_BATCH_SIZE]
+            inserted = db.execute(stmt.values(batch)).scalars().all()
+            created_count += sum(1 for value in inserted if value)
+            updated_count += sum(1 for value in inserted if not value)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
     # Log solo si hay registros creados o actualizados
-    if created_records or updated_records:
-        action_desc = []
-        if created_records:
-            action_desc.append(f"creó {len(created_records)} registros")
-        if updated_records:
-            action_desc.append(f"actualizó {len(updated_records)} registros")
-        
-        create_log(
-            db,
-            user_id=current_user.id_user,
-            action="CREATE" if created_records else "UPDATE",
-            entity="Data_upload",
-            entity_id=None,
-            description=f"El usuario {current_user.user} {', '.join(action_desc)} de data upload"
-        )
-
-    # Retornar todos los registros con información de si fueron creados o actualizados
-    all_records = created_records + updated_records
-    return all_records
+    if write_log and (created_count or updated_count):
+        log_bulk_upload(db, current_user, created_count, updated_count)
+
+    return created_count, updated_count
+
+
+def log_bulk_upload(db: Session, current_user: UserLogin, created_count: int, updated_count: int):
+    action_desc = []
+    if created_count:
+        action_desc.append(f"creó {created_count} registros")
+    if updated_count:
+        action_desc.append(f"actualizó {updated_count} registros")
+
+    create_log(
+        db,
+        user_id=current_user.id_user,
+        action="CREATE" if created_count else "UPDATE",
+        entity="Data_upload",
+        entity_id=None,
+        description=f"El usuario {current_user.user} {', '.join(action_desc)} de data upload"
+    )
 
 def update(db: Session, identifier: str, data: Data_uploadUpdate, current_user: UserLogin):
     data_upload = db.query(Data_upload).filter(Data_upload.identifier == identifier).first()
@@ -212,10 +218,7 @@ def process_excel_data(db: Session, file_content: bytes, current_user: UserLogin
         # Insertar en BD solo si hay datos válidos
         if processed_data:
             try:
-                records = create_bulk(db, processed_data, current_user)
-                # Contar cuántos fueron creados vs actualizados usando el atributo temporal
-                created_count = sum(1 for r in records if not getattr(r, '_was_updated', False))
-                updated_count = sum(1 for r in records if getattr(r, '_was_updated', False))
+                created_count, updated_count = create_bulk(db, processed_data, current_user)
                 
                 return {
                     "success": True,
@@ -9,54 +9,83 @@ from datetime import datetime
 from app.schemas.interventions.interventions import InterventionsBase, InterventionsResponse, InterventionsUpdate, InterventionsCreate
 from app.db.database import get_db
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from fastapi import Depends
 from app.utils.response import success_response, error_response, existence_response_dict
 from app.utils.logger import create_log
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.schemas.user.user import UserLogin
+from app.utils.pagination import paginate
+from app.utils.fieldsets import parse_fields, project, rows_to_dicts
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, status: Optional[str] = None):
+# Columnas del listado (?fields=); id_tank, id_pipes e id_connection salen de intervention_entities
+LIST_COLUMNS = {
+    "id_interventions": Interventions.id_interventions,
+    "description": Interventions.description,
+    "active": Interventions.active,
+    "start_date": Interventions.start_date,
+    "end_date": Interventions.end_date,
+    "status": Interventions.status,
+    "photography": Interventions.photography,
+    "created_at": Interventions.created_at,
+    "updated_at": Interventions.updated_at,
+}
+ENTITY_FIELDS = ["id_tank", "id_pipes", "id_connection"]
+LIST_FIELDS = [*LIST_COLUMNS, *ENTITY_FIELDS]
+
+
+def _entities_by_intervention(db: Session, intervention_ids: List[int]) -> dict:
+    # Entidad asociada de cada intervención de la página en una sola consulta
+    entities = {}
+    rows = db.query(
+        Intervention_entities.d_interventions,
+        Intervention_entities.id_tank,
+        Intervention_entities.id_pipes,
+        Intervention_entities.id_connection
+    ).filter(Intervention_entities.d_interventions.in_(intervention_ids)) \
+     .order_by(Intervention_entities.id_intervention_entities).all()
+    for intervention_id, id_tank, id_pipes, id_connection in rows:
+        entities.setdefault(intervention_id, {"id_tank": id_tank, "id_pipes": id_pipes, "id_connection": id_connection})
+    return entities
+
+
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, status: Optional[str] = None, cursor: Optional[str] = None, total_mode: str = "exact", fields: Optional[str] = None):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
     
-    offset = (page - 1) * limit
-    
-    query = db.query(Interventions)
+    # Solo las columnas pedidas van al SELECT
+    selected = parse_fields(fields, LIST_FIELDS, "id_interventions")
+    query = project(db, LIST_COLUMNS, selected)
     
     if search and search.strip():
         search_term = f"%{search.strip().lower()}%"
         query = query.filter(
-            func.lower(Interventions.description).like(search_term)
+            Interventions.description.ilike(search_term)
         )
     
     # Filtrar por status si se proporciona
     if status:
         query = query.filter(Interventions.status == status)
     
-    total = query.count()
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip()) or bool(status)
+    interventions, total, page_info = paginate(query, Interventions.id_interventions, page, limit, cursor, total_mode, filtered)
     
-    interventions = query.order_by(Interventions.id_interventions.desc()).offset(offset).limit(limit).all()
-    
-    # Cargar las entidades asociadas para cada intervención
-    for intervention in interventions:
-        intervention_entity = db.query(Intervention_entities).filter(
-            Intervention_entities.d_interventions == intervention.id_interventions
-        ).first()
-        
-        if intervention_entity:
-            intervention.id_tank = intervention_entity.id_tank
-            intervention.id_pipes = intervention_entity.id_pipes
-            intervention.id_connection = intervention_entity.id_connection
-        else:
-            intervention.id_tank = None
-            intervention.id_pipes = None
-            intervention.id_connection = None
+    # Filas listas para ORJSONResponse, con las mismas llaves que InterventionsResponse
+    intervention_list = rows_to_dicts(interventions, LIST_COLUMNS, selected)
+    requested_entities = [name for name in ENTITY_FIELDS if name in selected]
+    entities = _entities_by_intervention(db, [row["id_interventions"] for row in intervention_list]) \
+        if requested_entities and intervention_list else {}
+    for row in intervention_list:
+        if "photography" in row:
+            row["photography"] = list(row["photography"] or [])
+        entity = entities.get(row["id_interventions"], {})
+        for name in requested_entities:
+            row[name] = entity.get(name)
     
     # No lanzar error si no hay intervenciones - simplemente devolver lista vacía
     # Esto es válido cuando no hay datos en la BD o cuando los filtros no coinciden
     
-    return interventions, total
+    return intervention_list, total, page_info
 
 def get_by_id(db: Session, intervention_id: int):
     intervention = db.query(Interventions).filter(Interventions.id_interventions == intervention_id).first()
@@ -2,11 +2,14 @@ from fastapi import HTTPException, APIRouter
 from app.models.tanks.tanks import Tank
 from app.models.connection.connections import Connection
 from app.models.pipes.pipes import Pipes
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from app.schemas.map.map import ConnectionSchema, PipeSchema, TankSchema
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text, or_
+from app.utils.tile_cache import read_tile, write_tile, tile_generation, MIN_ZOOM, MAX_ZOOM
+from app.utils.geometry import point_lon_lat, line_coordinates, to_geojson
+from app.utils.spatial import BBox, apply_bbox, apply_point_thinning, apply_line_thinning, intersects_bbox
 from app.utils.response import existence_response_dict
 from app.utils.logger import create_log
 from sqlalchemy import func
@@ -15,19 +18,39 @@ from app.schemas.user.user import UserLogin
 from sqlalchemy import func
 from app.models.interventions.interventions import Interventions
 from app.models.intervention_entities.intervention_entities import Intervention_entities
-import json
 
 
-def get_all_tank_with_pipes_and_connections(db: Session) -> List[TankSchema]:
-    tanks = (
+def get_all_tank_with_pipes_and_connections(db: Session, bbox: Optional[BBox] = None, zoom: Optional[int] = None) -> List[TankSchema]:
+    query = (
         db.query(Tank)
         .options(
             joinedload(Tank.pipes).joinedload(Pipes.connections)
         )
         .filter(Tank.active == True)   # <-- SOLO TANQUES ACTIVOS
-        .all()
     )
 
+    # Modo viewport: solo tuberías y conexiones visibles, y los tanques dentro del bbox o que las alimentan
+    visible_pipes = visible_connections = None
+    if bbox is not None:
+        pipes_query = apply_bbox(db.query(Pipes.id_pipes), Pipes.coordinates, bbox)
+        visible_pipes = {pid for (pid,) in apply_line_thinning(pipes_query, Pipes.coordinates, zoom)}
+
+        # Solo conexiones activas (las únicas que se dibujan), antes del raleo por celda
+        connections_query = db.query(Connection.id_connection).filter(Connection.active == True)
+        connections_query = apply_bbox(connections_query, Connection.coordenates, bbox)
+        connections_query = apply_point_thinning(connections_query, Connection.coordenates, Connection.id_connection, zoom)
+        visible_connections = {cid for (cid,) in connections_query}
+
+        query = query.filter(or_(
+            intersects_bbox(Tank.coordinates, bbox),
+            Tank.pipes.any(Pipes.id_pipes.in_(list(visible_pipes)))
+        ))
+        tanks = query.all()
+        if not tanks:
+            return []
+    else:
+        tanks = query.all()
+
     if not tanks:
         raise HTTPException(
             status_code=404,
@@ -37,79 +60,36 @@ def get_all_tank_with_pipes_and_connections(db: Session) -> List[TankSchema]:
 
     # Filtrar tuberías activas
     for tank in tanks:
-        tank.pipes = [pipe for pipe in tank.pipes if pipe.active == True]
+        tank.pipes = [
+            pipe for pipe in tank.pipes
+            if pipe.active == True and (visible_pipes is None or pipe.id_pipes in visible_pipes)
+        ]
 
     # Filtrar conexiones activas
     for tank in tanks:
         for pipe in tank.pipes:
             pipe.connections = [
-                conn for conn in pipe.connections if conn.active == True
+                conn for conn in pipe.connections
+                if conn.active == True and (visible_connections is None or conn.id_connection in visible_connections)
             ]
 
-    # IDs después de filtrar
-    all_pipe_ids = list(set(
-        pipe.id_pipes
-        for tank in tanks
-        for pipe in tank.pipes
-    ))
-
-    pipe_coords_map = {}
-
-    if all_pipe_ids:
-        pipe_coords_query = db.query(
-            Pipes.id_pipes,
-            func.ST_AsText(Pipes.coordinates)
-        ).filter(Pipes.id_pipes.in_(all_pipe_ids)).all()
-
-        pipe_coords_map = {pid: coords_text for pid, coords_text in pipe_coords_query}
-
-    all_conn_ids = list(set(
-        conn.id_connection
-        for tank in tanks
-        for pipe in tank.pipes
-        for conn in pipe.connections
-    ))
-
-    conn_coords_map = {}
-
-    if all_conn_ids:
-        conn_coords_query = db.query(
-            Connection.id_connection,
-            func.ST_X(Connection.coordenates).label("longitude"),
-            func.ST_Y(Connection.coordenates).label("latitude")
-        ).filter(
-            Connection.id_connection.in_(all_conn_ids)
-        ).filter(
-            Connection.active == True      # <-- SOLO CONEXIONES ACTIVAS (opcional)
-        ).all()
-
-        conn_coords_map = {cid: (lon, lat) for cid, lon, lat in conn_coords_query}
-
     # Construcción final
     tank_list = []
 
     for tank in tanks:
-        tank_lon = db.scalar(func.ST_X(tank.coordinates))
-        tank_lat = db.scalar(func.ST_Y(tank.coordinates))
+        # Las geometrías ya vienen cargadas (EWKB), se decodifican sin volver a la BD
+        tank_lon, tank_lat = point_lon_lat(tank.coordinates)
 
         pipes_data = []
 
         for pipe in tank.pipes:
-            pipe_coords_text = pipe_coords_map.get(pipe.id_pipes, "LINESTRING()")
-
-            coords = []
-            if pipe_coords_text and pipe_coords_text != "LINESTRING()":
-                coords_str = pipe_coords_text.replace("LINESTRING(", "").replace(")", "")
-                if coords_str:
-                    coords = [
-                        tuple(map(float, c.strip().split()))
-                        for c in coords_str.split(",")
-                        if c.strip()
-                    ]
+            coords = line_coordinates(pipe.coordinates)
 
             connections_data = []
             for conn in pipe.connections:
-                lon_conn, lat_conn = conn_coords_map.get(conn.id_connection, (0.0, 0.0))
+                lon_conn, lat_conn = point_lon_lat(conn.coordenates)
+                if lon_conn is None:
+                    lon_conn, lat_conn = 0.0, 0.0
 
                 connections_data.append(
                     ConnectionSchema(
@@ -174,8 +154,7 @@ def get_interventions_in_range(db: Session, start_date, end_date):
 
             # ---------- TANK (POINT) ----------
             if e.tank and e.tank.coordinates is not None:
-                lon = db.query(func.ST_X(e.tank.coordinates)).scalar()
-                lat = db.query(func.ST_Y(e.tank.coordinates)).scalar()
+                lon, lat = point_lon_lat(e.tank.coordinates)
 
                 results.append({
                     "type": "tank",
@@ -187,11 +166,7 @@ def get_interventions_in_range(db: Session, start_date, end_date):
             # ---------- PIPE (LINESTRING GEOJSON) ----------
             if e.pipe and e.pipe.coordinates is not None:
 
-                geojson_str = db.query(
-                    func.ST_AsGeoJSON(e.pipe.coordinates)
-                ).scalar()
-
-                geojson = json.loads(geojson_str)
+                geojson = to_geojson(e.pipe.coordinates)
 
                 results.append({
                     "type": "pipe",
@@ -201,10 +176,9 @@ def get_interventions_in_range(db: Session, start_date, end_date):
                 })
 
             # ---------- CONNECTION (POINT) ----------
-            if e.connection and e.connection.coordinates is not None:
+            if e.connection and e.connection.coordenates is not None:
 
-                lon = db.query(func.ST_X(e.connection.coordinates)).scalar()
-                lat = db.query(func.ST_Y(e.connection.coordinates)).scalar()
+                lon, lat = point_lon_lat(e.connection.coordenates)
 
                 results.append({
                     "type": "connection",
@@ -214,3 +188,79 @@ def get_interventions_in_range(db: Session, start_date, end_date):
                 })
 
     return results
+
+
+# ----- Vector tiles (MVT) -----
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+# Zoom mínimo en el que se incluye cada capa (las acometidas saturan las teselas lejanas)
+LAYER_MIN_ZOOM = {"tanks": 0, "bombs": 0, "pipes": 0, "connections": 13}
+# A partir de este zoom no se simplifican las tuberías
+SIMPLIFY_MAX_ZOOM = 16
+_WEB_MERCATOR_WIDTH = 40075016.686
+
+_TILE_SQL = text("""
+WITH bounds AS (
+    SELECT ST_TileEnvelope(:z, :x, :y) AS geom,
+           ST_Transform(ST_TileEnvelope(:z, :x, :y), 4326) AS geom_4326
+),
+tanks AS (
+    SELECT t.id_tank AS id, t.name, t.sector_id,
+           ST_AsMVTGeom(ST_Transform(t.coordinates, 3857), b.geom, :extent, :buffer, true) AS geom
+    FROM tanks t, bounds b
+    WHERE :tanks AND t.active AND t.coordinates && b.geom_4326
+),
+bombs AS (
+    SELECT bo.id_bombs AS id, bo.name, bo.sector_id,
+           ST_AsMVTGeom(ST_Transform(bo.coordinates, 3857), b.geom, :extent, :buffer, true) AS geom
+    FROM bombs bo, bounds b
+    WHERE :bombs AND bo.active AND bo.coordinates && b.geom_4326
+),
+pipes AS (
+    SELECT p.id_pipes AS id, p.material, p.diameter::float8 AS diameter, p.sector_id,
+           ST_AsMVTGeom(ST_Simplify(ST_Transform(p.coordinates, 3857), :tolerance), b.geom, :extent, :buffer, true) AS geom
+    FROM pipes p, bounds b
+    WHERE :pipes AND p.active AND p.coordinates && b.geom_4326
+),
+connections AS (
+    SELECT c.id_connection AS id, c.material, c.connection_type, c.sector_id,
+           ST_AsMVTGeom(ST_Transform(c.coordenates, 3857), b.geom, :extent, :buffer, true) AS geom
+    FROM connections c, bounds b
+    WHERE :connections AND c.active AND c.coordenates && b.geom_4326
+)
+SELECT
+    COALESCE((SELECT ST_AsMVT(tanks.*, 'tanks', :extent, 'geom', 'id') FROM tanks WHERE geom IS NOT NULL), ''::bytea) ||
+    COALESCE((SELECT ST_AsMVT(bombs.*, 'bombs', :extent, 'geom', 'id') FROM bombs WHERE geom IS NOT NULL), ''::bytea) ||
+    COALESCE((SELECT ST_AsMVT(pipes.*, 'pipes', :extent, 'geom', 'id') FROM pipes WHERE geom IS NOT NULL), ''::bytea) ||
+    COALESCE((SELECT ST_AsMVT(connections.*, 'connections', :extent, 'geom', 'id') FROM connections WHERE geom IS NOT NULL), ''::bytea)
+""")
+
+
+def _simplify_tolerance(z: int) -> float:
+    """Tolerancia en metros (EPSG:3857) equivalente a 1 px de una tesela de 256 px"""
+    if z >= SIMPLIFY_MAX_ZOOM:
+        return 0.0
+    return _WEB_MERCATOR_WIDTH / (256 * 2 ** z)
+
+
+def get_tile(db: Session, z: int, x: int, y: int) -> bytes:
+    if not MIN_ZOOM <= z <= MAX_ZOOM or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=400, detail="Coordenadas de tesela inválidas")
+
+    cached = read_tile(z, x, y)
+    if cached is not None:
+        return cached
+
+    # Antes de consultar: si se invalida mientras se renderiza, la tesela no se guarda
+    generation = tile_generation()
+    params = {
+        "z": z, "x": x, "y": y,
+        "extent": TILE_EXTENT,
+        "buffer": TILE_BUFFER,
+        "tolerance": _simplify_tolerance(z),
+        **{layer: z >= min_zoom for layer, min_zoom in LAYER_MIN_ZOOM.items()}
+    }
+    tile = db.execute(_TILE_SQL, params).scalar() or b""
+    tile = bytes(tile)
+    write_tile(z, x, y, tile, generation)
+    return tile
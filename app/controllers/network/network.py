@@ -0,0 +1,82 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.network.graph import network_graph, get_network_graph, KIND_BY_NAME, TANK
+from app.schemas.network.network import NetworkNodeType
+from app.utils.response import existence_response_dict
+
+
+def get_neighbours(db: Session, node_type: NetworkNodeType, entity_id: int, only_active: bool = True):
+    graph = get_network_graph(db)
+    neighbours = graph.neighbours(KIND_BY_NAME[node_type.value], entity_id, only_active)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail=existence_response_dict(False, "El elemento no existe en la red"))
+    return {
+        "node": {"type": node_type.value, "id": entity_id},
+        "neighbours": neighbours
+    }
+
+
+def get_components(db: Session, only_active: bool = True):
+    graph = get_network_graph(db)
+    components = graph.components(only_active)
+    return {
+        "total_components": len(components),
+        "components": [
+            {
+                "size": sum(len(ids) for ids in component.values()),
+                "tanks": component["tank"],
+                "bombs": component["bomb"],
+                "pipes": component["pipe"],
+                "connections": component["connection"]
+            }
+            for component in components
+        ]
+    }
+
+
+def get_reachable_from_tank(db: Session, tank_id: int, only_active: bool = True):
+    graph = get_network_graph(db)
+    reachable = graph.reachable_from(TANK, tank_id, only_active)
+    if reachable is None:
+        raise HTTPException(status_code=404, detail=existence_response_dict(False, "El tanque no existe"))
+    return {
+        "tank_id": tank_id,
+        "tanks": reachable["tank"],
+        "bombs": reachable["bomb"],
+        "pipes": reachable["pipe"],
+        "connections": reachable["connection"]
+    }
+
+
+def get_graph_stats(db: Session):
+    return get_network_graph(db).stats()
+
+
+def rebuild_graph(db: Session):
+    network_graph.load(db)
+    return network_graph.stats()
+
+
+def get_trace(db: Session, node_type: NetworkNodeType, entity_id: int):
+    if node_type not in (NetworkNodeType.pipe, NetworkNodeType.connection):
+        raise HTTPException(status_code=400, detail="El trazado solo aplica a tuberías y conexiones")
+
+    graph = get_network_graph(db)
+    trace = graph.trace(KIND_BY_NAME[node_type.value], entity_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=existence_response_dict(False, "El elemento no existe en la red"))
+
+    downstream = trace["downstream"]
+    return {
+        "node": {"type": node_type.value, "id": entity_id},
+        "fed": trace["fed"],
+        "feeding_source": trace["feeding_source"],
+        "upstream": trace["upstream"],
+        "downstream": {
+            "tanks": downstream["tank"],
+            "bombs": downstream["bomb"],
+            "pipes": downstream["pipe"],
+            "connections": downstream["connection"]
+        },
+        "affected_connections": len(downstream["connection"])
+    }
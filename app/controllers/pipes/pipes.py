@@ -2,6 +2,7 @@ from fastapi import HTTPException, APIRouter
 from app.models.pipes.pipes import Pipes
 from app.models.tanks.tanks import Tank
 from app.models.connection.connections import Connection
+from app.models.tanks.tanks_pipes import tank_pipes
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.pipes.pipes import PipesBase, PipesResponse,PipesResponseCreate, PipesUpdate, TankSimple
@@ -12,72 +13,100 @@ from app.utils.response import success_response, error_response, existence_respo
 from app.utils.logger import create_log
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.schemas.user.user import UserLogin
+from app.network.graph import sync_pipe
+from app.utils.tile_cache import entity_bounds, invalidate_entity_tiles
+from app.utils.geometry import point_lon_lat
+from app.utils.pagination import paginate
+from app.utils.fieldsets import parse_fields, project, rows_to_dicts
+from app.utils.spatial import BBox, apply_bbox, apply_line_thinning
 from sqlalchemy.orm import joinedload
 from sqlalchemy import func, or_
 import json
+import orjson
 from geoalchemy2 import WKTElement
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str] = None):
+# Columnas del listado (?fields=); tanks y las conexiones de inicio/fin son campos de relación
+LIST_COLUMNS = {
+    "id_pipes": Pipes.id_pipes,
+    "material": Pipes.material,
+    "diameter": Pipes.diameter,
+    "active": Pipes.active,
+    "size": Pipes.size,
+    "installation_date": Pipes.installation_date,
+    "coordinates": func.ST_AsGeoJSON(Pipes.coordinates),
+    "distance": Pipes.distance,
+    "sector_id": Pipes.sector_id,
+    "observations": Pipes.observations,
+    "created_at": Pipes.created_at,
+    "updated_at": Pipes.updated_at,
+}
+LIST_FIELDS = [*LIST_COLUMNS, "tanks", "start_connection_id", "end_connection_id"]
+
+
+def _tanks_by_pipe(db: Session, pipe_ids: List[int]) -> dict:
+    # Tanques de toda la página en una sola consulta
+    tanks = {pipe_id: [] for pipe_id in pipe_ids}
+    rows = db.query(tank_pipes.c.pipe_id, Tank.id_tank, Tank.name) \
+        .join(Tank, Tank.id_tank == tank_pipes.c.tank_id) \
+        .filter(tank_pipes.c.pipe_id.in_(pipe_ids)) \
+        .order_by(tank_pipes.c.pipe_id, Tank.id_tank).all()
+    for pipe_id, id_tank, name in rows:
+        tanks[pipe_id].append({"id_tank": id_tank, "name": name})
+    return tanks
+
+
+def _tanks_by_ids(db: Session, tank_ids: List[int]) -> List[Tank]:
+    # Tanques existentes en el orden recibido; los ids inexistentes se ignoran
+    if not tank_ids:
+        return []
+    found = {tank.id_tank: tank for tank in db.query(Tank).filter(Tank.id_tank.in_(set(tank_ids))).all()}
+    return [found[tank_id] for tank_id in dict.fromkeys(tank_ids) if tank_id in found]
+
+
+def get_all(db: Session, page: int, limit: int, search: Optional[str] = None, bbox: Optional[BBox] = None, zoom: Optional[int] = None, cursor: Optional[str] = None, total_mode: str = "exact", fields: Optional[str] = None):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
-
-    offset = (page - 1) * limit
     
-    # Construir query base con coordenadas
-    query = db.query(
-        Pipes,
-        func.ST_AsGeoJSON(Pipes.coordinates).label("geometry")
-    ).options(joinedload(Pipes.tanks))
+    # Solo las columnas pedidas van al SELECT
+    selected = parse_fields(fields, LIST_FIELDS, "id_pipes")
+    query = project(db, LIST_COLUMNS, selected)
     
     # Aplicar búsqueda si se proporciona
     if search and search.strip():
+        # ILIKE directo sobre la columna para que lo atiendan los índices trigram
         search_term = f"%{search.strip().lower()}%"
         query = query.filter(
             or_(
-                func.lower(Pipes.material).like(search_term),
-                func.lower(func.coalesce(Pipes.observations, '')).like(search_term)
-            )
-        )
-    
-    # Contar total antes de paginar (necesitamos una query separada para el count)
-    count_query = db.query(Pipes)
-    if search and search.strip():
-        search_term = f"%{search.strip().lower()}%"
-        count_query = count_query.filter(
-            or_(
-                func.lower(Pipes.material).like(search_term),
-                func.lower(func.coalesce(Pipes.observations, '')).like(search_term)
+                Pipes.material.ilike(search_term),
+                Pipes.observations.ilike(search_term)
             )
         )
-    total = count_query.count()
     
-    # Aplicar paginación
-    pipes = query.order_by(Pipes.id_pipes.desc()).offset(offset).limit(limit).all()
+    # Modo viewport: solo lo que intersecta el bbox, sin tramos invisibles en zoom bajo
+    query = apply_line_thinning(apply_bbox(query, Pipes.coordinates, bbox), Pipes.coordinates, zoom)
+
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip()) or bbox is not None or zoom is not None
+    pipes, total, page_info = paginate(query, Pipes.id_pipes, page, limit, cursor, total_mode, filtered)
 
     # Si no hay resultados pero hay búsqueda, no es un error, solo no hay coincidencias
-    if not pipes and not search:
+    if not pipes and not search and bbox is None and not cursor:
         raise HTTPException(status_code=404, detail=existence_response_dict(False, "No hay tuberías registradas"))
 
-    result = []
-    for pipe, geojson in pipes:
-        coords = json.loads(geojson)["coordinates"]
-        result.append({
-            "id_pipes": pipe.id_pipes,
-            "material": pipe.material,
-            "diameter": pipe.diameter,
-            "active": pipe.active,
-            "size": pipe.size,
-            "installation_date": pipe.installation_date,
-            "coordinates": coords,
-            "distance": pipe.distance,  
-            "sector_id": pipe.sector_id,
-            "observations": pipe.observations,
-            "created_at": pipe.created_at,
-            "updated_at": pipe.updated_at,
-            "tanks": [{"id_tank": t.id_tank, "name": t.name} for t in pipe.tanks]
-        })
-
-    return result, total
+    # Filas listas para ORJSONResponse, con las mismas llaves que PipesResponse
+    result = rows_to_dicts(pipes, LIST_COLUMNS, selected)
+    tanks = _tanks_by_pipe(db, [row["id_pipes"] for row in result]) if "tanks" in selected and result else {}
+    for row in result:
+        if "coordinates" in row:
+            row["coordinates"] = orjson.loads(row["coordinates"])["coordinates"] if row["coordinates"] else []
+        if "tanks" in selected:
+            row["tanks"] = tanks[row["id_pipes"]]
+        if "start_connection_id" in selected:
+            row["start_connection_id"] = None
+        if "end_connection_id" in selected:
+            row["end_connection_id"] = None
+
+    return result, total, page_info
 
 def get_by_id(db: Session, pipe_id: int):
     result = db.query(
@@ -110,8 +139,7 @@ def get_by_id(db: Session, pipe_id: int):
             if start_coord and end_coord:
                 conn_data = []
                 for conn in conn_list:
-                    conn_lon = db.scalar(func.ST_X(conn.coordenates))
-                    conn_lat = db.scalar(func.ST_Y(conn.coordenates))
+                    conn_lon, conn_lat = point_lon_lat(conn.coordenates)
                     conn_data.append({
                         'id': conn.id_connection,
                         'lon': conn_lon,
@@ -178,8 +206,7 @@ def create(db: Session, pipe_data: PipesBase, current_user: UserLogin):
             start_conn = db.query(Connection).filter(Connection.id_connection == pipe_data.start_connection_id).first()
             if not start_conn:
                 raise HTTPException(status_code=404, detail="La conexión de inicio no existe")
-            start_lon = db.scalar(func.ST_X(start_conn.coordenates))
-            start_lat = db.scalar(func.ST_Y(start_conn.coordenates))
+            start_lon, start_lat = point_lon_lat(start_conn.coordenates)
             final_coordinates[0] = (start_lon, start_lat)
         
         # Si hay end_connection_id, obtener sus coordenadas
@@ -187,8 +214,7 @@ def create(db: Session, pipe_data: PipesBase, current_user: UserLogin):
             end_conn = db.query(Connection).filter(Connection.id_connection == pipe_data.end_connection_id).first()
             if not end_conn:
                 raise HTTPException(status_code=404, detail="La conexión de fin no existe")
-            end_lon = db.scalar(func.ST_X(end_conn.coordenates))
-            end_lat = db.scalar(func.ST_Y(end_conn.coordenates))
+            end_lon, end_lat = point_lon_lat(end_conn.coordenates)
             final_coordinates[1] = (end_lon, end_lat)
 
         # Construir LINESTRING con los 2 puntos
@@ -214,11 +240,8 @@ def create(db: Session, pipe_data: PipesBase, current_user: UserLogin):
             updated_at=datetime.utcnow()
         )   
 
-        # Asociar tanques
-        for tank_id in pipe_data.tank_ids:
-            tank = db.query(Tank).filter(Tank.id_tank == tank_id).first()
-            if tank:
-                new_pipe.tanks.append(tank)
+        # Asociar tanques (una sola consulta para todos los ids)
+        new_pipe.tanks.extend(_tanks_by_ids(db, pipe_data.tank_ids))
 
         # Asociar conexiones si se proporcionaron
         if pipe_data.start_connection_id:
@@ -236,6 +259,8 @@ def create(db: Session, pipe_data: PipesBase, current_user: UserLogin):
         db.add(new_pipe)
         db.commit()
         db.refresh(new_pipe)
+        sync_pipe(new_pipe)
+        invalidate_entity_tiles(db, Pipes, new_pipe.id_pipes)
 
         create_log(
             db,
@@ -275,6 +300,9 @@ def update(db: Session, pipe_id: int, pipe_data: PipesUpdate, current_user: User
     if not pipe:
         raise HTTPException(status_code=404, detail=existence_response_dict(False, "La tubería no existe"))
 
+    # Rectángulo de la geometría anterior, para invalidar sus teselas si se mueve
+    previous_bounds = entity_bounds(db, Pipes, pipe_id)
+
     try:
         data = pipe_data.dict(exclude_unset=True)
 
@@ -295,8 +323,7 @@ def update(db: Session, pipe_id: int, pipe_data: PipesUpdate, current_user: User
             start_conn = db.query(Connection).filter(Connection.id_connection == data["start_connection_id"]).first()
             if not start_conn:
                 raise HTTPException(status_code=404, detail="La conexión de inicio no existe")
-            start_lon = db.scalar(func.ST_X(start_conn.coordenates))
-            start_lat = db.scalar(func.ST_Y(start_conn.coordenates))
+            start_lon, start_lat = point_lon_lat(start_conn.coordenates)
             if final_coordinates:
                 final_coordinates[0] = (start_lon, start_lat)
             else:
@@ -312,8 +339,7 @@ def update(db: Session, pipe_id: int, pipe_data: PipesUpdate, current_user: User
             end_conn = db.query(Connection).filter(Connection.id_connection == data["end_connection_id"]).first()
             if not end_conn:
                 raise HTTPException(status_code=404, detail="La conexión de fin no existe")
-            end_lon = db.scalar(func.ST_X(end_conn.coordenates))
-            end_lat = db.scalar(func.ST_Y(end_conn.coordenates))
+            end_lon, end_lat = point_lon_lat(end_conn.coordenates)
             if final_coordinates:
                 final_coordinates[1] = (end_lon, end_lat)
             else:
@@ -345,10 +371,7 @@ def update(db: Session, pipe_id: int, pipe_data: PipesUpdate, current_user: User
         # Actualizar tanques
         if "tank_ids" in data:
             pipe.tanks.clear()
-            for tank_id in data["tank_ids"]:
-                tank = db.query(Tank).filter(Tank.id_tank == tank_id).first()
-                if tank:
-                    pipe.tanks.append(tank)
+            pipe.tanks.extend(_tanks_by_ids(db, data["tank_ids"]))
             data.pop("tank_ids", None)
 
         # Actualizar conexiones si se proporcionan
@@ -374,6 +397,8 @@ def update(db: Session, pipe_id: int, pipe_data: PipesUpdate, current_user: User
         pipe.updated_at = datetime.now()
         db.commit()
         db.refresh(pipe)
+        sync_pipe(pipe)
+        invalidate_entity_tiles(db, Pipes, pipe.id_pipes, previous_bounds)
 
         # Obtener coordenadas actualizadas en formato GeoJSON
         geometry = db.query(func.ST_AsGeoJSON(Pipes.coordinates).label("geometry")) \
@@ -424,6 +449,8 @@ def toggle_state(db: Session, pipe_id: int,current_user: UserLogin):
 
     db.commit()
     db.refresh(pipe)
+    sync_pipe(pipe)
+    invalidate_entity_tiles(db, Pipes, pipe.id_pipes)
     state = ""
     if pipe.active is False:
         state = "inactivo"
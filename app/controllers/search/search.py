@@ -0,0 +1,141 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Optional
+from app.utils.permissions import permission_registry
+
+# Fuentes de la búsqueda unificada: cada una filtra con ILIKE sobre columnas
+# con índice trigram (migraciones trigram_search_indexes y data_upload_index_audit)
+# y ordena por word_similarity con el texto buscado. `permission` es el mismo
+# permiso que exige el listado de esa entidad (require_permission).
+SEARCH_SOURCES = {
+    "pipe": {
+        "table": "pipes",
+        "id": "id_pipes",
+        "label": "material",
+        "detail": "observations",
+        "permission": "leer_tuberias",
+        "columns": ["material", "observations"],
+    },
+    "connection": {
+        "table": "connections",
+        "id": "id_connection",
+        "label": "COALESCE(connection_type, material)",
+        "detail": "description",
+        "permission": "leer_conexiones",
+        "columns": ["material", "connection_type", "pressure_nominal", "installed_by", "description"],
+    },
+    "tank": {
+        "table": "tanks",
+        "id": "id_tank",
+        "label": "name",
+        "detail": "connections",
+        "permission": "leer_tanques",
+        "columns": ["name", "connections"],
+    },
+    "bomb": {
+        "table": "bombs",
+        "id": "id_bombs",
+        "label": "name",
+        "detail": "connections",
+        "columns": ["name", "connections"],
+    },
+    "sector": {
+        "table": "sectors",
+        "id": "id_sector",
+        "label": "name",
+        "detail": "description",
+        "columns": ["name", "description"],
+    },
+    "intervention": {
+        "table": "interventions",
+        "id": "id_interventions",
+        "label": "description",
+        "detail": "status",
+        "permission": "leer_intervenciones",
+        "columns": ["description"],
+    },
+    "taxpayer": {
+        "table": "data_upload",
+        "id": "identifier",
+        "label": "taxpayer",
+        "detail": "cologne",
+        "columns": ["taxpayer"],
+    },
+}
+
+SEARCH_MIN_LENGTH = 3
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _source_sql(entity_type: str, source: dict) -> str:
+    # Cada rama trae sus mejores :limit filas; el orden final es global
+    columns = source["columns"]
+    score = ", ".join(f"word_similarity(:q, {column})" for column in columns)
+    where = " OR ".join(f"{column} ILIKE :pattern" for column in columns)
+    return (
+        f"(SELECT '{entity_type}' AS type, {source['id']}::text AS id, "
+        f"{source['label']}::text AS label, {source['detail']}::text AS detail, "
+        f"GREATEST({score}) AS score "
+        f"FROM {source['table']} WHERE {where} "
+        f"ORDER BY score DESC LIMIT :limit)"
+    )
+
+
+def readable_types(permission_mask: int) -> List[str]:
+    """Tipos que el usuario puede consultar según la máscara de permisos de su rol"""
+    return [
+        entity_type for entity_type, source in SEARCH_SOURCES.items()
+        if "permission" not in source or permission_mask & permission_registry.bit(source["permission"])
+    ]
+
+
+def search_entities(db: Session, q: str, limit: int = 20, types: Optional[List[str]] = None, permission_mask: int = 0):
+    q = (q or "").strip()
+    if len(q) < SEARCH_MIN_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"La búsqueda debe tener al menos {SEARCH_MIN_LENGTH} caracteres"
+        )
+
+    unknown = [entity_type for entity_type in types or [] if entity_type not in SEARCH_SOURCES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tipos de búsqueda no válidos: {', '.join(unknown)}"
+        )
+
+    # Sin ?types= se busca en lo que el usuario puede leer; pedir un tipo sin permiso es 403
+    readable = readable_types(permission_mask)
+    forbidden = [entity_type for entity_type in types or [] if entity_type not in readable]
+    if forbidden:
+        raise HTTPException(
+            status_code=403,
+            detail=f"No tiene permiso para buscar: {', '.join(forbidden)}"
+        )
+    selected = types or readable
+
+    # Una sola consulta: UNION ALL de todas las fuentes ordenado por similitud
+    sql = (
+        " UNION ALL ".join(_source_sql(entity_type, SEARCH_SOURCES[entity_type]) for entity_type in selected)
+        + " ORDER BY score DESC, type, id LIMIT :limit"
+    )
+    rows = db.execute(text(sql), {
+        "q": q,
+        "pattern": f"%{_escape_like(q)}%",
+        "limit": limit
+    }).mappings().all()
+
+    return [
+        {
+            "type": row["type"],
+            "id": row["id"],
+            "label": row["label"],
+            "detail": row["detail"],
+            "score": round(float(row["score"] or 0), 4)
+        }
+        for row in rows
+    ]
@@ -4,32 +4,31 @@ from typing import Optional
 from datetime import datetime
 from app.schemas.sector.sector import SectorBase, SectorUpdate
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 from app.utils.response import existence_response_dict
+from app.utils.pagination import paginate
 from app.utils.logger import create_log
 from app.schemas.user.user import UserLogin
 
-def get_all(db: Session, page: int, limit: int, search: Optional[str]=None):
+def get_all(db: Session, page: int, limit: int, search: Optional[str]=None, cursor: Optional[str]=None, total_mode: str="exact"):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="La página y el límite deben ser mayores que 0")
     
-    offset = (page - 1 ) * limit
-    
     query = db.query(Sector)
     
     if search and search.strip():
         search_term = f"%{search.strip().lower()}%"
         query = query.filter(
             or_(
-                func.lower(Sector.name).like(search_term),
-                func.lower(func.coalesce(Sector.description, '')).like(search_term)
+                Sector.name.ilike(search_term),
+                Sector.description.ilike(search_term)
             )
         )
-    total = query.count()
-    
-    sectors = query.order_by(Sector.id_sector.desc()).offset(offset).limit(limit).all()
+    # Página y total en una sola consulta (o keyset si viene cursor)
+    filtered = bool(search and search.strip())
+    sectors, total, page_info = paginate(query, Sector.id_sector, page, limit, cursor, total_mode, filtered)
     
-    if not sectors and not search:
+    if not sectors and not search and not cursor:
         raise HTTPException(
             status_code=404,
             detail=existence_response_dict(False, "No hay sectores disponibles"),
@@ -48,7 +47,7 @@ def get_all(db: Session, page: int, limit: int, search: Optional[str]=None):
         for s in sectors
     ]
     
-    return sector_list, total
+    return sector_list, total, page_info
 
 def get_by_id(db: Session, sector_id: int):
     sector = db.query(Sector).filter(Sector.id_sector == sector_id).first()
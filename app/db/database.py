@@ -1,6 +1,12 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, DDL
+from anyio import CapacityLimiter, to_thread
+from app.utils.response import dump_as
+from app.db.pool_metrics import MeteredQueuePool, MeteredAsyncQueuePool, pool_settings_from_env
+from functools import partial
 from dotenv  import load_dotenv
 import os
 
@@ -10,13 +16,64 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL no está configurada en el entorno")
 
-engine = create_engine(DATABASE_URL)
+# Configuración del pool (por proceso worker), ver app/db/pool_metrics.py
+POOL_SETTINGS = pool_settings_from_env()
+
+engine = create_engine(DATABASE_URL, poolclass=MeteredQueuePool, **POOL_SETTINGS)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+# Los índices gin_trgm_ops de los modelos necesitan pg_trgm antes de crear las tablas con create_all
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ----- Acceso asíncrono -----
+def _build_async_url(url: str):
+    """Convierte la DATABASE_URL síncrona (psycopg2) a una URL para asyncpg"""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    # asyncpg no entiende 'sslmode', usa 'ssl' con los mismos valores
+    query = dict(async_url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+        async_url = async_url.set(query=query)
+    return async_url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _build_async_url(DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=MeteredAsyncQueuePool, **POOL_SETTINGS)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ----- Compatibilidad para controladores síncronos -----
+# Los controladores que aún usan Session se ejecutan en un pool de hilos acotado
+# para no bloquear el event loop ni agotar las conexiones del pool.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "20"))
+db_thread_limiter = CapacityLimiter(DB_THREADPOOL_SIZE)
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Ejecuta un controlador síncrono en el pool de hilos de base de datos"""
+    return await to_thread.run_sync(partial(func, *args, **kwargs), limiter=db_thread_limiter)
+
+async def run_in_db_thread_as(schema, func, *args, **kwargs):
+    """
+    Como run_in_db_thread, pero serializa el resultado con `schema` en el mismo hilo:
+    model_validate lee atributos y relaciones lazy del ORM, que pueden consultar la BD
+    """
+    def call():
+        return dump_as(schema, func(*args, **kwargs))
+    return await to_thread.run_sync(call, limiter=db_thread_limiter)
@@ -0,0 +1,135 @@
+"""
+Telemetría del pool de conexiones
+Mide cuánto esperan las peticiones por una conexión y cuántas veces se usa el overflow
+"""
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from contextvars import ContextVar
+import threading
+import time
+import os
+
+# Límites superiores (ms) de los buckets del histograma de espera
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Acumula métricas de checkout de un pool (seguro entre hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.overflow_events = 0
+            self.timeouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, wait_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            for idx, limit in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= limit:
+                    self.wait_histogram[idx] += 1
+                    break
+            else:
+                self.wait_histogram[-1] += 1
+
+    def record_overflow(self):
+        with self._lock:
+            self.overflow_events += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histogram = {f"le_{limit}ms": count for limit, count in zip(WAIT_BUCKETS_MS, self.wait_histogram)}
+            histogram["gt_5000ms"] = self.wait_histogram[-1]
+            return {
+                "checkouts": self.checkouts,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "wait_histogram": histogram
+            }
+
+
+# QueuePool._do_get se llama a sí mismo al reintentar; solo se mide la llamada externa
+_checkout_in_progress: ContextVar[bool] = ContextVar("pool_checkout_in_progress", default=False)
+
+
+class _MeteredPoolMixin:
+    """Mide el tiempo de espera de cada checkout y los eventos de overflow"""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        if _checkout_in_progress.get():
+            return super()._do_get()
+        token = _checkout_in_progress.set(True)
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        finally:
+            _checkout_in_progress.reset(token)
+        self.metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return conn
+
+    def _inc_overflow(self) -> bool:
+        # Igual que QueuePool._inc_overflow, pero decide si la conexión nueva es de
+        # overflow con el mismo lock que incrementa el contador (overflow > 0 = más allá de pool_size)
+        with self._overflow_lock:
+            if self._max_overflow != -1 and self._overflow >= self._max_overflow:
+                return False
+            self._overflow += 1
+            used_overflow = self._overflow > 0
+        if used_overflow:
+            self.metrics.record_overflow()
+        return True
+
+
+def metered_pool_class(base_class, metrics: PoolMetrics):
+    """Crea una clase de pool que reporta a `metrics`"""
+    return type(f"Metered{base_class.__name__}", (_MeteredPoolMixin, base_class), {"metrics": metrics})
+
+
+def pool_settings_from_env() -> dict:
+    """Configuración del pool desde variables de entorno"""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+    }
+
+
+def pool_status(engine, metrics: PoolMetrics) -> dict:
+    """Estado actual del pool más las métricas acumuladas"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **metrics.snapshot()
+    }
+
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+MeteredQueuePool = metered_pool_class(QueuePool, sync_pool_metrics)
+MeteredAsyncQueuePool = metered_pool_class(AsyncAdaptedQueuePool, async_pool_metrics)
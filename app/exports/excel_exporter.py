@@ -3,9 +3,10 @@ Exportador de Excel con formato profesional
 Genera archivos Excel con diseño del sistema aplicado
 """
 from io import BytesIO
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Union, BinaryIO
 from datetime import datetime
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 from app.exports.formatters import ExcelFormatters
@@ -191,128 +192,214 @@ class ExcelExporter:
         
         return current_row + 1  # Retornar la siguiente fila para los datos
     
-    def export_logs(
+    # Columnas del reporte de logs: (encabezado, ancho, centrado)
+    LOG_COLUMNS = [
+        ('ID', 10, True),
+        ('Fecha', 20, True),
+        ('Usuario', 20, False),
+        ('Acción', 15, False),
+        ('Entidad', 15, False),
+        ('ID Entidad', 12, True),
+        ('Descripción', 50, False),
+    ]
+    
+    def register_named_styles(self, wb: Workbook) -> Dict[str, str]:
+        """
+        Registra los estilos del reporte como NamedStyle en el workbook.
+        Las celdas solo guardan el nombre del estilo, en vez de copiar
+        fill/font/border/alignment uno por uno en cada celda.
+        """
+        header_style = self.formatters.get_header_style()
+        info_style = self.formatters.get_info_style()
+        styles = {
+            'title': self.formatters.named_style('sig_title', self.formatters.get_title_style()),
+            'info': self.formatters.named_style('sig_info', info_style),
+            'separator': self.formatters.named_style('sig_separator', {}, fill=PatternFill(
+                start_color=ExcelFormatters.GRAY_MEDIUM,
+                end_color=ExcelFormatters.GRAY_MEDIUM,
+                fill_type="solid"
+            )),
+            'header': self.formatters.named_style('sig_header', header_style),
+        }
+        center = Alignment(horizontal="center", vertical="center")
+        for alternate in (False, True):
+            data_style = self.formatters.get_data_style(alternate=alternate)
+            suffix = 'alt' if alternate else 'base'
+            styles[f'data_{suffix}'] = self.formatters.named_style(f'sig_data_{suffix}', data_style)
+            styles[f'data_{suffix}_center'] = self.formatters.named_style(
+                f'sig_data_{suffix}_center', data_style, alignment=center
+            )
+        
+        for style in styles.values():
+            wb.add_named_style(style)
+        return {key: style.name for key, style in styles.items()}
+    
+    def _styled_row(self, ws, values: List[Any], style: str, start_column: int = 1) -> List[Any]:
+        """Fila para hojas write-only: None para las columnas vacías y WriteOnlyCell con estilo"""
+        row = [None] * (start_column - 1)
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            row.append(cell)
+        return row
+    
+    def _write_report_header(
         self,
-        logs: List[Any],
+        ws,
+        styles: Dict[str, str],
+        entity_name: str,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        user_name: Optional[str] = None
+    ) -> int:
+        """Versión write-only de add_report_header; devuelve la fila de los encabezados de tabla"""
+        entity_spanish = self.translate_entity(entity_name)
+        info_lines = [f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"]
+        
+        if date_start and date_end:
+            try:
+                start_date = datetime.fromisoformat(date_start.replace('Z', '+00:00'))
+                end_date = datetime.fromisoformat(date_end.replace('Z', '+00:00'))
+                info_lines.append(f"Período: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}")
+            except ValueError:
+                pass
+        
+        if user_name:
+            info_lines.append(f"Generado por: {user_name}")
+        
+        # En modo write-only las alturas y combinaciones se declaran antes de escribir cada fila
+        ws.row_dimensions[1].height = 35
+        ws.merged_cells.add('B1:G1')
+        ws.append(self._styled_row(ws, [f"REPORTE DE LOGS - {entity_spanish.upper()}"], styles['title'], start_column=2))
+        ws.append([])
+        
+        current_row = 3
+        for line in info_lines:
+            ws.row_dimensions[current_row].height = 20
+            ws.merged_cells.add(f'B{current_row}:G{current_row}')
+            ws.append(self._styled_row(ws, [line], styles['info'], start_column=2))
+            current_row += 1
+        
+        # Línea separadora
+        ws.append([])
+        current_row += 1
+        ws.row_dimensions[current_row].height = 3
+        ws.merged_cells.add(f'B{current_row}:G{current_row}')
+        ws.append(self._styled_row(ws, [""], styles['separator'], start_column=2))
+        
+        return current_row + 1
+    
+    def _log_values(self, log: Any) -> List[Any]:
+        """Valores de una fila del reporte; acepta objetos Logs o filas con columna `username`"""
+        if hasattr(log, 'username'):
+            username = log.username or ""
+        else:
+            username = ""
+            if hasattr(log, 'user') and log.user:
+                username = getattr(log.user, 'user', '')
+        
+        return [
+            log.log_id,
+            self.formatters.format_date(log.created_at),
+            username,
+            self.formatters.format_text(log.action),
+            self.formatters.format_text(log.entity),
+            log.entity_id if log.entity_id else "",
+            self.formatters.format_text(log.description)
+        ]
+    
+    def export_logs_streaming(
+        self,
+        logs: Iterable[Any],
+        output: Union[str, BinaryIO],
         filters: Dict[str, Any] = None,
         user_info: Dict[str, Any] = None
-    ) -> BytesIO:
+    ) -> int:
         """
-        Exporta logs a Excel con formato profesional
+        Exporta logs a Excel en modo write-only (memoria constante)
+        
+        Las filas se escriben a medida que llegan del iterable, así que `logs`
+        puede ser una consulta con yield_per. Los anchos de columna son fijos
+        porque el XML de la hoja declara <cols> antes de las filas.
         
         Args:
-            logs: Lista de objetos Logs
+            logs: Iterable de objetos Logs o filas con `username`
+            output: Ruta o archivo binario donde se guarda el .xlsx
             filters: Diccionario con filtros aplicados
             user_info: Información del usuario que genera el reporte
         
         Returns:
-            BytesIO: Buffer con el archivo Excel
+            int: Número de filas de datos escritas
         """
-        wb = self.create_workbook()
-        ws = wb.active
-        ws.title = "Reportes"
+        wb = Workbook(write_only=True)
+        styles = self.register_named_styles(wb)
+        ws = wb.create_sheet("Reportes")
+        
+        for col_idx, (_, width, _) in enumerate(self.LOG_COLUMNS, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        # Altura de las filas de datos como valor por defecto de la hoja, sin una entrada por fila
+        ws.sheet_format.defaultRowHeight = 18
+        ws.sheet_format.customHeight = True
         
-        # Obtener información para el encabezado
         entity_name = filters.get('name_entity', 'Sistema') if filters else 'Sistema'
         date_start = filters.get('date_start') if filters else None
         date_end = filters.get('date_finish') if filters else None
         user_name = user_info.get('username', 'Usuario') if user_info else 'Usuario'
         
-        # Agregar encabezado del reporte
-        data_start_row = self.add_report_header(
+        header_row = self._write_report_header(
             ws,
+            styles,
             entity_name=entity_name,
             date_start=date_start,
             date_end=date_end,
             user_name=user_name
         )
         
-        # Definir encabezados de tabla (empezando desde columna A)
-        headers = [
-            'ID',
-            'Fecha',
-            'Usuario',
-            'Acción',
-            'Entidad',
-            'ID Entidad',
-            'Descripción'
-        ]
+        ws.row_dimensions[header_row].height = 25
+        ws.append(self._styled_row(ws, [header for header, _, _ in self.LOG_COLUMNS], styles['header']))
         
-        # Agregar encabezados de tabla (desde columna A)
-        header_row = data_start_row
-        for col_idx, header in enumerate(headers, start=1):
-            cell = ws.cell(row=header_row, column=col_idx)
-            cell.value = header
-        
-        self.apply_header_style(ws, header_row=header_row)
-        
-        # Agregar datos
-        data_row = header_row + 1
-        for log in logs:
-            # Obtener nombre de usuario si existe relación
-            username = ""
-            if hasattr(log, 'user') and log.user:
-                username = getattr(log.user, 'user', '')
-            
-            row_data = [
-                log.log_id,
-                self.formatters.format_date(log.created_at),
-                username,
-                self.formatters.format_text(log.action),
-                self.formatters.format_text(log.entity),
-                log.entity_id if log.entity_id else "",
-                self.formatters.format_text(log.description)
+        # Nombre de estilo por columna, para filas pares e impares
+        column_styles = {
+            alternate: [
+                styles[f"data_{'alt' if alternate else 'base'}{'_center' if centered else ''}"]
+                for _, _, centered in self.LOG_COLUMNS
             ]
-            
-            # Agregar datos fila por fila
-            for col_idx, value in enumerate(row_data, start=1):
-                cell = ws.cell(row=data_row, column=col_idx)
-                cell.value = value
-            
-            data_row += 1
-        
-        # Aplicar formato a datos
-        if data_row > header_row + 1:
-            self.apply_data_formatting(ws, start_row=header_row + 1, end_row=data_row - 1)
-        
-        # Ajustar columnas automáticamente
-        self.auto_adjust_columns(ws, headers)
-        
-        # Aplicar alineaciones específicas por columna
-        # ID: centro
-        ws.column_dimensions['A'].width = 10
-        for row in ws.iter_rows(min_row=header_row + 1, max_row=ws.max_row, min_col=1, max_col=1):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Fecha: centro
-        ws.column_dimensions['B'].width = 20
-        for row in ws.iter_rows(min_row=header_row + 1, max_row=ws.max_row, min_col=2, max_col=2):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Usuario: izquierda
-        ws.column_dimensions['C'].width = 20
-        
-        # Acción: izquierda
-        ws.column_dimensions['D'].width = 15
+            for alternate in (False, True)
+        }
         
-        # Entidad: izquierda
-        ws.column_dimensions['E'].width = 15
+        count = 0
+        for log in logs:
+            row_styles = column_styles[count % 2 == 0]
+            row = []
+            for value, style in zip(self._log_values(log), row_styles):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.style = style
+                row.append(cell)
+            ws.append(row)
+            count += 1
         
-        # ID Entidad: centro
-        ws.column_dimensions['F'].width = 12
-        for row in ws.iter_rows(min_row=header_row + 1, max_row=ws.max_row, min_col=6, max_col=6):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center", vertical="center")
+        wb.save(output)
+        return count
+    
+    def export_logs(
+        self,
+        logs: List[Any],
+        filters: Dict[str, Any] = None,
+        user_info: Dict[str, Any] = None
+    ) -> BytesIO:
+        """
+        Exporta logs a Excel con formato profesional
         
-        # Descripción: izquierda, más ancha
-        ws.column_dimensions['G'].width = 50
+        Args:
+            logs: Lista de objetos Logs
+            filters: Diccionario con filtros aplicados
+            user_info: Información del usuario que genera el reporte
         
-        # Guardar en memoria
+        Returns:
+            BytesIO: Buffer con el archivo Excel
+        """
         output = BytesIO()
-        wb.save(output)
+        self.export_logs_streaming(logs, output, filters=filters, user_info=user_info)
         output.seek(0)
         
         return output
-
@@ -2,7 +2,7 @@
 Utilidades de formato para exportaciones Excel
 Define colores, estilos y formateo según el diseño del sistema
 """
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 
@@ -168,4 +168,8 @@ class ExcelFormatters:
                 vertical="center"
             )
         }
-
+    
+    @staticmethod
+    def named_style(name, style, **overrides):
+        """Convierte un diccionario de estilo en NamedStyle (se registra una vez por workbook)"""
+        return NamedStyle(name=name, **{**style, **overrides})
@@ -0,0 +1,5 @@
+from app.jobs.store import (
+    JobStore, STATUS_PENDING, STATUS_RUNNING, STATUS_COMPLETED, STATUS_FAILED
+)
+from app.jobs.runner import submit_report_job, shutdown_executor
+from app.jobs.uploads import submit_upload_job
@@ -0,0 +1,88 @@
+"""
+Reportes que se pueden ejecutar como trabajo en segundo plano
+Los parámetros de cada reporte se leen de la firma de su controlador.
+"""
+from fastapi import HTTPException
+from app.controllers.Report.report import (
+    export_logs_to_excel_controller,
+    get_logs_summary_controller,
+    get_logs_detail_controller,
+    report_pipes_by_sector,
+    report_interventions_by_pipes,
+    report_interventions_by_connections,
+    report_sector_comparative,
+    report_interventions,
+    report_interventions_by_sector,
+    report_intervention_frequency,
+    report_tanks,
+    report_tank_status,
+    report_assigned_jobs,
+    report_assigned_jobs_by_status,
+    report_deviations,
+    report_encargados_limpieza,
+    report_readers,
+    report_top_cleaners,
+    report_top_operators,
+    report_top_plumbers,
+    report_top_readers,
+    report_operator,
+    report_plumber
+)
+import inspect
+
+REPORTS = {
+    "logs_excel": export_logs_to_excel_controller,
+    "logs_summary": get_logs_summary_controller,
+    "logs_detail": get_logs_detail_controller,
+    "pipes_by_sector": report_pipes_by_sector,
+    "interventions_by_pipes": report_interventions_by_pipes,
+    "interventions_by_connections": report_interventions_by_connections,
+    "sector_comparative": report_sector_comparative,
+    "interventions": report_interventions,
+    "interventions_by_sector": report_interventions_by_sector,
+    "intervention_frequency": report_intervention_frequency,
+    "tanks": report_tanks,
+    "tank_status": report_tank_status,
+    "assigned_jobs": report_assigned_jobs,
+    "assigned_jobs_by_status": report_assigned_jobs_by_status,
+    "deviations": report_deviations,
+    "cleaners": report_encargados_limpieza,
+    "readers": report_readers,
+    "top_cleaners": report_top_cleaners,
+    "top_operators": report_top_operators,
+    "top_plumbers": report_top_plumbers,
+    "top_readers": report_top_readers,
+    "operator": report_operator,
+    "plumber": report_plumber,
+}
+
+# Parámetros que pone el servidor, no el cliente
+_SERVER_PARAMS = {"db", "user_info"}
+
+
+def report_params(name: str) -> dict:
+    """{parámetro: requerido} según la firma del controlador"""
+    signature = inspect.signature(REPORTS[name])
+    return {
+        param.name: param.default is inspect.Parameter.empty
+        for param in signature.parameters.values()
+        if param.name not in _SERVER_PARAMS
+    }
+
+
+def validate_report_params(name: str, params: dict) -> dict:
+    if name not in REPORTS:
+        raise HTTPException(status_code=400, detail=f"Reporte desconocido: {name}")
+
+    expected = report_params(name)
+    unknown = set(params) - set(expected)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Parámetros no válidos: {', '.join(sorted(unknown))}")
+    missing = [param for param, required in expected.items() if required and param not in params]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Faltan parámetros: {', '.join(missing)}")
+    return params
+
+
+def available_reports() -> list:
+    return [{"report": name, "params": report_params(name)} for name in REPORTS]
@@ -0,0 +1,139 @@
+"""
+Ejecución de reportes en un pool de procesos
+Los reportes (y openpyxl) corren fuera de los workers de la API para no
+competir por su GIL. Los procesos hijos escriben el progreso en el JobStore.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi.encoders import jsonable_encoder
+from fastapi import HTTPException
+from geoalchemy2.elements import WKBElement
+from sqlalchemy import inspect as sa_inspect
+from typing import Optional
+from io import BytesIO
+import multiprocessing
+import threading
+import json
+import os
+from app.jobs.store import JobStore, STATUS_PENDING, STATUS_RUNNING
+from app.utils.geometry import to_wkt
+from app.db.database import Base
+
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _orm_to_dict(instance) -> dict:
+    return {attr.key: getattr(instance, attr.key) for attr in sa_inspect(instance).mapper.column_attrs}
+
+
+def _serialize(result) -> bytes:
+    encoded = jsonable_encoder(result, custom_encoder={Base: _orm_to_dict, WKBElement: to_wkt})
+    # Los modelos ORM se convierten en dict y se vuelven a codificar (fechas, Decimal)
+    encoded = jsonable_encoder(encoded, custom_encoder={WKBElement: to_wkt})
+    return json.dumps(encoded, ensure_ascii=False).encode()
+
+
+def _execute_report(job_id: str, name: str, params: dict, user_info: Optional[dict]):
+    """Punto de entrada en el proceso hijo"""
+    from app.db.database import SessionLocal
+    from app.jobs.reports import REPORTS
+
+    store = JobStore()
+    store.start(job_id, "Generando reporte")
+    db = SessionLocal()
+    try:
+        report = REPORTS[name]
+        if name == "logs_excel":
+            params = {**params, "user_info": user_info}
+        result = report(db, **params)
+        store.progress(job_id, 90, "Guardando resultado")
+
+        if name == "logs_excel":
+            # El controller devuelve la ruta del .xlsx temporal
+            artifact = store.save_artifact_file(job_id, result, "xlsx")
+        elif isinstance(result, BytesIO):
+            artifact = store.save_artifact(job_id, result.getvalue(), "xlsx")
+        else:
+            artifact = store.save_artifact(job_id, _serialize(result), "json")
+        store.complete(job_id, artifact, "Reporte generado correctamente")
+    except HTTPException as e:
+        store.fail(job_id, str(e.detail))
+    except Exception as e:
+        store.fail(job_id, str(e))
+    finally:
+        db.close()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        # Un hijo que muere (OOM, segfault) deja el pool roto: se reemplaza por uno nuevo
+        if _executor is not None and getattr(_executor, "_broken", False):
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            # spawn: el hijo no hereda hilos ni conexiones abiertas del worker de la API
+            _executor = ProcessPoolExecutor(
+                max_workers=REPORT_JOB_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _on_done(job_id: str):
+    def callback(future):
+        # Si el proceso hijo murió sin registrar el resultado, se marca el trabajo como fallido
+        error = future.exception()
+        if error is not None:
+            store = JobStore()
+            job = store.get(job_id)
+            if job and job["status"] in (STATUS_PENDING, STATUS_RUNNING):
+                store.fail(job_id, f"El proceso del trabajo terminó inesperadamente: {error}")
+    return callback
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def submit_job(job_id: str, fn, *args):
+    """
+    Encola `fn` en el pool de procesos. Si el pool quedó roto entre la
+    verificación de get_executor y el submit, se recrea y se reintenta una
+    vez; si tampoco se puede encolar, el trabajo queda como fallido.
+    """
+    executor = get_executor()
+    try:
+        try:
+            future = executor.submit(fn, job_id, *args)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            future = get_executor().submit(fn, job_id, *args)
+    except Exception as e:
+        JobStore().fail(job_id, f"No se pudo encolar el trabajo: {e}")
+        raise
+    future.add_done_callback(_on_done(job_id))
+    return future
+
+
+def submit_report_job(name: str, params: dict, user_id: Optional[int], user_info: Optional[dict] = None) -> dict:
+    store = JobStore()
+    store.purge_expired()
+    job = store.create("report", name, params, user_id)
+    submit_job(job["id"], _execute_report, name, params, user_info)
+    return job
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
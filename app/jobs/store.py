@@ -0,0 +1,128 @@
+"""
+Almacén de trabajos en segundo plano
+Cada trabajo es un archivo JSON con su estado y, al terminar, un artefacto
+({id}.json o {id}.xlsx). Al vivir en disco lo comparten todos los workers
+de la API y los procesos que ejecutan los trabajos.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import tempfile
+import shutil
+import json
+import uuid
+import os
+import re
+
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(tempfile.gettempdir(), "sig_jobs"))
+# Horas que se conservan los trabajos terminados y sus artefactos
+JOBS_TTL_HOURS = int(os.getenv("JOBS_TTL_HOURS", "24"))
+
+STATUS_PENDING = "PENDIENTE"
+STATUS_RUNNING = "EN PROCESO"
+STATUS_COMPLETED = "COMPLETADO"
+STATUS_FAILED = "ERROR"
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class JobStore:
+    def __init__(self, root: str = JOBS_DIR):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, job_id: str, extension: str = "job.json") -> str:
+        if not _JOB_ID.match(job_id):
+            raise ValueError("Identificador de trabajo inválido")
+        return os.path.join(self.root, f"{job_id}.{extension}")
+
+    def file_path(self, job_id: str, extension: str) -> str:
+        """Ruta de un archivo asociado al trabajo (p. ej. el archivo subido)"""
+        return self._path(job_id, extension)
+
+    def _save(self, job: dict):
+        _write_atomic(self._path(job["id"]), json.dumps(job, default=str).encode())
+
+    def create(self, kind: str, name: str, params: dict, user_id: Optional[int]) -> dict:
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "name": name,
+            "params": params,
+            "user_id": user_id,
+            "status": STATUS_PENDING,
+            "progress": 0,
+            "message": None,
+            "error": None,
+            "artifact": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self._save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        try:
+            with open(self._path(job_id), "rb") as f:
+                return json.loads(f.read())
+        except (ValueError, FileNotFoundError):
+            return None
+
+    def update(self, job_id: str, **fields) -> Optional[dict]:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        self._save(job)
+        return job
+
+    def start(self, job_id: str, message: str = None):
+        return self.update(job_id, status=STATUS_RUNNING, progress=1, message=message, started_at=datetime.now().isoformat())
+
+    def progress(self, job_id: str, progress: int, message: str = None):
+        return self.update(job_id, progress=max(0, min(int(progress), 99)), message=message)
+
+    def complete(self, job_id: str, artifact: Optional[str] = None, message: str = None):
+        return self.update(
+            job_id, status=STATUS_COMPLETED, progress=100, artifact=artifact,
+            message=message, finished_at=datetime.now().isoformat()
+        )
+
+    def fail(self, job_id: str, error: str):
+        return self.update(job_id, status=STATUS_FAILED, error=error, finished_at=datetime.now().isoformat())
+
+    def save_artifact(self, job_id: str, data: bytes, extension: str) -> str:
+        """Guarda el resultado del trabajo y devuelve el nombre del archivo"""
+        path = self._path(job_id, extension)
+        _write_atomic(path, data)
+        return os.path.basename(path)
+
+    def save_artifact_file(self, job_id: str, source_path: str, extension: str) -> str:
+        """Mueve un archivo ya generado (p. ej. un .xlsx temporal) como resultado del trabajo"""
+        path = self._path(job_id, extension)
+        shutil.move(source_path, path)
+        return os.path.basename(path)
+
+    def artifact_path(self, job: dict) -> Optional[str]:
+        if not job.get("artifact"):
+            return None
+        path = os.path.join(self.root, job["artifact"])
+        return path if os.path.exists(path) else None
+
+    def purge_expired(self):
+        """Elimina trabajos (y artefactos) más antiguos que JOBS_TTL_HOURS"""
+        limit = (datetime.now() - timedelta(hours=JOBS_TTL_HOURS)).timestamp()
+        for file_name in os.listdir(self.root):
+            path = os.path.join(self.root, file_name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
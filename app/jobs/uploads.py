@@ -0,0 +1,80 @@
+"""
+Carga de archivos de morosidad en segundo plano
+El archivo subido se guarda en el JobStore y un proceso del pool lo lee por
+lotes; cada lote se inserta con create_bulk apenas se valida, y el trabajo
+guarda filas procesadas, rechazadas y filas por segundo.
+"""
+from types import SimpleNamespace
+from typing import BinaryIO, Optional
+import shutil
+import time
+import os
+from app.jobs.store import JobStore
+from app.jobs.runner import submit_job
+from app.utils.audit_writer import audit_log_writer
+
+# Mensajes de error por fila que se guardan en el trabajo
+MAX_JOB_ERRORS = 200
+_SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+def _execute_upload(job_id: str, path: str, user_id: Optional[int], username: str):
+    """Punto de entrada en el proceso hijo"""
+    from app.db.database import SessionLocal
+    from app.controllers.data_upload.data_upload import create_bulk, log_bulk_upload
+    from app.scripts.data_upload.data_upload import ExcelProcessor, sheet_row_count
+
+    store = JobStore()
+    store.start(job_id, "Procesando archivo")
+    current_user = SimpleNamespace(id_user=user_id, user=username)
+    processor = ExcelProcessor(current_user)
+    stats = {"rows_processed": 0, "rows_rejected": 0, "created_records": 0, "updated_records": 0, "rows_per_second": 0.0}
+    errors = []
+    db = SessionLocal()
+    try:
+        expected_rows = sheet_row_count(path)
+        started = time.monotonic()
+        for valid, chunk_errors, rows, rejected in processor.iter_excel_file(path):
+            if valid:
+                created, updated = create_bulk(db, valid, current_user, write_log=False)
+                stats["created_records"] += created
+                stats["updated_records"] += updated
+            stats["rows_processed"] += rows
+            stats["rows_rejected"] += rejected
+            stats["rows_per_second"] = round(stats["rows_processed"] / max(time.monotonic() - started, 1e-6), 1)
+            errors.extend(chunk_errors[:MAX_JOB_ERRORS - len(errors)])
+
+            progress = stats["rows_processed"] * 100 // expected_rows if expected_rows else 1
+            store.update(
+                job_id, stats=stats, errors=errors, progress=max(1, min(progress, 99)),
+                message=f"{stats['rows_processed']} filas procesadas"
+            )
+
+        if stats["created_records"] or stats["updated_records"]:
+            log_bulk_upload(db, current_user, stats["created_records"], stats["updated_records"])
+            audit_log_writer.flush()
+        store.complete(job_id, message=f"Archivo procesado: {stats['rows_processed']} filas, {stats['rows_rejected']} rechazadas")
+    except Exception as e:
+        store.update(job_id, stats=stats, errors=errors)
+        store.fail(job_id, str(e))
+    finally:
+        db.close()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def submit_upload_job(source: BinaryIO, filename: str, user_id: Optional[int], username: str) -> dict:
+    """Guarda el archivo subido en disco (por bloques) y encola su procesamiento"""
+    store = JobStore()
+    store.purge_expired()
+    job = store.create("data_upload", filename, {"filename": filename}, user_id)
+
+    extension = "upload.xlsx" if filename.lower().endswith(".xlsx") else "upload.xls"
+    path = store.file_path(job["id"], extension)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(source, f, _SPOOL_CHUNK_SIZE)
+
+    submit_job(job["id"], _execute_upload, path, user_id, username)
+    return job
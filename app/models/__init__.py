@@ -13,4 +13,5 @@ from .interventions.interventions import Interventions
 # from .data_upload.data_upload import Data_upload
 from .intervention_entities.intervention_entities import Intervention_entities
 from .sector.sector import Sector
-from .assignments.assignments import Assignment
\ No newline at end of file
+from .assignments.assignments import Assignment
+from .refresh_token.refresh_token import RefreshToken
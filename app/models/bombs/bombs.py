@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Numeric, Time, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Numeric, Time, Float, Index
 from sqlalchemy.orm import relationship
 from app.models.bombs.bombs_pipes import bombs_pipes
 from sqlalchemy.dialects.postgresql import ARRAY
@@ -8,6 +8,11 @@ from geoalchemy2 import Geometry
 
 class Bombs(Base):
     __tablename__ = "bombs"
+    # Índices trigram para las búsquedas ILIKE '%texto%' de los listados y /search
+    __table_args__ = (
+        Index("ix_bombs_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_bombs_connections_trgm", "connections", postgresql_using="gin", postgresql_ops={"connections": "gin_trgm_ops"}),
+    )
     id_bombs = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True, nullable=False)
     coordinates = Column(Geometry(geometry_type="POINT", srid=4326), nullable=True)
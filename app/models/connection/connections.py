@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Index
 from app.models.pipes.pipe_connections import pipe_connections
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -7,6 +7,14 @@ from datetime import datetime
 
 class Connection(Base):
     __tablename__ = "connections"
+    # Índices trigram para las búsquedas ILIKE '%texto%' de los listados y /search
+    __table_args__ = (
+        Index("ix_connections_material_trgm", "material", postgresql_using="gin", postgresql_ops={"material": "gin_trgm_ops"}),
+        Index("ix_connections_connection_type_trgm", "connection_type", postgresql_using="gin", postgresql_ops={"connection_type": "gin_trgm_ops"}),
+        Index("ix_connections_pressure_nominal_trgm", "pressure_nominal", postgresql_using="gin", postgresql_ops={"pressure_nominal": "gin_trgm_ops"}),
+        Index("ix_connections_installed_by_trgm", "installed_by", postgresql_using="gin", postgresql_ops={"installed_by": "gin_trgm_ops"}),
+        Index("ix_connections_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
     id_connection = Column(Integer, primary_key=True, index=True)
     coordenates = Column(Geometry(geometry_type='POINT', srid=4326))
     material = Column(String(50))
@@ -1,28 +1,37 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Numeric, Time, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Numeric, Time, Float, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
 
 class Data_upload(Base):
     __tablename__ = "data_upload"
+    # Índices trigram para las búsquedas '%texto%' del listado (taxpayer OR cologne):
+    # con índice en ambas ramas PostgreSQL puede combinar el OR con un BitmapOr
+    __table_args__ = (
+        Index("ix_data_upload_taxpayer_trgm", "taxpayer", postgresql_using="gin", postgresql_ops={"taxpayer": "gin_trgm_ops"}),
+        Index("ix_data_upload_cologne_trgm", "cologne", postgresql_using="gin", postgresql_ops={"cologne": "gin_trgm_ops"}),
+    )
+    # Solo se indexan las columnas que se consultan (identifier, date, cologne y la
+    # búsqueda por contribuyente): cada índice extra se actualiza en cada fila cargada
     # parte del encabezado
-    siaf = Column(String(100), index= True, nullable = False)
-    municipality = Column(String(200), index=True, nullable=True)  # Municipio
-    department = Column(String(200), index=True, nullable=True)  # Departamento
-    institutional_classification= Column(Integer, index= True, nullable= False)
-    report = Column(String(200), index= True, nullable= False)
+    siaf = Column(String(100), nullable = False)
+    municipality = Column(String(200), nullable=True)  # Municipio
+    department = Column(String(200), nullable=True)  # Departamento
+    institutional_classification= Column(Integer, nullable= False)
+    report = Column(String(200), nullable= False)
     date = Column(DateTime, index= True, nullable= False)
-    hour = Column(Time, index=True, nullable= False)
-    seriereport = Column (String(100), index=True, nullable= False)
-    user = Column(String(100), index= True, nullable=False)
+    hour = Column(Time, nullable= False)
+    seriereport = Column (String(100), nullable= False)
+    user = Column(String(100), nullable=False)
     # infromacion del servicio
-    identifier = Column(String(100), primary_key=True, index=True)
-    taxpayer= Column(String(100), index=True, nullable=False) #contribuyente
+    identifier = Column(String(100), primary_key=True)
+    taxpayer= Column(String(100), nullable=False) #contribuyente
     cologne = Column(String(200), index=True, nullable=False) #colonia
-    cat_service = Column(String(250), index=True, nullable=False)
-    cannon = Column(Float, index=True, nullable=False)
-    excess = Column(Float, index=True, nullable=False)
-    total = Column(Float, index=True, nullable=False)
-    status = Column(Boolean, index= True, nullable=False)
+    cat_service = Column(String(250), nullable=False)
+    cannon = Column(Float, nullable=False)
+    excess = Column(Float, nullable=False)
+    total = Column(Float, nullable=False)
+    status = Column(Boolean, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
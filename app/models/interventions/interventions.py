@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ARRAY
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ARRAY, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
 
 class Interventions(Base):
     __tablename__ ="interventions"
+    # Índices trigram para las búsquedas ILIKE '%texto%' de los listados y /search
+    __table_args__ = (
+        Index("ix_interventions_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
     id_interventions= Column(Integer, primary_key=True, index=True)
     description = Column(String(200), index=True, nullable=False)
     start_date = Column(DateTime, default=datetime.utcnow)
@@ -1,17 +1,24 @@
 #models/log/logs.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy import text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime 
 
 class Logs(Base): 
     __tablename__ = "logs"
-    log_id = Column(Integer, primary_key=True, index=True)
+    # En la base de datos la tabla está particionada por mes en created_at
+    # (migración partition_logs_table): la llave primaria incluye la columna de partición
+    __table_args__ = (
+        Index("ix_logs_entity_created_at", "entity", "created_at"),
+        Index("ix_logs_created_at_desc", text("created_at DESC")),
+    )
+    log_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id_user"), nullable=False)
     action = Column(String(50), nullable=False)
     entity = Column(String(50))
     entity_id = Column(Integer)
     description = Column(String(255), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
 
     user = relationship("Username", back_populates="logs")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Numeric, ForeignKey, Index
 from app.models.pipes.pipe_connections import pipe_connections
 from app.models.bombs.bombs_pipes import bombs_pipes
 from app.models.tanks.tanks_pipes import tank_pipes
@@ -9,6 +9,11 @@ from datetime import datetime
 
 class Pipes(Base): 
     __tablename__ = "pipes"
+    # Índices trigram para las búsquedas ILIKE '%texto%' de los listados y /search
+    __table_args__ = (
+        Index("ix_pipes_material_trgm", "material", postgresql_using="gin", postgresql_ops={"material": "gin_trgm_ops"}),
+        Index("ix_pipes_observations_trgm", "observations", postgresql_using="gin", postgresql_ops={"observations": "gin_trgm_ops"}),
+    )
     id_pipes= Column(Integer, primary_key=True, index=True)
     material= Column(String(50), nullable=False)
     diameter= Column(Numeric(10, 6), nullable=False)
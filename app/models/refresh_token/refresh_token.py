@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.db.database import Base
+from datetime import datetime
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    # Solo se guarda el identificador (jti) del token, no el token firmado
+    jti = Column(String(32), primary_key=True)
+    # Todos los tokens obtenidos por rotación desde un mismo login comparten familia
+    family_id = Column(String(32), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id_user", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
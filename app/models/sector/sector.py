@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
 
 class Sector(Base):
     __tablename__ = "sectors"
+    # Índices trigram para las búsquedas ILIKE '%texto%' de los listados y /search
+    __table_args__ = (
+        Index("ix_sectors_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_sectors_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
     id_sector = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, index=True, nullable=False)
     description = Column(String(255), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from app.models.tanks.tanks_pipes import tank_pipes
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship 
@@ -8,6 +8,11 @@ from datetime import datetime
 
 class Tank(Base):
     __tablename__ = "tanks"
+    # Índices trigram para las búsquedas ILIKE '%texto%' de los listados y /search
+    __table_args__ = (
+        Index("ix_tanks_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_tanks_connections_trgm", "connections", postgresql_using="gin", postgresql_ops={"connections": "gin_trgm_ops"}),
+    )
     
     id_tank = Column(Integer, primary_key = True, index = True)
     name = Column(String(50), unique=True, index=True, nullable=False)
@@ -0,0 +1,5 @@
+from app.network.graph import (
+    NetworkGraph, network_graph, get_network_graph,
+    sync_pipe, sync_connection, sync_tank, sync_bomb,
+    TANK, BOMB, PIPE, CONNECTION, KIND_NAMES, KIND_BY_NAME
+)
@@ -0,0 +1,387 @@
+"""
+Grafo en memoria de la red de agua
+Tanques, bombas, tuberías y conexiones como nodos; las tablas tank_pipes,
+bombs_pipes y pipe_connections como aristas. Las consultas se responden sin
+acceder a la base de datos.
+"""
+from app.models.connection.connections import Connection
+from app.models.pipes.pipe_connections import pipe_connections
+from app.models.bombs.bombs_pipes import bombs_pipes
+from app.models.tanks.tanks_pipes import tank_pipes
+from app.models.pipes.pipes import Pipes
+from app.models.bombs.bombs import Bombs
+from app.models.tanks.tanks import Tank
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from collections import deque
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+import os
+
+TANK, BOMB, PIPE, CONNECTION = 0, 1, 2, 3
+KIND_NAMES = ("tank", "bomb", "pipe", "connection")
+KIND_BY_NAME = {name: kind for kind, name in enumerate(KIND_NAMES)}
+
+# Segundos antes de reconstruir el grafo desde la BD (cambios hechos por otros workers)
+NETWORK_GRAPH_TTL = int(os.getenv("NETWORK_GRAPH_TTL", "300"))
+
+
+class _Supply:
+    """
+    Alimentación de la red precalculada para una versión del grafo (inmutable)
+    - parents: árbol BFS desde los tanques y bombas activos (camino upstream).
+    - order/tin/size: recorrido DFS en preorden desde una raíz virtual unida a
+      todas las fuentes; el subárbol de v es order[tin[v]:tin[v] + size[v]].
+    - cut_children[v]: hijos DFS de v cuyo subárbol solo llega a una fuente a
+      través de v (low[c] >= tin[v]); si v se cierra, esos subárboles se quedan
+      sin alimentación.
+    """
+    __slots__ = ("version", "kinds", "ids", "active", "parents", "order", "tin", "size", "cut_children")
+
+    def __init__(self, version, kinds, ids, active, parents, order, tin, size, cut_children):
+        self.version = version
+        self.kinds = kinds
+        self.ids = ids
+        self.active = active
+        self.parents = parents
+        self.order = order
+        self.tin = tin
+        self.size = size
+        self.cut_children = cut_children
+
+
+class NetworkGraph:
+    """Grafo no dirigido con adyacencia en arrays compactos por nodo"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._index: Dict[Tuple[int, int], int] = {}
+        self._kinds = array('B')
+        self._ids = array('q')
+        self._active = bytearray()
+        self._adjacency: List[array] = []
+        self.loaded_at: Optional[float] = None
+        self.version = 0
+        self._supply: Optional[_Supply] = None
+
+    # ----- Construcción -----
+    def load(self, db: Session):
+        """Construye el grafo completo con consultas masivas"""
+        nodes = [
+            (TANK, db.execute(select(Tank.id_tank, Tank.active)).all()),
+            (BOMB, db.execute(select(Bombs.id_bombs, Bombs.active)).all()),
+            (PIPE, db.execute(select(Pipes.id_pipes, Pipes.active)).all()),
+            (CONNECTION, db.execute(select(Connection.id_connection, Connection.active)).all()),
+        ]
+        edges = [
+            (TANK, PIPE, db.execute(select(tank_pipes.c.tank_id, tank_pipes.c.pipe_id)).all()),
+            (BOMB, PIPE, db.execute(select(bombs_pipes.c.bombs_id, bombs_pipes.c.pipe_id)).all()),
+            (PIPE, CONNECTION, db.execute(select(pipe_connections.c.pipe_id, pipe_connections.c.connection_id)).all()),
+        ]
+
+        with self._lock:
+            self._clear()
+            for kind, rows in nodes:
+                for entity_id, active in rows:
+                    self._node(kind, entity_id, active)
+            for kind_a, kind_b, rows in edges:
+                for id_a, id_b in rows:
+                    self._link(self._node(kind_a, id_a), self._node(kind_b, id_b))
+            self.loaded_at = time.monotonic()
+            self.version += 1
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return not self.is_loaded or time.monotonic() - self.loaded_at > NETWORK_GRAPH_TTL
+
+    def _node(self, kind: int, entity_id: int, active: Optional[bool] = None) -> int:
+        key = (kind, entity_id)
+        idx = self._index.get(key)
+        if idx is None:
+            idx = len(self._ids)
+            self._index[key] = idx
+            self._kinds.append(kind)
+            self._ids.append(entity_id)
+            self._active.append(1 if active is None or active else 0)
+            self._adjacency.append(array('l'))
+        elif active is not None:
+            self._active[idx] = 1 if active else 0
+        return idx
+
+    def _link(self, a: int, b: int):
+        if b not in self._adjacency[a]:
+            self._adjacency[a].append(b)
+            self._adjacency[b].append(a)
+
+    def _unlink_all(self, idx: int):
+        for other in self._adjacency[idx]:
+            self._adjacency[other].remove(idx)
+        self._adjacency[idx] = array('l')
+
+    # ----- Actualizaciones incrementales -----
+    def set_active(self, kind: int, entity_id: int, active: bool):
+        """Registra un nodo nuevo o cambia su estado activo"""
+        if not self.is_loaded:
+            return
+        with self._lock:
+            self._node(kind, entity_id, active)
+            self.version += 1
+
+    def set_links(self, kind: int, entity_id: int, active: bool, neighbours: Iterable[Tuple[int, int]]):
+        """Reemplaza todas las aristas de un nodo (tubería o conexión)"""
+        if not self.is_loaded:
+            return
+        with self._lock:
+            idx = self._node(kind, entity_id, active)
+            self._unlink_all(idx)
+            for other_kind, other_id in neighbours:
+                self._link(idx, self._node(other_kind, other_id))
+            self.version += 1
+
+    # ----- Consultas -----
+    def _describe(self, idx: int) -> dict:
+        return {"type": KIND_NAMES[self._kinds[idx]], "id": self._ids[idx], "active": bool(self._active[idx])}
+
+    def has_node(self, kind: int, entity_id: int) -> bool:
+        return (kind, entity_id) in self._index
+
+    def neighbours(self, kind: int, entity_id: int, only_active: bool = True) -> Optional[List[dict]]:
+        with self._lock:
+            idx = self._index.get((kind, entity_id))
+            if idx is None:
+                return None
+            return [
+                self._describe(other)
+                for other in self._adjacency[idx]
+                if not only_active or self._active[other]
+            ]
+
+    def _bfs(self, start: int, only_active: bool, seen: bytearray) -> List[int]:
+        visited = [start]
+        seen[start] = 1
+        queue = deque((start,))
+        adjacency, active = self._adjacency, self._active
+        while queue:
+            for other in adjacency[queue.popleft()]:
+                if not seen[other] and (not only_active or active[other]):
+                    seen[other] = 1
+                    visited.append(other)
+                    queue.append(other)
+        return visited
+
+    def _group(self, members: List[int]) -> Dict[str, List[int]]:
+        grouped = {name: [] for name in KIND_NAMES}
+        for idx in members:
+            grouped[KIND_NAMES[self._kinds[idx]]].append(self._ids[idx])
+        return grouped
+
+    def reachable_from(self, kind: int, entity_id: int, only_active: bool = True) -> Optional[Dict[str, List[int]]]:
+        """Todos los nodos alcanzables desde el nodo dado, agrupados por tipo"""
+        with self._lock:
+            idx = self._index.get((kind, entity_id))
+            if idx is None:
+                return None
+            members = self._bfs(idx, only_active, bytearray(len(self._ids)))
+            return self._group(members)
+
+    def components(self, only_active: bool = True) -> List[Dict[str, List[int]]]:
+        """Componentes conexas de la red, de mayor a menor"""
+        with self._lock:
+            seen = bytearray(len(self._ids))
+            result = []
+            for idx in range(len(self._ids)):
+                if seen[idx] or (only_active and not self._active[idx]):
+                    continue
+                result.append(self._group(self._bfs(idx, only_active, seen)))
+            result.sort(key=lambda c: sum(len(ids) for ids in c.values()), reverse=True)
+            return result
+
+    def _sources(self) -> List[int]:
+        """Tanques y bombas activos: los puntos que alimentan la red"""
+        return [
+            idx for idx in range(len(self._ids))
+            if self._active[idx] and self._kinds[idx] in (TANK, BOMB)
+        ]
+
+    def _multi_bfs(self, sources: List[int], parents: Optional[array] = None) -> bytearray:
+        """BFS simultáneo desde varias fuentes sobre nodos activos"""
+        seen = bytearray(len(self._ids))
+        queue = deque()
+        for source in sources:
+            seen[source] = 1
+            queue.append(source)
+        adjacency, active = self._adjacency, self._active
+        while queue:
+            current = queue.popleft()
+            for other in adjacency[current]:
+                if not seen[other] and active[other]:
+                    seen[other] = 1
+                    if parents is not None:
+                        parents[other] = current
+                    queue.append(other)
+        return seen
+
+    def _compute_supply(self) -> _Supply:
+        """Un BFS y un DFS (puntos de articulación) sobre la red activa; O(V + E)"""
+        n = len(self._ids)
+        adjacency, active, kinds = self._adjacency, self._active, self._kinds
+        sources = self._sources()
+        parents = array('l', [-1]) * n
+        self._multi_bfs(sources, parents=parents)
+
+        # DFS iterativo; la raíz virtual tiene tin -1 y cada fuente tiene una arista
+        # hacia ella, así que low[fuente] = -1 y ninguna fuente se corta
+        tin = array('l', [-1]) * n
+        low = array('l', [0]) * n
+        size = array('l', [1]) * n
+        order = array('l')
+        cut_children: Dict[int, List[int]] = {}
+        for root in sources:
+            if tin[root] != -1:
+                continue
+            tin[root], low[root] = len(order), -1
+            order.append(root)
+            stack = [(root, -1, iter(adjacency[root]))]
+            while stack:
+                node, parent, pending = stack[-1]
+                for other in pending:
+                    if not active[other] or other == parent:
+                        continue
+                    if tin[other] == -1:
+                        tin[other] = len(order)
+                        low[other] = -1 if kinds[other] in (TANK, BOMB) else tin[other]
+                        order.append(other)
+                        stack.append((other, node, iter(adjacency[other])))
+                        break
+                    if tin[other] < low[node]:
+                        low[node] = tin[other]
+                else:
+                    stack.pop()
+                    if parent >= 0:
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                        size[parent] += size[node]
+                        if low[node] >= tin[parent]:
+                            cut_children.setdefault(parent, []).append(node)
+
+        # Copias de los nodos: trace() las lee sin el lock y set_active/set_links
+        # modifican los arreglos vivos del grafo
+        return _Supply(
+            self.version, array('B', kinds), array('q', self._ids), bytes(active),
+            parents, order, tin, size, cut_children
+        )
+
+    def _current_supply(self) -> _Supply:
+        # Se recalcula una vez por versión del grafo (carga o sincronización), con el lock tomado
+        supply = self._supply
+        if supply is None or supply.version != self.version:
+            supply = self._supply = self._compute_supply()
+        return supply
+
+    def trace(self, kind: int, entity_id: int) -> Optional[dict]:
+        """
+        Análisis de aislamiento de una tubería o conexión.
+        upstream: camino desde el nodo hasta el tanque o bomba que lo alimenta.
+        downstream: nodos que quedan sin alimentación si el nodo se cierra.
+        Con la alimentación precalculada cuesta O(camino + afectados); el lock
+        del grafo solo se toma para leer la versión vigente.
+        """
+        with self._lock:
+            target = self._index.get((kind, entity_id))
+            if target is None:
+                return None
+            supply = self._current_supply()
+
+        def describe(idx: int) -> dict:
+            return {"type": KIND_NAMES[supply.kinds[idx]], "id": supply.ids[idx], "active": bool(supply.active[idx])}
+
+        fed = supply.tin[target] != -1
+        upstream = []
+        if fed:
+            current = supply.parents[target]
+            while current != -1:
+                upstream.append(describe(current))
+                current = supply.parents[current]
+
+        downstream = []
+        for child in supply.cut_children.get(target, ()):
+            start = supply.tin[child]
+            downstream.extend(supply.order[start:start + supply.size[child]])
+        downstream.sort()
+
+        grouped = {name: [] for name in KIND_NAMES}
+        for idx in downstream:
+            grouped[KIND_NAMES[supply.kinds[idx]]].append(supply.ids[idx])
+        return {
+            "fed": fed,
+            "feeding_source": upstream[-1] if upstream else None,
+            "upstream": upstream,
+            "downstream": grouped
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {name: 0 for name in KIND_NAMES}
+            for kind in self._kinds:
+                counts[KIND_NAMES[kind]] += 1
+            return {
+                "nodes": len(self._ids),
+                "edges": sum(len(adj) for adj in self._adjacency) // 2,
+                "by_type": counts,
+                "version": self.version,
+                "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.is_loaded else None
+            }
+
+
+network_graph = NetworkGraph()
+
+
+_reload_lock = threading.Lock()
+
+
+def get_network_graph(db: Session) -> NetworkGraph:
+    """
+    Devuelve el grafo del proceso, construyéndolo si no existe o expiró.
+    Solo una petición recarga; si ya hay un grafo cargado las demás lo usan
+    mientras tanto en lugar de esperar o recargarlo otra vez.
+    """
+    if not network_graph.is_stale():
+        return network_graph
+    if not _reload_lock.acquire(blocking=not network_graph.is_loaded):
+        return network_graph
+    try:
+        # Otra petición pudo recargarlo mientras se esperaba el lock
+        if network_graph.is_stale():
+            network_graph.load(db)
+    finally:
+        _reload_lock.release()
+    return network_graph
+
+
+# ----- Ganchos para los controladores -----
+def sync_pipe(pipe: Pipes):
+    neighbours = [(TANK, t.id_tank) for t in pipe.tanks]
+    neighbours += [(BOMB, b.id_bombs) for b in pipe.bombs]
+    neighbours += [(CONNECTION, c.id_connection) for c in pipe.connections]
+    network_graph.set_links(PIPE, pipe.id_pipes, pipe.active, neighbours)
+
+
+def sync_connection(connection: Connection):
+    neighbours = [(PIPE, p.id_pipes) for p in connection.pipes]
+    network_graph.set_links(CONNECTION, connection.id_connection, connection.active, neighbours)
+
+
+def sync_tank(tank: Tank):
+    network_graph.set_active(TANK, tank.id_tank, tank.active)
+
+
+def sync_bomb(bomb: Bombs):
+    network_graph.set_active(BOMB, bomb.id_bombs, bomb.active)
@@ -2,10 +2,12 @@ from app.controllers.Bombs.bombs import get_all, get_by_id, create, update, togg
 from app.schemas.bombs.bombs import BombsResponse, BombsBase, BombsUpdate 
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
+from app.utils.spatial import parse_bbox
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix='/bombs', tags=['Bombs'])
@@ -15,27 +17,20 @@ async def list_bombs(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(5, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por nombre o conexiones"),
+    bbox: Optional[str] = Query(None, description="Viewport minx,miny,maxx,maxy (EPSG:4326)"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Nivel de zoom del mapa, reduce la densidad en zoom bajo"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id_bombs,latitude,longitude); por defecto todos"),
     db: Session = Depends(get_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ): 
     try:
-        bombs, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [BombsResponse.model_validate(emp).model_dump(mode="json") for emp in bombs]
+        bombs, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, parse_bbox(bbox), zoom, cursor, total_mode, fields)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": bombs,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except HTTPException:
         raise
@@ -50,8 +45,8 @@ async def get_bomb(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        bomb = get_by_id(db, bomb_id)
-        return success_response(BombsResponse.model_validate(bomb).model_dump(mode="json"))
+        bomb = await run_in_db_thread_as(BombsResponse, get_by_id, db, bomb_id)
+        return success_response(bomb)
     except Exception as e:
         return error_response(f"Error al obtener la bomba: {e}")
 
@@ -62,8 +57,8 @@ async def create_bomb(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        new_bomb = create(db, data,current_user)
-        return success_response(BombsResponse.model_validate(new_bomb).model_dump(mode="json"))
+        new_bomb = await run_in_db_thread_as(BombsResponse, create, db, data,current_user)
+        return success_response(new_bomb)
     except Exception as e:
         return error_response(f"Error al crear la bomba: {e}")
 
@@ -75,8 +70,8 @@ async def update_bomb(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        bomb_updated = update(db, bomb_id, data,current_user)
-        return success_response(BombsResponse.model_validate(bomb_updated).model_dump(mode="json"))
+        bomb_updated = await run_in_db_thread_as(BombsResponse, update, db, bomb_id, data,current_user)
+        return success_response(bomb_updated)
     except Exception as e:
         return error_response(f"Error al actualizar la bomba {e}")
     
@@ -87,10 +82,10 @@ async def toggle_bomb_state(
     current_user: UserLogin = Depends(get_current_active_user)
 ): 
     try:
-        toggle_bomb = toggle_state(db, bomb_id,current_user)
-        action = "activo" if toggle_bomb.active else "inactivo"
+        toggle_bomb = await run_in_db_thread_as(BombsResponse, toggle_state, db, bomb_id,current_user)
+        action = "activo" if toggle_bomb["active"] else "inactivo"
         return success_response({
-            "message": f"Se {action} la bomba '{toggle_bomb.name}', correctamente."
+            "message": f"Se {action} la bomba '{toggle_bomb['name']}', correctamente."
         })
     except Exception as e:
         return error_response(f"Error al cambiar el estado de la bomba: {e}")
\ No newline at end of file
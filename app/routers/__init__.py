@@ -13,4 +13,7 @@ from app.routers.type_employee.type_employee import router as type_employee_rout
 from app.routers.interventions.intervention import router as interventions_router
 from app.routers.map.map import router as map_router
 from app.routers.sector.sector import router as sector_router
-from app.routers.assignments.assignments import router as assignments_router
\ No newline at end of file
+from app.routers.assignments.assignments import router as assignments_router
+from app.routers.admin.admin import router as admin_router
+from app.routers.network.network import router as network_router
+from app.routers.search.search import router as search_router
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends
+from app.db.database import engine, async_engine, POOL_SETTINGS, DB_THREADPOOL_SIZE
+from app.db.pool_metrics import pool_status, sync_pool_metrics, async_pool_metrics
+from app.controllers.auth.auth_controller import get_current_admin_user
+from app.utils.audit_writer import audit_log_writer
+from app.utils.principal_cache import principal_cache
+from app.utils.response import success_response
+import os
+
+router = APIRouter(prefix='/admin', tags=['Admin'])
+
+@router.get('/db/pool')
+async def get_pool_stats(current_user = Depends(get_current_admin_user)):
+    """
+    Estadísticas del pool de conexiones de este proceso worker.
+    Cada worker de uvicorn tiene su propio pool, por lo que los valores son por proceso.
+    """
+    return success_response({
+        "pid": os.getpid(),
+        "settings": POOL_SETTINGS,
+        "threadpool_size": DB_THREADPOOL_SIZE,
+        "sync": pool_status(engine, sync_pool_metrics),
+        "async": pool_status(async_engine.sync_engine, async_pool_metrics)
+    })
+
+@router.post('/db/pool/reset')
+async def reset_pool_stats(current_user = Depends(get_current_admin_user)):
+    """Reinicia los contadores acumulados del pool"""
+    sync_pool_metrics.reset()
+    async_pool_metrics.reset()
+    return success_response({"message": "Métricas del pool reiniciadas"})
+
+@router.get('/audit-log')
+async def get_audit_log_stats(current_user = Depends(get_current_admin_user)):
+    """
+    Estado del escritor de bitácora de este proceso worker: profundidad de la cola,
+    lotes escritos, escrituras síncronas por contrapresión y eventos fallidos.
+    """
+    return success_response({
+        "pid": os.getpid(),
+        **audit_log_writer.status()
+    })
+
+@router.post('/audit-log/reset')
+async def reset_audit_log_stats(current_user = Depends(get_current_admin_user)):
+    """Reinicia los contadores del escritor de bitácora"""
+    audit_log_writer.metrics.reset()
+    return success_response({"message": "Métricas de la bitácora reiniciadas"})
+
+
+@router.get('/auth/principal-cache')
+async def get_principal_cache_stats(current_user = Depends(get_current_admin_user)):
+    """Aciertos, fallos e invalidaciones de la caché de usuarios autenticados de este proceso worker"""
+    return success_response({
+        "pid": os.getpid(),
+        **principal_cache.status()
+    })
+
+@router.post('/auth/principal-cache/reset')
+async def reset_principal_cache(current_user = Depends(get_current_admin_user)):
+    """Vacía la caché de usuarios autenticados y reinicia sus contadores"""
+    principal_cache.invalidate()
+    principal_cache.reset_metrics()
+    return success_response({"message": "Caché de usuarios autenticados reiniciada"})
@@ -19,7 +19,8 @@ from app.schemas.assignments.assignments import (
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.schemas.user.user import UserLogin
 from app.utils.response import success_response, error_response
-from app.db.database import get_db
+from app.utils.pagination import pagination_envelope, TotalMode
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 
 
 router = APIRouter(prefix="/assignments", tags=["Assignments"])
@@ -29,28 +30,17 @@ async def list_assignments(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(5, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Buscar por estado o notas"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
     db: Session = Depends(get_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        assignments, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
-
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [AssignmentResponse.model_validate(a).model_dump(mode="json") for a in assignments]
+        assignments, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, cursor, total_mode)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page,
-            }
+            "items": assignments,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -62,8 +52,8 @@ async def get_assignment(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        assignment = get_by_id(db, assignment_id)
-        return success_response(AssignmentResponse.model_validate(assignment).model_dump(mode="json"))
+        assignment = await run_in_db_thread_as(AssignmentResponse, get_by_id, db, assignment_id)
+        return success_response(assignment)
     except Exception as e:
         return error_response(f"Error al obtener la asignación: {e}")
 
@@ -74,8 +64,8 @@ async def create_assignment(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        assignment = create(db, data, current_user)
-        return success_response(AssignmentResponse.model_validate(assignment).model_dump(mode="json"))
+        assignment = await run_in_db_thread_as(AssignmentResponse, create, db, data, current_user)
+        return success_response(assignment)
     except Exception as e:
         return error_response(f"Error al crear la asignación: {e}")
 
@@ -87,8 +77,8 @@ async def update_assignment(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        updated_assignment = update(db, assignment_id, data, current_user)
-        return success_response(AssignmentResponse.model_validate(updated_assignment).model_dump(mode="json"))
+        updated_assignment = await run_in_db_thread_as(AssignmentResponse, update, db, assignment_id, data, current_user)
+        return success_response(updated_assignment)
     except Exception as e:
         return error_response(f"Error al actualizar la asignación: {e}")
 
@@ -99,12 +89,12 @@ async def toggle_assignment_state(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        toggled = toggle_state(db, assignment_id, current_user)
-        action = "activo" if toggled.active else "inactivo"
+        toggled = await run_in_db_thread_as(AssignmentResponse, toggle_state, db, assignment_id, current_user)
+        action = "activo" if toggled["active"] else "inactivo"
 
         return success_response({
-            "message": f"Se cambió el estado de la asignación {toggled.id_assignment} a {action}.",
-            "id_assignment": toggled.id_assignment
+            "message": f"Se cambió el estado de la asignación {toggled['id_assignment']} a {action}.",
+            "id_assignment": toggled["id_assignment"]
         })
     except Exception as e:
         return error_response(f"Error al cambiar el estado de la asignación: {e}")
@@ -8,40 +8,78 @@ from app.utils.auth import (
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from app.schemas.auth.auth import Token
+from app.schemas.auth.auth import Token, RefreshTokenRequest
 from app.schemas.user.user import UserResponse, UserResponseWithPermissions
-from app.db.database import get_db
-from app.controllers.auth.auth_controller import authenticate_user, get_current_active_user
+from app.db.database import get_db, run_in_db_thread
+from app.controllers.auth.auth_controller import (
+    authenticate_user,
+    get_current_active_user,
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 router = APIRouter(prefix='/auth', tags=['Authentication'])
 
+def _create_user_access_token(email: str) -> str:
+    access_token_expires = timedelta(minutes= ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(
+        data={"sub": email}, expires_delta=access_token_expires
+    )
+
 @router.post('/token', response_model=Token)  
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect user or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes= ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    user_id, user_name, email = user.id_user, user.user, user.email
+    access_token = _create_user_access_token(email)
+    refresh_token = await run_in_db_thread(issue_refresh_token, db, user)
     
     create_log(
         db,
-        user_id=user.id_user,
+        user_id=user_id,
         action="LOGIN",
-        description=f"El usuario {user.user} inició sesión"
+        description=f"El usuario {user_name} inició sesión"
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post('/refresh', response_model=Token)  #Cambia un refresh token por un par nuevo sin volver a pedir la contraseña
+async def refresh_access_token(
+    data: RefreshTokenRequest,
+    db: Session = Depends(get_db)
+):
+    email, refresh_token = await run_in_db_thread(rotate_refresh_token, db, data.refresh_token)
+    return {
+        "access_token": _create_user_access_token(email),
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post('/logout')  #Revoca el refresh token y los que se obtuvieron por rotación desde el mismo login
+async def logout(
+    data: RefreshTokenRequest,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    await run_in_db_thread(revoke_refresh_token, db, data.refresh_token, current_user.email)
+    create_log(
+        db,
+        user_id=current_user.id_user,
+        action="LOGOUT",
+        description=f"El usuario {current_user.user} cerró sesión"
+    )
+    return {"message": "Sesión cerrada correctamente"}
 
 @router.get('/me', response_model=UserResponseWithPermissions)  #Este endpoint es para obtener la información del usuario actual
 async def read_users_me(
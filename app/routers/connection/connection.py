@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
+from app.controllers.auth.auth_controller import require_permission
 from app.schemas.user.user import UserLogin
 from app.schemas.connections.connection import ConnectionCreate, ConnectionUpdate, ConnectionResponse
 from app.controllers.Connection.connections import get_all, get_by_id, create, update, toggle_state
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
+from app.utils.spatial import parse_bbox
 from typing import List, Optional
 
 router = APIRouter(prefix="/connections", tags=["Connections"])
@@ -15,27 +17,20 @@ async def list_connections(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por material, tipo, presión, instalador o descripción"),
+    bbox: Optional[str] = Query(None, description="Viewport minx,miny,maxx,maxy (EPSG:4326)"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Nivel de zoom del mapa, reduce la densidad en zoom bajo"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id_connection,latitude,longitude); por defecto todos"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_conexiones"))
 ):
     try:
-        connections, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [ConnectionResponse.model_validate(conn).model_dump(mode="json") for conn in connections]
+        connections, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, parse_bbox(bbox), zoom, cursor, total_mode, fields)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": connections,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except HTTPException:
         raise
@@ -47,11 +42,11 @@ async def list_connections(
 async def get_connection(
     connection_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_conexiones"))
 ):
     try:
-        connection = get_by_id(db, connection_id)
-        return success_response(ConnectionResponse.model_validate(connection).model_dump(mode="json"))
+        connection = await run_in_db_thread_as(ConnectionResponse, get_by_id, db, connection_id)
+        return success_response(connection)
     except Exception as e:
         return error_response(f"Error al obtener la conexión: {e}")
 
@@ -59,11 +54,11 @@ async def get_connection(
 async def create_connection(
     data: ConnectionCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_conexiones"))
 ):
     try:
-        new_connection = create(db, data, current_user)
-        return success_response(ConnectionResponse.model_validate(new_connection).model_dump(mode="json"))
+        new_connection = await run_in_db_thread_as(ConnectionResponse, create, db, data, current_user)
+        return success_response(new_connection)
     except Exception as e:
         return error_response(f"Error al crear la conexión: {e}")
 
@@ -72,11 +67,11 @@ async def update_connection(
     connection_id: int,
     data: ConnectionUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_conexiones"))
 ):
     try:
-        updated_connection = update(db, connection_id, data,current_user)
-        return success_response(ConnectionResponse.model_validate(updated_connection).model_dump(mode="json"))
+        updated_connection = await run_in_db_thread_as(ConnectionResponse, update, db, connection_id, data,current_user)
+        return success_response(updated_connection)
     except Exception as e:
         return error_response(f"Error al actualizar la conexión: {e}")
 
@@ -84,11 +79,11 @@ async def update_connection(
 async def toggle_connection_state(
     connection_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("eliminar_conexiones"))
 ):
     try:
-        toggle_connection = toggle_state(db, connection_id,current_user)
-        action = "activó" if toggle_connection.active else "desactivó"
+        toggle_connection = await run_in_db_thread_as(ConnectionResponse, toggle_state, db, connection_id,current_user)
+        action = "activó" if toggle_connection['active'] else "desactivó"
         return success_response({
             "message": f"Se {action} la conexión correctamente."
         })
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Query
+from fastapi import APIRouter, Depends, UploadFile, File, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
+from typing import List, Optional
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from app.schemas.user.user import UserLogin
 from app.schemas.data_upload.data_upload import Data_uploadResponse, Data_uploadCreate, Data_uploadUpdate
 from app.controllers.data_upload.data_upload import (
     get_all, get_by_identifier,  update, toggle_state,  process_excel_data
 )
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.controllers.auth.auth_controller import require_permission
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
+from app.schemas.jobs.jobs import UploadJobResponse
+from app.jobs.store import JobStore
+from app.jobs.uploads import submit_upload_job
 
 router = APIRouter(prefix="/data-upload", tags=["Data Upload"])
 
@@ -16,27 +21,18 @@ router = APIRouter(prefix="/data-upload", tags=["Data Upload"])
 async def list_data_uploads(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=10000, description="Límite de resultados por página"),
+    search: Optional[str] = Query(None, description="Término de búsqueda por contribuyente, colonia o identificador"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_archivos"))
 ):
     try:
-        data_uploads, total = get_all(db, page, limit)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [Data_uploadResponse.model_validate(du).model_dump(mode="json") for du in data_uploads]
+        data_uploads, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, cursor, total_mode)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": data_uploads,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except Exception as e:
         # Detectar errores de base de datos (tabla no existe)
@@ -61,11 +57,11 @@ async def list_data_uploads(
 async def get_data_upload(
     identifier: str,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_archivos"))
 ):
     try:
-        data_upload = get_by_identifier(db, identifier)
-        return success_response(Data_uploadResponse.model_validate(data_upload).model_dump(mode="json"))
+        data_upload = await run_in_db_thread_as(Data_uploadResponse, get_by_identifier, db, identifier)
+        return success_response(data_upload)
     except Exception as e:
         return error_response(f"Error al obtener el registro de data upload: {e}")
 
@@ -73,9 +69,11 @@ async def get_data_upload(
 # ✅ NUEVO ENDPOINT PARA SUBIR EXCEL
 @router.post("/upload-excel")
 async def upload_excel_file(
+    request: Request,
     file: UploadFile = File(...),
+    background: bool = Query(False, description="Procesar el archivo en segundo plano y devolver el trabajo"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_archivos"))
 ):
 
     try:
@@ -83,19 +81,32 @@ async def upload_excel_file(
         if not file.filename.lower().endswith(('.xlsx', '.xls')):
             return error_response("Solo se permiten archivos Excel (.xlsx, .xls)")
         
+        if background:
+            # El archivo se copia a disco por bloques y se procesa por lotes fuera de la petición
+            if file.size == 0:
+                return error_response("El archivo está vacío")
+            job = await run_in_threadpool(submit_upload_job, file.file, file.filename, current_user.id_user, current_user.user)
+            response = success_response(
+                UploadJobResponse(**job).model_dump(),
+                f"Archivo '{file.filename}' en cola; consulta el avance en {request.url_for('get_upload_job', job_id=job['id'])}"
+            )
+            response.status_code = 202
+            return response
+        
         # Leer archivo
         contents = await file.read()
         if len(contents) == 0:
             return error_response("El archivo está vacío")
         
         # Procesar Excel
-        result = process_excel_data(db, contents, current_user)
+        result = await run_in_db_thread(process_excel_data, db, contents, current_user)
         
         if result["success"]:
             message = result.get("message") or f"Archivo '{file.filename}' procesado exitosamente"
             return success_response({
                 "message": message,
                 "created_records": result.get("created_records", 0),
+                "updated_records": result.get("updated_records", 0),
                 "total_processed": result.get("total_processed", 0),
                 "errors": result.get("errors", []),
                 "filename": file.filename
@@ -111,16 +122,27 @@ async def upload_excel_file(
     except Exception as e:
         return error_response(f"Error al subir archivo: {str(e)}")
 
+@router.get("/jobs/{job_id}")
+async def get_upload_job(
+    job_id: str,
+    current_user: UserLogin = Depends(require_permission("leer_archivos"))
+):
+    """Estado de una carga en segundo plano: filas procesadas, rechazadas y filas por segundo"""
+    job = await run_in_threadpool(JobStore().get, job_id)
+    if not job or job.get("kind") != "data_upload" or job.get("user_id") != current_user.id_user:
+        raise HTTPException(404, "Trabajo no encontrado")
+    return success_response(UploadJobResponse(**job).model_dump())
+
 @router.put("/{identifier}", response_model=Data_uploadResponse)
 async def update_data_upload(
     identifier: str,
     data: Data_uploadUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_archivos"))
 ):
     try:
-        updated_data_upload = update(db, identifier, data, current_user)
-        return success_response(Data_uploadResponse.model_validate(updated_data_upload).model_dump(mode="json"))
+        updated_data_upload = await run_in_db_thread_as(Data_uploadResponse, update, db, identifier, data, current_user)
+        return success_response(updated_data_upload)
     except Exception as e:
         return error_response(f"Error al actualizar el registro de data upload: {e}")
 
@@ -128,13 +150,13 @@ async def update_data_upload(
 async def toggle_data_upload_state(
     identifier: str,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("eliminar_archivos"))
 ):
     try:
-        data_upload = toggle_state(db, identifier, current_user)
-        action = "activó" if data_upload.status else "desactivó"
+        data_upload = await run_in_db_thread_as(Data_uploadResponse, toggle_state, db, identifier, current_user)
+        action = "activó" if data_upload["status"] else "desactivó"
         return success_response({
-            "message": f"El usuario {current_user.user} {action} el registro {data_upload.taxpayer} - {data_upload.cologne} correctamente."
+            "message": f"El usuario {current_user.user} {action} el registro {data_upload['taxpayer']} - {data_upload['cologne']} correctamente."
         })
     except Exception as e:
         return error_response(f"Error al cambiar el estado del registro de data upload: {e}")
\ No newline at end of file
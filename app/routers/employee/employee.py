@@ -1,11 +1,11 @@
 from app.controllers.Employee.Emloyee import get_all,get_by_id,create,update,toggle_state
 from app.schemas.employee.employee import EmployeeResponse, EmployeeCreate, EmployeeUpdate
-from app.controllers.auth.auth_controller import get_current_active_user
-from app.utils.response import success_response, error_response
+from app.controllers.auth.auth_controller import require_permission
+from app.utils.response import success_response, error_response, dump_as
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix='/employee', tags=['Employee'])
@@ -16,16 +16,18 @@ async def list_employee(
     limit: int = Query(10, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por nombre, apellido o teléfono"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_empleados"))
 ):
     try:
-        employees, total = get_all(db, page, limit, search)
+        def load_page():
+            employees, total = get_all(db, page, limit, search)
+            return dump_as(EmployeeResponse, employees), total
+
+        data, total = await run_in_db_thread(load_page)
         total_pages = (total + limit - 1) // limit
         next_page = page + 1 if page < total_pages else None
         prev_page = page - 1 if page > 1 else None
 
-        data = [EmployeeResponse.model_validate(emp).model_dump(mode="json") for emp in employees]
-
         return success_response({
             "items": data,
             "pagination": {
@@ -47,11 +49,11 @@ async def list_employee(
 async def get_employee(
     employee_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_empleados"))
 ):
     try:
-        employee = get_by_id(db, employee_id)
-        return success_response(EmployeeResponse.model_validate(employee).model_dump(mode="json"))
+        employee = await run_in_db_thread_as(EmployeeResponse, get_by_id, db, employee_id)
+        return success_response(employee)
     except Exception as e:
         return error_response(f"Error al obtener el empleado: {e}")
 
@@ -59,11 +61,11 @@ async def get_employee(
 async def create_employee(
     data: EmployeeCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_empleados"))
 ):
     try:
-        new_employee = create(db, data,current_user)
-        return success_response(EmployeeResponse.model_validate(new_employee).model_dump(mode="json"))
+        new_employee = await run_in_db_thread_as(EmployeeResponse, create, db, data,current_user)
+        return success_response(new_employee)
     except Exception as e:
         return error_response(f"Error al crear el empleado: {e}")
 
@@ -72,11 +74,11 @@ async def update_employee(
     employee_id: int,
     data: EmployeeUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user) 
+    current_user: UserLogin = Depends(require_permission("actualizar_empleados")) 
 ): 
     try:
-        update_employee = update(db, employee_id,data,current_user)
-        return success_response(EmployeeResponse.model_validate(update_employee).model_dump(mode="json"))
+        update_employee = await run_in_db_thread_as(EmployeeResponse, update, db, employee_id,data,current_user)
+        return success_response(update_employee)
     except Exception as e:
         return error_response(f"Error al actualizar el empleado: {e}")
     
@@ -84,13 +86,13 @@ async def update_employee(
 async def toggle_type_employee(
     employee_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user) 
+    current_user: UserLogin = Depends(require_permission("eliminar_empleados")) 
 ): 
     try:
-        toggle_employee = toggle_state(db, employee_id,current_user)
-        action = "activo" if toggle_employee.active else "inactivo"
+        toggle_employee = await run_in_db_thread_as(EmployeeResponse, toggle_state, db, employee_id,current_user)
+        action = "activo" if toggle_employee["active"] else "inactivo"
         return success_response({
-                    "message": f"Se {action} el empleado {toggle_employee.last_name}, correctamente.",
+                    "message": f"Se {action} el empleado {toggle_employee['last_name']}, correctamente.",
                 })
     except Exception as e:
         return error_response(f"Error al cambiar el estado del empleado: {e}")
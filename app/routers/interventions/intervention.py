@@ -1,11 +1,12 @@
 from app.controllers.interventions.interventions import get_all, get_by_id, create, update, toggle_state
 from app.schemas.interventions.interventions import InterventionsResponse, InterventionsCreate, InterventionsUpdate, InterventionStatus
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.controllers.auth.auth_controller import require_permission
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix='/interventions', tags=['Interventions'])
@@ -16,29 +17,20 @@ async def list_interventions(
     limit: int = Query(10000, ge=1, le=10000, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por descripción"),
     status: Optional[InterventionStatus] = Query(None, description="Filtrar por estado: SIN INICIAR, EN CURSO, FINALIZADO"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id_interventions,status,id_pipes); por defecto todos"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_intervenciones"))
 ):
     try:
         # Convertir el enum a string para pasarlo al controlador
         status_str = status.value if status else None
-        interventions, total = get_all(db, page, limit, search, status_str)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [InterventionsResponse.model_validate(i).model_dump(mode="json") for i in interventions]
+        interventions, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, status_str, cursor, total_mode, fields)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": interventions,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         }, "Intervenciones obtenidas correctamente")
     except HTTPException:
         raise
@@ -50,12 +42,12 @@ async def list_interventions(
 async def get_intervention(
     intervention_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_intervenciones"))
 ):
     try:
-        intervention = get_by_id(db, intervention_id)
+        intervention = await run_in_db_thread_as(InterventionsResponse, get_by_id, db, intervention_id)
         return success_response(
-            InterventionsResponse.model_validate(intervention).model_dump(mode="json"),
+            intervention,
             "Intervención obtenida correctamente"
         )
     except Exception as e:
@@ -65,12 +57,12 @@ async def get_intervention(
 async def create_intervention(
     data: InterventionsCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_intervenciones"))
 ):
     try:
-        new_intervention = create(db, data, current_user)
+        new_intervention = await run_in_db_thread_as(InterventionsResponse, create, db, data, current_user)
         return success_response(
-            InterventionsResponse.model_validate(new_intervention).model_dump(mode="json"),
+            new_intervention,
             "Intervención creada correctamente"
         )
     except Exception as e:
@@ -81,12 +73,12 @@ async def update_intervention(
     intervention_id: int,
     data: InterventionsUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_intervenciones"))
 ):
     try:
-        updated_intervention = update(db, intervention_id, data, current_user)
+        updated_intervention = await run_in_db_thread_as(InterventionsResponse, update, db, intervention_id, data, current_user)
         return success_response(
-            InterventionsResponse.model_validate(updated_intervention).model_dump(mode="json"),
+            updated_intervention,
             "Intervención actualizada correctamente"
         )
     except Exception as e:
@@ -96,11 +88,11 @@ async def update_intervention(
 async def toggle_intervention_state(
     intervention_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("eliminar_intervenciones"))
 ):
     try:
-        toggle_intervention = toggle_state(db, intervention_id, current_user)
-        action = "activó" if toggle_intervention.active else "desactivó"
+        toggle_intervention = await run_in_db_thread_as(InterventionsResponse, toggle_state, db, intervention_id, current_user)
+        action = "activó" if toggle_intervention["active"] else "desactivó"
         return success_response(
             {"message": f"Se {action} la intervención correctamente."},
             f"Intervención {action} correctamente"
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response, Query
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from typing import List
+from app.db.database import get_db, run_in_db_thread
+from typing import List, Optional
 from app.schemas.map.map import TankSchema
 from app.controllers.map.map import get_all_tank_with_pipes_and_connections
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.schemas.user.user import UserLogin
-from app.controllers.map.map import get_interventions_in_range
+from app.utils.spatial import parse_bbox
+from app.controllers.map.map import get_interventions_in_range, get_tile
 
 router = APIRouter(prefix="/map", tags=["Map"])
 
 @router.get("", response_model=List[TankSchema])
-def get_all_tanks_complete(db:Session = Depends(get_db),current_user: UserLogin = Depends(get_current_active_user)):
-        return get_all_tank_with_pipes_and_connections(db)
+def get_all_tanks_complete(
+    bbox: Optional[str] = Query(None, description="Viewport minx,miny,maxx,maxy (EPSG:4326)"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Nivel de zoom del mapa, reduce la densidad en zoom bajo"),
+    db:Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+        return get_all_tank_with_pipes_and_connections(db, parse_bbox(bbox), zoom)
 
 @router.get("/map")
 def get_interventions_for_map(
@@ -21,4 +27,20 @@ def get_interventions_for_map(
     db: Session = Depends(get_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ):
-    return get_interventions_in_range(db, start_date, end_date)
\ No newline at end of file
+    return get_interventions_in_range(db, start_date, end_date)
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_map_tile(
+    z: int,
+    x: int,
+    y: int,
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    """Vector tile (Mapbox Vector Tile) con las capas tanks, bombs, pipes y connections"""
+    tile = await run_in_db_thread(get_tile, db, z, x, y)
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"Cache-Control": "private, max-age=60"}
+    )
@@ -0,0 +1,101 @@
+from app.controllers.network.network import get_neighbours, get_components, get_reachable_from_tank, get_graph_stats, rebuild_graph, get_trace
+from app.controllers.auth.auth_controller import get_current_active_user, get_current_admin_user
+from app.schemas.network.network import NetworkNodeType
+from app.utils.response import success_response, error_response
+from app.schemas.user.user import UserLogin
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import Session
+from app.db.database import get_db, run_in_db_thread
+
+router = APIRouter(prefix='/network', tags=['Network'])
+
+@router.get('/stats')
+async def network_stats(
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    try:
+        stats = await run_in_db_thread(get_graph_stats, db)
+        return success_response(stats)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al obtener el estado de la red: {e}")
+
+@router.post('/rebuild')
+async def network_rebuild(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin_user)
+):
+    """Reconstruye el grafo de este proceso desde la base de datos"""
+    try:
+        stats = await run_in_db_thread(rebuild_graph, db)
+        return success_response(stats)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al reconstruir la red: {e}")
+
+@router.get('/components')
+async def network_components(
+    only_active: bool = Query(True, description="Ignorar elementos inactivos"),
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    try:
+        components = await run_in_db_thread(get_components, db, only_active)
+        return success_response(components)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al obtener los componentes de la red: {e}")
+
+@router.get('/tanks/{tank_id}/reachable')
+async def network_reachable(
+    tank_id: int,
+    only_active: bool = Query(True, description="Ignorar elementos inactivos"),
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    try:
+        reachable = await run_in_db_thread(get_reachable_from_tank, db, tank_id, only_active)
+        return success_response(reachable)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al obtener el alcance del tanque: {e}")
+
+@router.get('/{node_type}/{entity_id}/neighbours')
+async def network_neighbours(
+    node_type: NetworkNodeType,
+    entity_id: int,
+    only_active: bool = Query(True, description="Ignorar elementos inactivos"),
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    try:
+        neighbours = await run_in_db_thread(get_neighbours, db, node_type, entity_id, only_active)
+        return success_response(neighbours)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al obtener los vecinos: {e}")
+
+@router.get('/{node_type}/{entity_id}/trace')
+async def network_trace(
+    node_type: NetworkNodeType,
+    entity_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    """
+    Trazado de una tubería o conexión: camino hasta el tanque/bomba que la alimenta
+    y elementos que se quedan sin agua si se aísla
+    """
+    try:
+        trace = await run_in_db_thread(get_trace, db, node_type, entity_id)
+        return success_response(trace)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al trazar la red: {e}")
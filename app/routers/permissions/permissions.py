@@ -3,12 +3,12 @@ from app.models.permissions.permissions import Permissions
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.permissions.permissions import PermissionsBase, PermissionsResponse, PermissionsCreate, PermissionsUpdate
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from sqlalchemy.orm import Session
 from fastapi import Depends
-from app.utils.response import success_response, error_response, existence_response_dict
+from app.utils.response import success_response, error_response, existence_response_dict, dump_as
 from app.utils.logger import create_log
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.controllers.auth.auth_controller import require_permission
 from app.schemas.user.user import UserLogin
 from app.controllers.permissions.permissions import get_all, get_by_id, create, update, toggle_state
 
@@ -20,16 +20,18 @@ async def list_permission(
     limit: int = Query(10000, ge=1, le=10000, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por nombre o descripción"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_roles"))
 ):
     try:
-        permissions, total = get_all(db, page, limit, search)
+        def load_page():
+            permissions, total = get_all(db, page, limit, search)
+            return dump_as(PermissionsResponse, permissions), total
+
+        data, total = await run_in_db_thread(load_page)
         total_pages = (total + limit - 1) // limit
         next_page = page + 1 if page < total_pages else None
         prev_page = page - 1 if page > 1 else None
 
-        data = [PermissionsResponse.model_validate(emp).model_dump(mode="json") for emp in permissions]
-
         return success_response({
             "items": data,
             "pagination": {
@@ -51,11 +53,11 @@ async def list_permission(
 async def get_permissions(
     permission_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)    
+    current_user: UserLogin = Depends(require_permission("leer_roles"))    
 ):
     try:
-        permission = get_by_id(db, permission_id)
-        return success_response(PermissionsResponse.model_validate(permission).model_dump(mode="json"))
+        permission = await run_in_db_thread_as(PermissionsResponse, get_by_id, db, permission_id)
+        return success_response(permission)
     except Exception as e:
         return error_response(f"Error al obtener el permiso {e}")
 
@@ -63,11 +65,11 @@ async def get_permissions(
 async def create_permission(
     data: PermissionsCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)  
+    current_user: UserLogin = Depends(require_permission("crear_roles"))  
 ):
     try:
-        new_permission = create(db,data,current_user)
-        return success_response(PermissionsResponse.model_validate(new_permission).model_dump(mode="json"))
+        new_permission = await run_in_db_thread_as(PermissionsResponse, create, db,data,current_user)
+        return success_response(new_permission)
     except Exception as e:
         return error_response(f"Error al crear el permiso: {e}")
 
@@ -76,11 +78,11 @@ async def update_permission(
     permission_id: int,
     data: PermissionsUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)  
+    current_user: UserLogin = Depends(require_permission("actualizar_roles"))  
 ):
     try:
-        updated_permission = update(db, permission_id, data,current_user)
-        return success_response(PermissionsResponse.model_validate(updated_permission).model_dump(mode="json"))
+        updated_permission = await run_in_db_thread_as(PermissionsResponse, update, db, permission_id, data,current_user)
+        return success_response(updated_permission)
     except Exception as e:
         return error_response(f"Error al actualizar el permiso {e}")
 
@@ -88,13 +90,13 @@ async def update_permission(
 async def toggle_permission_state(
     permission_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)  
+    current_user: UserLogin = Depends(require_permission("eliminar_roles"))  
 ):
     try:
-        toggle_permission = toggle_state(db, permission_id,current_user)
-        action = "activo" if toggle_permission.active else "inactivo"
+        toggle_permission = await run_in_db_thread_as(PermissionsResponse, toggle_state, db, permission_id,current_user)
+        action = "activo" if toggle_permission["active"] else "inactivo"
         return success_response({
-                    "message": f"Se {action} el tipo de empleado {toggle_permission.name}, correctamente.",
+                    "message": f"Se {action} el tipo de empleado {toggle_permission['name']}, correctamente.",
                 })
     except Exception as e:
         return error_response(f"Error al cambiar el estado del permiso: {e}")
@@ -1,11 +1,13 @@
 from app.controllers.pipes.pipes import get_all, get_by_id, create, update, toggle_state
 from app.schemas.pipes.pipes import PipesResponse,PipesResponseCreate,PipesUpdate
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.controllers.auth.auth_controller import require_permission
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
+from app.utils.spatial import parse_bbox
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix="/pipes", tags=["Pipes"])
@@ -15,27 +17,20 @@ async def list_pipes(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por material u observaciones"),
+    bbox: Optional[str] = Query(None, description="Viewport minx,miny,maxx,maxy (EPSG:4326)"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Nivel de zoom del mapa, reduce la densidad en zoom bajo"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id_pipes,coordinates,sector_id); por defecto todos"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_tuberias"))
 ):
     try:
-        pipes, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [PipesResponse.model_validate(p).model_dump(mode="json") for p in pipes]
+        pipes, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, parse_bbox(bbox), zoom, cursor, total_mode, fields)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": pipes,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except HTTPException:
         raise
@@ -47,11 +42,11 @@ async def list_pipes(
 async def get_pipe(
     id_pipe: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_tuberias"))
 ):
     try:
-        pipe = get_by_id(db, id_pipe)
-        return success_response(PipesResponse.model_validate(pipe).model_dump(mode="json"))
+        pipe = await run_in_db_thread_as(PipesResponse, get_by_id, db, id_pipe)
+        return success_response(pipe)
     except Exception as e:
         return error_response(f"Error al obtener la tubería: {e}")
 
@@ -59,11 +54,11 @@ async def get_pipe(
 async def create_pipe(
     data: PipesResponseCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_tuberias"))
 ):
     try:
-        new_pipe = create(db, data,current_user)
-        return success_response(PipesResponse.model_validate(new_pipe).model_dump(mode="json"))
+        new_pipe = await run_in_db_thread_as(PipesResponse, create, db, data,current_user)
+        return success_response(new_pipe)
     except Exception as e:
         return error_response(f"Error al crear la tubería: {e}")
 
@@ -72,11 +67,11 @@ async def update_pipe(
     id_pipe: int,
     data: PipesUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_tuberias"))
 ):
     try:
-        updated_pipe = update(db, id_pipe, data,current_user)
-        return success_response(PipesResponse.model_validate(updated_pipe).model_dump(mode="json"))
+        updated_pipe = await run_in_db_thread_as(PipesResponse, update, db, id_pipe, data,current_user)
+        return success_response(updated_pipe)
     except Exception as e:
         return error_response(f"Error al actualizar la tubería: {e}")
 
@@ -84,13 +79,13 @@ async def update_pipe(
 async def toggle_pipe_state(
     id_pipe: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("eliminar_tuberias"))
 ):
     try:
-        toggle_pipe = toggle_state(db, id_pipe,current_user)
-        action = "activó" if toggle_pipe.active else "inactivó"
+        toggle_pipe = await run_in_db_thread_as(PipesResponse, toggle_state, db, id_pipe,current_user)
+        action = "activó" if toggle_pipe['active'] else "inactivó"
         return success_response({
-            "message": f"Se {action} la tubería {toggle_pipe.material}, correctamente.",
+            "message": f"Se {action} la tubería {toggle_pipe['material']}, correctamente.",
         })
     except Exception as e:
         return error_response(f"Error al cambiar el estado de la tubería: {e}")
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db, run_in_db_thread
 from app.schemas.log.logs import LogSummaryResponse, LogBase
 from app.schemas.user.user import UserLogin
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.controllers.auth.auth_controller import get_current_active_user, require_permission
 from app.controllers.Report.report import (
     get_logs_summary_controller,
     get_logs_detail_controller,
@@ -34,6 +36,12 @@ from app.controllers.Report.report import (
     report_plumber
 )
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.schemas.jobs.jobs import ReportJobCreate, JobResponse
+from app.jobs.store import JobStore, STATUS_COMPLETED
+from app.jobs.runner import submit_report_job
+from app.jobs.reports import validate_report_params, available_reports
+import os
 router = APIRouter(prefix='/report', tags=['Reports'])
 
 
@@ -45,7 +53,7 @@ async def get_logs_summary(
     db: Session = Depends(get_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ):
-    return get_logs_summary_controller(db, date_start, date_finish, name_entity)
+    return await run_in_db_thread(get_logs_summary_controller, db, date_start, date_finish, name_entity)
 
 
 @router.get("/logs/detail", response_model=List[LogBase])
@@ -56,15 +64,15 @@ async def get_logs_detail(
     db: Session = Depends(get_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ):
-    return get_logs_detail_controller(db, date_start, date_finish, name_entity)
+    return await run_in_db_thread(get_logs_detail_controller, db, date_start, date_finish, name_entity)
 
 
 @router.get("/entities")
 async def get_available_entities(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ):
-    entities = get_available_entities_controller(db)
+    entities = await get_available_entities_controller(db)
     return {"entities": entities}
 
 
@@ -87,7 +95,7 @@ async def export_logs_to_excel(
         current_user: Usuario autenticado
     
     Returns:
-        Response: Archivo Excel para descargar
+        FileResponse: Archivo Excel para descargar
     """
     try:
         # Preparar información del usuario
@@ -96,8 +104,9 @@ async def export_logs_to_excel(
             'username': current_user.user if hasattr(current_user, 'user') else 'Usuario'
         }
         
-        # Generar Excel
-        excel_buffer = export_logs_to_excel_controller(
+        # Generar Excel (archivo temporal escrito en modo write-only)
+        excel_path = await run_in_db_thread(
+            export_logs_to_excel_controller,
             db=db,
             date_start=date_start,
             date_finish=date_finish,
@@ -109,13 +118,12 @@ async def export_logs_to_excel(
         current_date = datetime.now().strftime('%Y-%m-%d')
         filename = f"reporte-{name_entity}-{current_date}.xlsx"
         
-        # Retornar archivo Excel como respuesta
-        return Response(
-            content=excel_buffer.read(),
+        # Enviar el archivo y eliminarlo al terminar la respuesta
+        return FileResponse(
+            excel_path,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+            filename=filename,
+            background=BackgroundTask(os.remove, excel_path)
         )
     except Exception as e:
         # El manejo de errores ya está en el controller
@@ -129,7 +137,7 @@ async def report_pipes_sector_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_pipes_by_sector(db, id_sector)
+        report = await run_in_db_thread(report_pipes_by_sector, db, id_sector)
         return {
             "success": True,
             "message": "Reporte generado correctamente",
@@ -147,7 +155,7 @@ async def report_interventions_pipes_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_interventions_by_pipes(db, id_pipes, date_start, date_finish)
+        report = await run_in_db_thread(report_interventions_by_pipes, db, id_pipes, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de intervenciones de tubería generado",
@@ -165,7 +173,7 @@ async def report_interventions_connection_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_interventions_by_connections(db, id_connection, date_start, date_finish)
+        report = await run_in_db_thread(report_interventions_by_connections, db, id_connection, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de intervenciones de conexión generado",
@@ -180,7 +188,7 @@ async def report_comparative_sectors(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_sector_comparative(db)
+        report = await run_in_db_thread(report_sector_comparative, db)
         return {
             "success": True,
             "message": "Reporte comparativo entre sectores generado",
@@ -197,7 +205,7 @@ async def report_all_interventions(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_interventions(db, date_start, date_finish)
+        report = await run_in_db_thread(report_interventions, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte general de intervenciones generado",
@@ -216,7 +224,7 @@ async def report_interventions_by_sector_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_interventions_by_sector(db, date_start, date_finish)
+        report = await run_in_db_thread(report_interventions_by_sector, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de intervenciones por sector generado",
@@ -233,7 +241,7 @@ async def report_intervention_frequency_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_intervention_frequency(db, date_start, date_finish)
+        report = await run_in_db_thread(report_intervention_frequency, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de frecuencia de intervenciones generado",
@@ -248,7 +256,7 @@ async def report_tanks_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_tanks(db)
+        report = await run_in_db_thread(report_tanks, db)
         return {
             "success": True,
             "message": "Reporte de tanques generado correctamente",
@@ -263,7 +271,7 @@ async def report_tanks_status_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_tank_status(db)
+        report = await run_in_db_thread(report_tank_status, db)
         return {
             "success": True,
             "message": "Reporte de estado de tanques generado",
@@ -275,10 +283,10 @@ async def report_tanks_status_(
 @router.get("/deviations")
 async def report_deviations_(
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_desvios"))
 ):
     try:
-        report = report_deviations(db)
+        report = await run_in_db_thread(report_deviations, db)
         return {
             "success": True,
             "message": "Reporte de desvíos generado",
@@ -295,7 +303,7 @@ async def report_assigned_jobs_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_assigned_jobs(db, date_start, date_finish)
+        report = await run_in_db_thread(report_assigned_jobs, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de trabajos asignados generado correctamente",
@@ -312,7 +320,7 @@ async def report_assigned_jobs_by_status_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_assigned_jobs_by_status(db, date_start, date_finish)
+        report = await run_in_db_thread(report_assigned_jobs_by_status, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de trabajos por estado generado correctamente",
@@ -327,10 +335,10 @@ async def report_plumber_(
     date_start: str,
     date_finish: str,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_fontaneros"))
 ):
     try:
-        report = report_plumber(db, employee_id, date_start, date_finish)
+        report = await run_in_db_thread(report_plumber, db, employee_id, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de fontanero generado",
@@ -344,10 +352,10 @@ async def report_top_plumbers_(
     date_start: str,
     date_finish: str,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_fontaneros"))
 ):
     try:
-        report = report_top_plumbers(db, date_start, date_finish)
+        report = await run_in_db_thread(report_top_plumbers, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Fontaneros más activos generados",
@@ -365,7 +373,7 @@ async def report_operator_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_operator(db, employee_id, date_start, date_finish)
+        report = await run_in_db_thread(report_operator, db, employee_id, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de operador generado",
@@ -382,7 +390,7 @@ async def report_top_operators_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_top_operators(db, date_start, date_finish)
+        report = await run_in_db_thread(report_top_operators, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Operadores más activos generados",
@@ -399,7 +407,7 @@ async def report_readers_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_readers(db, date_start, date_finish)
+        report = await run_in_db_thread(report_readers, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Reporte de lectores generado",
@@ -416,7 +424,7 @@ async def report_top_readers_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_top_readers(db, date_start, date_finish)
+        report = await run_in_db_thread(report_top_readers, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Lectores más activos generados",
@@ -431,7 +439,7 @@ async def report_cleaners_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_encargados_limpieza(db)
+        report = await run_in_db_thread(report_encargados_limpieza, db)
         return {
             "success": True,
             "message": "Reporte encargados de limpieza generado",
@@ -448,11 +456,98 @@ async def report_top_cleaners_(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        report = report_top_cleaners(db, date_start, date_finish)
+        report = await run_in_db_thread(report_top_cleaners, db, date_start, date_finish)
         return {
             "success": True,
             "message": "Encargados de limpieza más activos generados",
             "data": report
         }
     except Exception as e:
-        raise HTTPException(500, f"Error reporte limpieza activos: {e}") 
\ No newline at end of file
+        raise HTTPException(500, f"Error reporte limpieza activos: {e}") 
+
+
+# ----- Trabajos en segundo plano -----
+def _job_response(job: dict, request: Request) -> dict:
+    data = JobResponse(**job).model_dump()
+    if job["status"] == STATUS_COMPLETED and job.get("artifact"):
+        # url_for incluye el prefijo /api/v1 con el que se monta el router
+        data["result_url"] = str(request.url_for("get_report_job_result", job_id=job["id"]))
+    return data
+
+
+def _get_user_job(job_id: str, current_user) -> dict:
+    job = JobStore().get(job_id)
+    if not job or job.get("user_id") != current_user.id_user:
+        raise HTTPException(404, "Trabajo no encontrado")
+    return job
+
+
+@router.get("/jobs/available")
+async def list_available_report_jobs(
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    return {
+        "success": True,
+        "message": "Reportes disponibles",
+        "data": available_reports()
+    }
+
+
+@router.post("/jobs", status_code=202)
+async def create_report_job(
+    data: ReportJobCreate,
+    request: Request,
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    """
+    Encola un reporte para ejecutarse en segundo plano.
+    El estado se consulta en GET /report/jobs/{id} y el resultado en /report/jobs/{id}/result
+    """
+    params = validate_report_params(data.report, data.params)
+    user_info = {
+        'user_id': current_user.id_user,
+        'username': current_user.user
+    }
+    job = await run_in_threadpool(submit_report_job, data.report, params, current_user.id_user, user_info)
+    return {
+        "success": True,
+        "message": "Reporte encolado",
+        "data": _job_response(job, request)
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    request: Request,
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    job = _get_user_job(job_id, current_user)
+    return {
+        "success": True,
+        "message": "Estado del reporte",
+        "data": _job_response(job, request)
+    }
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_report_job_result(
+    job_id: str,
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    job = _get_user_job(job_id, current_user)
+    if job["status"] != STATUS_COMPLETED:
+        raise HTTPException(409, "El reporte aún no está listo")
+
+    path = JobStore().artifact_path(job)
+    if not path:
+        raise HTTPException(410, "El resultado del reporte ya no está disponible")
+
+    if path.endswith(".xlsx"):
+        current_date = datetime.now().strftime('%Y-%m-%d')
+        return FileResponse(
+            path,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename=f"reporte-{job['params'].get('name_entity', job['name'])}-{current_date}.xlsx"
+        )
+    return FileResponse(path, media_type="application/json")
@@ -1,11 +1,12 @@
 from app.controllers.Rol.rol import get_all, get_by_id, create, update, get_permissions_grouped
 from app.schemas.rol.rol import RolBase, RolCreate, RolUpdate, RolResponse
-from app.controllers.auth.auth_controller import get_current_active_user
-from app.utils.response import success_response, error_response
+from app.controllers.auth.auth_controller import require_permission
+from app.utils.response import success_response, error_response, dump_as
+from app.utils.pagination import pagination_envelope, TotalMode
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 from fastapi import HTTPException
 
@@ -16,28 +17,21 @@ async def list_rol(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por nombre o descripción"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_roles"))
 ):
     try:
-        roles, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
+        def load_page():
+            roles, total, page_info = get_all(db, page, limit, search, cursor, total_mode)
+            return dump_as(RolResponse, roles), total, page_info
 
-        data = [RolResponse.model_validate(emp).model_dump(mode="json") for emp in roles]
-
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
+        data, total, page_info = await run_in_db_thread(load_page)
 
         return success_response({
             "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except HTTPException:
         raise
@@ -47,10 +41,10 @@ async def list_rol(
 @router.get('/permissions/grouped')
 async def get_grouped_permissions(
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_roles"))
 ):
     try:
-        grouped_permissions = get_permissions_grouped(db)
+        grouped_permissions = await run_in_db_thread(get_permissions_grouped, db)
         return success_response(grouped_permissions)
     except Exception as e:
         return error_response(f"Error al obtener los permisos agrupados: {e}")
@@ -59,10 +53,10 @@ async def get_grouped_permissions(
 async def get_rol(
     id_rol : int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_roles"))
 ):
     try: 
-        rol = get_by_id(db, id_rol)
+        rol = await run_in_db_thread(get_by_id, db, id_rol)
         return success_response(rol)
     except Exception as e:
         return error_response(f"Error al obtener el rol: {e}")
@@ -71,11 +65,11 @@ async def get_rol(
 async def create_rol(
     data: RolCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_roles"))
 ):
     try:
-        new_rol = create(db, data,current_user)
-        return success_response(RolResponse.model_validate(new_rol).model_dump(mode="json"))
+        new_rol = await run_in_db_thread_as(RolResponse, create, db, data,current_user)
+        return success_response(new_rol)
     except HTTPException:
         raise
     except Exception as e:
@@ -86,11 +80,11 @@ async def update_rol(
     id_rol: int,
     data: RolUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_roles"))
 ):
     try:
-        updated_rol = update(db, id_rol, data, current_user)
-        return success_response(RolResponse.model_validate(updated_rol).model_dump(mode="json"))
+        updated_rol = await run_in_db_thread_as(RolResponse, update, db, id_rol, data, current_user)
+        return success_response(updated_rol)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,31 @@
+from app.controllers.search.search import search_entities, SEARCH_SOURCES, SEARCH_MIN_LENGTH
+from app.controllers.auth.auth_controller import get_current_active_user
+from app.utils.response import success_response, error_response
+from app.schemas.user.user import UserLogin
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import Session
+from app.db.database import get_db, run_in_db_thread
+from typing import Optional
+
+router = APIRouter(prefix='/search', tags=['Search'])
+
+@router.get('')
+async def search(
+    q: str = Query(..., min_length=SEARCH_MIN_LENGTH, description="Texto a buscar"),
+    types: Optional[str] = Query(None, description=f"Tipos separados por coma: {', '.join(SEARCH_SOURCES)}"),
+    limit: int = Query(20, ge=1, le=100, description="Máximo de resultados"),
+    db: Session = Depends(get_db),
+    current_user: UserLogin = Depends(get_current_active_user)
+):
+    """Busca en tuberías, conexiones, tanques, bombas, sectores, intervenciones y contribuyentes"""
+    try:
+        selected = [t.strip() for t in types.split(',') if t.strip()] if types else None
+        items = await run_in_db_thread(search_entities, db, q, limit, selected, current_user.permission_mask)
+        return success_response({
+            "query": q,
+            "items": items
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error al realizar la búsqueda: {e}")
@@ -2,10 +2,11 @@ from app.controllers.sector.sector import get_all, get_by_id, create, update, to
 from app.schemas.sector.sector import SectorResponse, SectorCreate, SectorUpdate, SectorBase
 from app.controllers.auth.auth_controller import get_current_active_user
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix = '/sector', tags = ['Sector'])
@@ -15,27 +16,17 @@ async def list_sectors(
     page: int = Query(1, ge=1, description = "Número de página"),
     limit: int = Query(5, ge = 1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por nombre o descripción"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
     db: Session = Depends(get_db),
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        sectors, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [SectorResponse.model_validate(emp).model_dump(mode="json") for emp in sectors]
+        sectors, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, cursor, total_mode)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": sectors,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -47,8 +38,8 @@ async def get_sector(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        sector = get_by_id(db, sector_id)
-        return success_response(SectorResponse.model_validate(sector).model_dump(mode="json"))
+        sector = await run_in_db_thread_as(SectorResponse, get_by_id, db, sector_id)
+        return success_response(sector)
     except Exception as e:
         return error_response(f"Error al obtener el sector: {e}")
     
@@ -59,8 +50,8 @@ async def create_sector(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        sector = create(db, data, current_user)
-        return success_response(SectorResponse.model_validate(sector).model_dump(mode="json"))
+        sector = await run_in_db_thread_as(SectorResponse, create, db, data, current_user)
+        return success_response(sector)
     except Exception as e:
         return error_response(f"Error al crear el sector: {e}")
     
@@ -72,8 +63,8 @@ async def update_sector(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        sector = update(db, sector_id, data, current_user)
-        return success_response(SectorResponse.model_validate(sector).model_dump(mode="json"))
+        sector = await run_in_db_thread_as(SectorResponse, update, db, sector_id, data, current_user)
+        return success_response(sector)
     except Exception as e:
         return error_response(f"Error al actualizar el sector: {e}")
     
@@ -84,10 +75,10 @@ async def toggle_sector_state(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        toogle_sector = toggle_state(db, sector_id, current_user)
-        action = "activo" if toogle_sector.active else "inactivo"
+        toogle_sector = await run_in_db_thread_as(SectorResponse, toggle_state, db, sector_id, current_user)
+        action = "activo" if toogle_sector["active"] else "inactivo"
         return success_response({
-            "message": f"Se {action} el sector '{toogle_sector.name}', correctamente."
+            "message": f"Se {action} el sector '{toogle_sector['name']}', correctamente."
         })
     except Exception as e:
         return error_response(f"Error al cambiar el estado del sector: {e}")
\ No newline at end of file
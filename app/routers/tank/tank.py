@@ -1,11 +1,13 @@
 from app.controllers.Tank.tank import get_all, get_by_id, create, update, toggle_state
 from app.schemas.tanks.tanks import TankResponse, TankCreate, TankUpdate 
-from app.controllers.auth.auth_controller import get_current_active_user
+from app.controllers.auth.auth_controller import require_permission
 from app.utils.response import success_response, error_response
+from app.utils.pagination import pagination_envelope, TotalMode
+from app.utils.spatial import parse_bbox
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix='/tank', tags=['Tank'])
@@ -15,27 +17,20 @@ async def list_tanks(
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(5, ge=1, le=100, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por nombre o conexiones"),
+    bbox: Optional[str] = Query(None, description="Viewport minx,miny,maxx,maxy (EPSG:4326)"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Nivel de zoom del mapa, reduce la densidad en zoom bajo"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de paginación por keyset (vacío para la primera página); reemplaza a page"),
+    total_mode: TotalMode = Query("exact", alias="total", description="Total de registros: exact, estimate (estimación del planner, sin filtros) o none (scroll infinito)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (p. ej. id_tank,latitude,longitude); por defecto todos"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_tanques"))
 ): 
     try:
-        tanks, total = get_all(db, page, limit, search)
-        total_pages = (total + limit - 1) // limit
-        next_page = page + 1 if page < total_pages else None
-        prev_page = page - 1 if page > 1 else None
-
-        data = [TankResponse.model_validate(emp).model_dump(mode="json") for emp in tanks]
+        tanks, total, page_info = await run_in_db_thread(get_all, db, page, limit, search, parse_bbox(bbox), zoom, cursor, total_mode, fields)
 
         return success_response({
-            "items": data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_items": total,
-                "total_pages": total_pages,
-                "next_page": next_page,
-                "prev_page": prev_page
-            }
+            "items": tanks,
+            "pagination": pagination_envelope(page, limit, total, page_info)
         })
     except HTTPException:
         raise
@@ -47,11 +42,11 @@ async def list_tanks(
 async def get_tank(
     tank_id: int, 
     db: Session = Depends(get_db), 
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_tanques"))
 ):
     try:
-        tank = get_by_id(db, tank_id)
-        return success_response(TankResponse.model_validate(tank).model_dump(mode="json"))
+        tank = await run_in_db_thread_as(TankResponse, get_by_id, db, tank_id)
+        return success_response(tank)
     except Exception as e:
         return error_response(f"Error al obtener el tipo de tanque: {e}")
 
@@ -59,11 +54,11 @@ async def get_tank(
 async def create_tank(
     data: TankCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_tanques"))
 ):
     try:
-        new_tank = create(db, data,current_user)
-        return success_response(TankResponse.model_validate(new_tank).model_dump(mode="json"))
+        new_tank = await run_in_db_thread_as(TankResponse, create, db, data,current_user)
+        return success_response(new_tank)
     except Exception as e:
         return error_response(f"Error al crear el tanque: {e}")
 
@@ -72,11 +67,11 @@ async def update_tank(
     tank_id: int,
     data: TankUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_tanques"))
 ):
     try:
-        tank_updated = update(db, tank_id, data,current_user)
-        return success_response(TankResponse.model_validate(tank_updated).model_dump(mode="json"))
+        tank_updated = await run_in_db_thread_as(TankResponse, update, db, tank_id, data,current_user)
+        return success_response(tank_updated)
     except Exception as e:
         return error_response(f"Error al actualizar el tanque {e}")
     
@@ -84,13 +79,13 @@ async def update_tank(
 async def toggle_tank_state(
     tank_id: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("eliminar_tanques"))
 ): 
     try:
-        toggle_tank = toggle_state(db, tank_id,current_user)
-        action = "activo" if toggle_tank.active else "inactivo"
+        toggle_tank = await run_in_db_thread_as(TankResponse, toggle_state, db, tank_id,current_user)
+        action = "activo" if toggle_tank['active'] else "inactivo"
         return success_response({
-            "message": f"Se {action} el tanque '{toggle_tank.name}', correctamente."
+            "message": f"Se {action} el tanque '{toggle_tank['name']}', correctamente."
         })
     except Exception as e:
         return error_response(f"Error al cambiar el estado del tanque: {e}")
\ No newline at end of file
@@ -1,11 +1,11 @@
 from app.controllers.type_employee.type_employees import get_all, get_by_id, create, update, toggle_state
 from app.schemas.type_employee.type_employees import TypeEmployeeResponse, TypeEmployeeCreate, TypeEmployeeUpdate
 from app.controllers.auth.auth_controller import get_current_active_user
-from app.utils.response import success_response, error_response
+from app.utils.response import success_response, error_response, dump_as
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix='/type_employee', tags=['Type Employee'])
@@ -19,13 +19,15 @@ async def list_type_employees(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        type_employees, total = get_all(db, page, limit, search)
+        def load_page():
+            type_employees, total = get_all(db, page, limit, search)
+            return dump_as(TypeEmployeeResponse, type_employees), total
+
+        data, total = await run_in_db_thread(load_page)
         total_pages = (total + limit - 1) // limit
         next_page = page + 1 if page < total_pages else None
         prev_page = page - 1 if page > 1 else None
 
-        data = [TypeEmployeeResponse.model_validate(emp).model_dump(mode="json") for emp in type_employees]
-
         return success_response({
             "items": data,
             "pagination": {
@@ -49,8 +51,8 @@ async def get_type_employee(
     current_user: UserLogin = Depends(get_current_active_user)
 ): 
     try:
-        type_employee = get_by_id(db, id_type_employee)
-        return success_response(TypeEmployeeResponse.model_validate(type_employee).model_dump(mode="json"))
+        type_employee = await run_in_db_thread_as(TypeEmployeeResponse, get_by_id, db, id_type_employee)
+        return success_response(type_employee)
     except Exception as e:
         return error_response(f"Error al obtener el tipo de empleado: {e}")
     
@@ -61,8 +63,8 @@ async def create_type_employee(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        new_type_employee = create(db, data,current_user)
-        return success_response(TypeEmployeeResponse.model_validate(new_type_employee).model_dump(mode="json"))
+        new_type_employee = await run_in_db_thread_as(TypeEmployeeResponse, create, db, data,current_user)
+        return success_response(new_type_employee)
     except Exception as e:
         return error_response(f"Error al crear el tipo de empleado: {e}")
     
@@ -74,8 +76,8 @@ async def update_type_employee(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        updated_type_employee = update(db, id_type_employee,data,current_user)
-        return success_response(TypeEmployeeResponse.model_validate(updated_type_employee).model_dump(mode="json"))
+        updated_type_employee = await run_in_db_thread_as(TypeEmployeeResponse, update, db, id_type_employee,data,current_user)
+        return success_response(updated_type_employee)
     except Exception as e:
         return error_response(f"Error al actualizar el tipo de empleado: {e}")
 
@@ -86,10 +88,10 @@ async def toggle_type_employee_state(
     current_user: UserLogin = Depends(get_current_active_user)
 ):
     try:
-        toggle_type_employee = toggle_state(db, id_type_employee,current_user)
-        action = "activo" if toggle_type_employee.active else "inactivo"
+        toggle_type_employee = await run_in_db_thread_as(TypeEmployeeResponse, toggle_state, db, id_type_employee,current_user)
+        action = "activo" if toggle_type_employee["active"] else "inactivo"
         return success_response({
-                    "message": f"Se {action} el tipo de empleado {toggle_type_employee.name}, correctamente.",
+                    "message": f"Se {action} el tipo de empleado {toggle_type_employee['name']}, correctamente.",
                 })
     except Exception as e:
         return error_response(f"Error al cambiar el estado del tipo de empleado: {e}")
\ No newline at end of file
@@ -1,11 +1,11 @@
 from app.controllers.User.user import get_all, get_by_id, create, update, toggle_state
 from app.schemas.user.user import UserResponse, UserCreate, UserUpdate
-from app.controllers.auth.auth_controller import get_current_active_user
-from app.utils.response import success_response, error_response
+from app.controllers.auth.auth_controller import require_permission
+from app.utils.response import success_response, error_response, dump_as
 from app.schemas.user.user import UserLogin
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, run_in_db_thread, run_in_db_thread_as
 from typing import List, Optional
 
 router = APIRouter(prefix='/user', tags=['User'])
@@ -16,16 +16,18 @@ async def list_user(
     limit: int = Query(10000, ge=1, le=10000, description="Límite de resultados por página"),
     search: Optional[str] = Query(None, description="Término de búsqueda para filtrar por usuario o email"),
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_usuarios"))
 ):
     try: 
-        users, total = get_all(db, page, limit, search)
+        def load_page():
+            users, total = get_all(db, page, limit, search)
+            return dump_as(UserResponse, users), total
+
+        data, total = await run_in_db_thread(load_page)
         total_pages = (total + limit - 1) // limit
         next_page = page + 1 if page < total_pages else None
         prev_page = page - 1 if page > 1 else None
 
-        data = [UserResponse.model_validate(emp).model_dump(mode="json") for emp in users]
-
         return success_response({
             "items": data,
             "pagination": {
@@ -47,11 +49,11 @@ async def list_user(
 async def get_user(
     id_user: int,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("leer_usuarios"))
 ):
     try:
-        user = get_by_id(db, id_user)
-        return success_response(UserResponse.model_validate(user).model_dump(mode="json"))
+        user = await run_in_db_thread_as(UserResponse, get_by_id, db, id_user)
+        return success_response(user)
     except Exception as e:
         return error_response(f"Error al obtener el usuario: {e}")
 
@@ -59,11 +61,11 @@ async def get_user(
 async def create_user(
     data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("crear_usuarios"))
 ):
     try:
-        new_user = create(db, data,current_user)
-        return success_response(UserResponse.model_validate(new_user).model_dump(mode="json"))
+        new_user = await run_in_db_thread_as(UserResponse, create, db, data,current_user)
+        return success_response(new_user)
     except Exception as e:
         return error_response(f"Error al crear el usuario: {e}")
 
@@ -72,11 +74,11 @@ async def update_user(
     id_user: int,
     data: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("actualizar_usuarios"))
 ):
     try:
-        update_user  = update(db, id_user, data,current_user)
-        return success_response(UserResponse.model_validate(update_user).model_dump(mode="json"))
+        update_user  = await run_in_db_thread_as(UserResponse, update, db, id_user, data,current_user)
+        return success_response(update_user)
     except Exception as e:
         return error_response(f"Error al actualizar el usuario: {e}")
 
@@ -84,13 +86,13 @@ async def update_user(
 async def toggle_user(
     id_user: int,
     db: Session = Depends (get_db),
-    current_user: UserLogin = Depends(get_current_active_user)
+    current_user: UserLogin = Depends(require_permission("eliminar_usuarios"))
 ):
     try:
-        toggle_user = toggle_state(db, id_user,current_user)
-        action = "activo" if toggle_user.active else "inactivo"
+        toggle_user = await run_in_db_thread_as(UserResponse, toggle_state, db, id_user,current_user)
+        action = "activo" if toggle_user["active"] else "inactivo"
         return success_response({
-            "message": f"Se {action} el usuario {toggle_user.user}, correctamente.",
+            "message": f"Se {action} el usuario {toggle_user['user']}, correctamente.",
         })
     except Exception as e: 
         return error_response(f"Error al cambiar el estado del usuario: {e}")
\ No newline at end of file
@@ -4,6 +4,10 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
-    
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     username: Optional[str] = None
\ No newline at end of file
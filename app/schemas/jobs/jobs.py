@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class ReportJobCreate(BaseModel):
+    report: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    name: str
+    status: str
+    progress: int
+    message: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result_url: Optional[str] = None
+
+
+class UploadJobStats(BaseModel):
+    rows_processed: int = 0
+    rows_rejected: int = 0
+    created_records: int = 0
+    updated_records: int = 0
+    rows_per_second: float = 0.0
+
+
+class UploadJobResponse(JobResponse):
+    stats: UploadJobStats = Field(default_factory=UploadJobStats)
+    errors: List[str] = Field(default_factory=list)
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class NetworkNodeType(str, Enum):
+    tank = "tank"
+    bomb = "bomb"
+    pipe = "pipe"
+    connection = "connection"
@@ -1,6 +1,7 @@
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple
 from datetime import datetime
+from openpyxl import load_workbook
 import sys
 import os
 
@@ -8,186 +9,119 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 from app.schemas.data_upload.data_upload import Data_uploadCreate
 
+# calamine (python-calamine) es opcional: si está instalado se usa para leer el archivo
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Filas del encabezado del reporte antes de la fila con los nombres de columna
+HEADER_ROWS = 8
+# Número con el que se reporta la primera fila de datos (y se generan los AUTO-)
+FIRST_ROW_NUMBER = 9
+# Filas por lote en la carga en segundo plano
+CHUNK_ROWS = int(os.getenv("DATA_UPLOAD_CHUNK_ROWS", "5000"))
+
+# Mapear posibles variaciones de nombres de columnas
+COLUMN_MAPPING = {
+    'IDENTIFICA': 'IDENTIFICA',
+    'IDENTIFICADOR': 'IDENTIFICA',
+    'ID': 'IDENTIFICA',
+    'CONTRIBUYENTE': 'CONTRIBUYENTE',
+    'COLONIA': 'COLONIA',
+    'CAT_SERVICIO': 'CAT_SERVICIO',
+    'CATEGORIA': 'CAT_SERVICIO',
+    'CANON': 'CANON',
+    'EXCESO': 'EXCESO',
+    'TOTAL': 'TOTAL'
+}
+REQUIRED_COLUMNS = ['CONTRIBUYENTE', 'COLONIA']
+
+
+def cell_text(value, default=None):
+    """
+    Texto de una celda, igual en la carga en memoria y en la carga por lotes
+    
+    Las celdas se leen como objeto (sin inferir el tipo de la columna), así un
+    número entero que llega como float (12345.0) queda siempre como '12345' y
+    el identificador no depende de si la columna o el lote tiene vacíos.
+    """
+    if value is None or pd.isna(value):
+        return default
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_sheet_rows(path: str) -> Iterator[tuple]:
+    """Filas de la primera hoja como tuplas, sin cargar el libro completo como DataFrame"""
+    if CalamineWorkbook is not None:
+        sheet = CalamineWorkbook.from_path(path).get_sheet_by_index(0)
+        for row in sheet.iter_rows():
+            # calamine devuelve "" en las celdas vacías
+            yield tuple(None if value == "" else value for value in row)
+    elif path.lower().endswith(".xlsx"):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+    else:
+        # .xls sin calamine: openpyxl no lo lee, se usa pandas
+        for row in pd.read_excel(path, header=None, dtype=object).itertuples(index=False):
+            yield tuple(None if pd.isna(value) else value for value in row)
+
+
+def sheet_row_count(path: str) -> Optional[int]:
+    """Número de filas declarado por la hoja (para calcular el progreso), si se conoce"""
+    try:
+        if CalamineWorkbook is not None:
+            return CalamineWorkbook.from_path(path).get_sheet_by_index(0).height
+        if path.lower().endswith(".xlsx"):
+            wb = load_workbook(path, read_only=True)
+            try:
+                return wb.worksheets[0].max_row
+            finally:
+                wb.close()
+    except Exception:
+        pass
+    return None
+
+
 class ExcelProcessor:
     def __init__(self, current_user=None):
         self.current_user = current_user
         self.valid_data = []
         self.errors = []
+        self.report_fields = None
     
     def process_excel_content(self, file_content: bytes) -> Tuple[List[Data_uploadCreate], List[str]]:
         """Procesa contenido de Excel y retorna datos para la BD"""
         try:
-            # Leer las primeras filas para extraer información del encabezado
-            header_df = pd.read_excel(file_content, nrows=8, header=None)
-            
-            # Extraer información del encabezado
-            report_date = None
-            report_hour = None
-            report_seriereport = None
-            report_user = None
-            report_municipality = None
-            report_department = None
+            # Una sola lectura: las primeras 8 filas son el encabezado del reporte,
+            # la 9 los nombres de columna y el resto los datos
+            raw_df = pd.read_excel(file_content, header=None, dtype=object)
+            if len(raw_df) <= HEADER_ROWS:
+                raise pd.errors.EmptyDataError()
             
-            # Buscar en las primeras 8 filas
-            for idx, row in header_df.iterrows():
-                # Unir todas las celdas de la fila en un string
-                row_cells = [str(cell) for cell in row.values if pd.notna(cell) and str(cell).strip()]
-                row_str = ' '.join(row_cells).upper()
-                
-                # Debug: imprimir cada fila para ver qué contiene
-                if idx < 5:  # Solo imprimir las primeras 5 filas para debug
-                    print(f"Fila {idx}: {row_str[:200]}")  # Limitar a 200 caracteres
-                
-                # Buscar fecha (formato: Fecha:25/08/2025 o similar)
-                if 'FECHA:' in row_str:
-                    fecha_match = row_str.split('FECHA:')
-                    if len(fecha_match) > 1:
-                        fecha_str = fecha_match[1].strip().split()[0]  # Tomar solo la fecha
-                        try:
-                            # Intentar parsear diferentes formatos de fecha
-                            if '/' in fecha_str:
-                                parts = fecha_str.split('/')
-                                if len(parts) == 3:
-                                    day, month, year = parts
-                                    report_date = datetime(int(year), int(month), int(day))
-                        except:
-                            pass
-                
-                # Buscar hora (formato: Hora:16:23 o similar)
-                if 'HORA:' in row_str:
-                    hora_match = row_str.split('HORA:')
-                    if len(hora_match) > 1:
-                        hora_str = hora_match[1].strip().split()[0]  # Tomar solo la hora
-                        try:
-                            if ':' in hora_str:
-                                parts = hora_str.split(':')
-                                if len(parts) >= 2:
-                                    hour_val = int(parts[0])
-                                    minute_val = int(parts[1])
-                                    report_hour = datetime.now().replace(hour=hour_val, minute=minute_val, second=0, microsecond=0).time()
-                        except:
-                            pass
-                
-                # Buscar seriereport (formato: Reporte: R00809001.rpt)
-                if 'REPORTE:' in row_str and '.RPT' in row_str:
-                    report_match = row_str.split('REPORTE:')
-                    if len(report_match) > 1:
-                        report_seriereport = report_match[1].strip().split()[0]
-                
-                # Buscar usuario (formato: Usuario:CAMACHO)
-                if 'USUARIO:' in row_str:
-                    user_match = row_str.split('USUARIO:')
-                    if len(user_match) > 1:
-                        report_user = user_match[1].strip().split()[0]
-                
-                # Buscar municipio (formato: MUNICIPALIDAD DE PALESTINA DE LOS ALTOS)
-                # Puede estar en una celda completa o en múltiples celdas
-                if 'MUNICIPALIDAD' in row_str and 'DE' in row_str:
-                    # Buscar el patrón "MUNICIPALIDAD DE" seguido del nombre
-                    if 'MUNICIPALIDAD DE' in row_str:
-                        municipio_match = row_str.split('MUNICIPALIDAD DE')
-                        if len(municipio_match) > 1:
-                            # Tomar todo después de "MUNICIPALIDAD DE"
-                            municipio_text = municipio_match[1].strip()
-                            # Si hay "DEPARTAMENTO" después, cortar ahí
-                            if 'DEPARTAMENTO' in municipio_text:
-                                municipio_text = municipio_text.split('DEPARTAMENTO')[0].strip()
-                            # Eliminar cualquier texto después de palabras clave como "HORA:", "FECHA:", "REPORTE:", "USUARIO:"
-                            for keyword in ['HORA:', 'FECHA:', 'REPORTE:', 'USUARIO:', 'CLASIFICACIÓN', 'INSTITUCIONAL']:
-                                if keyword in municipio_text:
-                                    municipio_text = municipio_text.split(keyword)[0].strip()
-                            # Limpiar espacios múltiples y caracteres especiales
-                            municipio_text = ' '.join(municipio_text.split())
-                            if municipio_text and len(municipio_text) > 3:  # Validar que tenga contenido real
-                                report_municipality = municipio_text
-                
-                # Buscar departamento (formato: DEPARTAMENTO DE QUETZALTENANGO)
-                if 'DEPARTAMENTO DE' in row_str:
-                    depto_match = row_str.split('DEPARTAMENTO DE')
-                    if len(depto_match) > 1:
-                        depto_text = depto_match[1].strip()
-                        # Eliminar cualquier texto después de palabras clave
-                        for keyword in ['HORA:', 'FECHA:', 'REPORTE:', 'USUARIO:', 'CLASIFICACIÓN', 'INSTITUCIONAL', 'MUNICIPALIDAD']:
-                            if keyword in depto_text:
-                                depto_text = depto_text.split(keyword)[0].strip()
-                        # Limpiar espacios múltiples
-                        depto_text = ' '.join(depto_text.split())
-                        if depto_text and len(depto_text) > 3:  # Validar que tenga contenido real
-                            report_department = depto_text
+            self.report_fields = self._parse_report_header(raw_df.iloc[:HEADER_ROWS])
+            columns = self._normalize_columns(raw_df.iloc[HEADER_ROWS].tolist())
+            if columns is None:
+                return [], self.errors
             
-            # Leer Excel saltando encabezados (desde la fila 9)
-            df = pd.read_excel(file_content, skiprows=8)
+            df = raw_df.iloc[HEADER_ROWS + 1:].reset_index(drop=True)
+            df.columns = columns
+            # Número de fila (posición + 9), también usado en los identificadores AUTO-.
+            # Las filas completamente vacías se omiten, igual que en iter_excel_file
+            row_numbers = pd.RangeIndex(FIRST_ROW_NUMBER, FIRST_ROW_NUMBER + len(df))
+            non_empty = df.notna().any(axis=1).to_numpy()
+            df, row_numbers = df[non_empty], row_numbers[non_empty]
+            df = df.loc[:, ~df.columns.duplicated()]
             print(f" Excel procesado: {len(df)} filas encontradas")
             print(f"Columnas detectadas: {list(df.columns)}")
-            print(f"Fecha: {report_date}, Hora: {report_hour}, Serie: {report_seriereport}, Usuario: {report_user}, Municipio: {report_municipality}, Departamento: {report_department}")
-            
-            # Normalizar nombres de columnas (eliminar espacios y convertir a mayúsculas)
-            df.columns = df.columns.str.strip().str.upper()
-            
-            # Mapear posibles variaciones de nombres de columnas
-            column_mapping = {
-                'IDENTIFICA': 'IDENTIFICA',
-                'IDENTIFICADOR': 'IDENTIFICA',
-                'ID': 'IDENTIFICA',
-                'CONTRIBUYENTE': 'CONTRIBUYENTE',
-                'COLONIA': 'COLONIA',
-                'CAT_SERVICIO': 'CAT_SERVICIO',
-                'CATEGORIA': 'CAT_SERVICIO',
-                'CANON': 'CANON',
-                'EXCESO': 'EXCESO',
-                'TOTAL': 'TOTAL'
-            }
             
-            # Renombrar columnas según el mapeo
-            for old_name, new_name in column_mapping.items():
-                if old_name in df.columns and new_name not in df.columns:
-                    df.rename(columns={old_name: new_name}, inplace=True)
-            
-            # Validar que el archivo tenga las columnas necesarias
-            required_columns = ['CONTRIBUYENTE', 'COLONIA']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                error_msg = f"El archivo Excel no tiene las columnas requeridas: {', '.join(missing_columns)}. Columnas encontradas: {', '.join(df.columns.tolist())}"
-                self.errors.append(error_msg)
-                print(f"Error: {error_msg}")
-                return [], self.errors
-            
-            # Procesar cada fila
-            for index, row in df.iterrows():
-                row_errors = self._validate_row(row, index + 9)
-                
-                if not row_errors:
-                    # Preparar datos para Data_uploadCreate
-                    data_dict = {
-                        # Encabezado - usar datos del Excel si están disponibles
-                        "siaf": "SERVICIOSGL",
-                        "municipality": report_municipality,
-                        "department": report_department,
-                        "institutional_classification": 12100924,
-                        "report": "Morosidad Servicio De Agua", 
-                        "date": report_date if report_date else datetime.now(),
-                        "hour": report_hour if report_hour else datetime.now().time(),
-                        "seriereport": report_seriereport if report_seriereport else "R00809001.rpt",
-                        "user": report_user if report_user else (self.current_user.user if self.current_user else "SYSTEM"),
-                        "status": True,
-                        # Datos del Excel - usar IDENTIFICA (como en el Excel)
-                        "identifier": self._get_cell_value(row, 'IDENTIFICA', f"AUTO-{index+9}"),
-                        "taxpayer": self._get_cell_value(row, 'CONTRIBUYENTE'),
-                        "cologne": self._get_cell_value(row, 'COLONIA'),
-                        "cat_service": self._get_cell_value(row, 'CAT_SERVICIO', ""),
-                        "cannon": self._get_numeric_value(row, 'CANON'),
-                        "excess": self._get_numeric_value(row, 'EXCESO'),
-                        "total": self._get_numeric_value(row, 'TOTAL')
-                    }
-                    
-                    # Crear objeto Data_uploadCreate
-                    self.valid_data.append(Data_uploadCreate(**data_dict))
-                    print(f"Fila {index + 9} procesada: {data_dict['taxpayer']}")
-                    
-                else:
-                    self.errors.extend(row_errors)
-                    print(f"Errores en fila {index + 9}: {row_errors}")
+            self.valid_data, row_errors, _ = self._process_frame(df, row_numbers)
+            self.errors.extend(row_errors)
             
             print(f" Procesamiento completado: {len(self.valid_data)} válidos, {len(self.errors)} errores")
             return self.valid_data, self.errors
@@ -215,50 +149,233 @@ class ExcelProcessor:
             print(f"Traceback completo: {traceback.format_exc()}")
             return [], self.errors
     
-    def _validate_row(self, row: pd.Series, row_num: int) -> List[str]:
-        """Valida una fila individual del Excel"""
-        errors = []
+    def iter_excel_file(self, path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[List[Data_uploadCreate], List[str], int, int]]:
+        """
+        Procesa un archivo en disco por lotes de `chunk_rows` filas
         
-        # Validar campos requeridos
-        taxpayer = self._get_cell_value(row, 'CONTRIBUYENTE')
-        if not taxpayer:
-            errors.append("CONTRIBUYENTE es requerido")
+        Genera (válidos, errores, filas leídas, filas rechazadas) por lote, así
+        quien lo consume puede guardar cada lote apenas se valida. Las filas
+        completamente vacías se omiten, pero cuentan para el número de fila.
+        """
+        rows = iter_sheet_rows(path)
+        header_rows = [row for _, row in zip(range(HEADER_ROWS), rows)]
+        columns_row = next(rows, None)
+        if columns_row is None:
+            raise ValueError("El archivo Excel está vacío o no tiene datos válidos")
         
-        cologne = self._get_cell_value(row, 'COLONIA')
-        if not cologne:
-            errors.append("COLONIA es requerido")
+        self.report_fields = self._parse_report_header(pd.DataFrame(header_rows))
+        columns = self._normalize_columns(list(columns_row))
+        if columns is None:
+            raise ValueError(self.errors[-1])
+        width = len(columns)
         
-        # Validar números
-        cannon = self._get_numeric_value(row, 'CANON')
-        if cannon < 0:
-            errors.append("CANON no puede ser negativo")
+        batch, row_numbers = [], []
+        for row_number, row in enumerate(rows, start=FIRST_ROW_NUMBER):
+            if all(value is None for value in row):
+                continue
+            batch.append(tuple(row[:width]) + (None,) * (width - len(row)))
+            row_numbers.append(row_number)
+            if len(batch) >= chunk_rows:
+                yield self._process_chunk(batch, row_numbers, columns)
+                batch, row_numbers = [], []
+        if batch:
+            yield self._process_chunk(batch, row_numbers, columns)
+    
+    def _process_chunk(self, batch: List[tuple], row_numbers: List[int], columns: List[str]):
+        # dtype=object: sin inferencia por lote, los valores llegan igual que en memoria
+        df = pd.DataFrame(batch, columns=columns, dtype=object)
+        df = df.loc[:, ~df.columns.duplicated()]
+        valid, errors, rejected = self._process_frame(df, row_numbers)
+        return valid, errors, len(batch), rejected
+    
+    def _parse_report_header(self, header_df: pd.DataFrame) -> Dict:
+        """Extrae del encabezado del reporte los campos comunes a todas las filas"""
+        report_date = None
+        report_hour = None
+        report_seriereport = None
+        report_user = None
+        report_municipality = None
+        report_department = None
         
-        excess = self._get_numeric_value(row, 'EXCESO')
-        if excess < 0:
-            errors.append("EXCESO no puede ser negativo")
+        # Buscar en las primeras 8 filas
+        for idx, row in header_df.iterrows():
+            # Unir todas las celdas de la fila en un string
+            row_cells = [str(cell) for cell in row.values if pd.notna(cell) and str(cell).strip()]
+            row_str = ' '.join(row_cells).upper()
+
+            # Debug: imprimir cada fila para ver qué contiene
+            if idx < 5:  # Solo imprimir las primeras 5 filas para debug
+                print(f"Fila {idx}: {row_str[:200]}")  # Limitar a 200 caracteres
+
+            # Buscar fecha (formato: Fecha:25/08/2025 o similar)
+            if 'FECHA:' in row_str:
+                fecha_match = row_str.split('FECHA:')
+                if len(fecha_match) > 1:
+                    fecha_str = fecha_match[1].strip().split()[0]  # Tomar solo la fecha
+                    try:
+                        # Intentar parsear diferentes formatos de fecha
+                        if '/' in fecha_str:
+                            parts = fecha_str.split('/')
+                            if len(parts) == 3:
+                                day, month, year = parts
+                                report_date = datetime(int(year), int(month), int(day))
+                    except:
+                        pass
+
+            # Buscar hora (formato: Hora:16:23 o similar)
+            if 'HORA:' in row_str:
+                hora_match = row_str.split('HORA:')
+                if len(hora_match) > 1:
+                    hora_str = hora_match[1].strip().split()[0]  # Tomar solo la hora
+                    try:
+                        if ':' in hora_str:
+                            parts = hora_str.split(':')
+                            if len(parts) >= 2:
+                                hour_val = int(parts[0])
+                                minute_val = int(parts[1])
+                                report_hour = datetime.now().replace(hour=hour_val, minute=minute_val, second=0, microsecond=0).time()
+                    except:
+                        pass
+
+            # Buscar seriereport (formato: Reporte: R00809001.rpt)
+            if 'REPORTE:' in row_str and '.RPT' in row_str:
+                report_match = row_str.split('REPORTE:')
+                if len(report_match) > 1:
+                    report_seriereport = report_match[1].strip().split()[0]
+
+            # Buscar usuario (formato: Usuario:CAMACHO)
+            if 'USUARIO:' in row_str:
+                user_match = row_str.split('USUARIO:')
+                if len(user_match) > 1:
+                    report_user = user_match[1].strip().split()[0]
+
+            # Buscar municipio (formato: MUNICIPALIDAD DE PALESTINA DE LOS ALTOS)
+            # Puede estar en una celda completa o en múltiples celdas
+            if 'MUNICIPALIDAD' in row_str and 'DE' in row_str:
+                # Buscar el patrón "MUNICIPALIDAD DE" seguido del nombre
+                if 'MUNICIPALIDAD DE' in row_str:
+                    municipio_match = row_str.split('MUNICIPALIDAD DE')
+                    if len(municipio_match) > 1:
+                        # Tomar todo después de "MUNICIPALIDAD DE"
+                        municipio_text = municipio_match[1].strip()
+                        # Si hay "DEPARTAMENTO" después, cortar ahí
+                        if 'DEPARTAMENTO' in municipio_text:
+                            municipio_text = municipio_text.split('DEPARTAMENTO')[0].strip()
+                        # Eliminar cualquier texto después de palabras clave como "HORA:", "FECHA:", "REPORTE:", "USUARIO:"
+                        for keyword in ['HORA:', 'FECHA:', 'REPORTE:', 'USUARIO:', 'CLASIFICACIÓN', 'INSTITUCIONAL']:
+                            if keyword in municipio_text:
+                                municipio_text = municipio_text.split(keyword)[0].strip()
+                        # Limpiar espacios múltiples y caracteres especiales
+                        municipio_text = ' '.join(municipio_text.split())
+                        if municipio_text and len(municipio_text) > 3:  # Validar que tenga contenido real
+                            report_municipality = municipio_text
+
+            # Buscar departamento (formato: DEPARTAMENTO DE QUETZALTENANGO)
+            if 'DEPARTAMENTO DE' in row_str:
+                depto_match = row_str.split('DEPARTAMENTO DE')
+                if len(depto_match) > 1:
+                    depto_text = depto_match[1].strip()
+                    # Eliminar cualquier texto después de palabras clave
+                    for keyword in ['HORA:', 'FECHA:', 'REPORTE:', 'USUARIO:', 'CLASIFICACIÓN', 'INSTITUCIONAL', 'MUNICIPALIDAD']:
+                        if keyword in depto_text:
+                            depto_text = depto_text.split(keyword)[0].strip()
+                    # Limpiar espacios múltiples
+                    depto_text = ' '.join(depto_text.split())
+                    if depto_text and len(depto_text) > 3:  # Validar que tenga contenido real
+                        report_department = depto_text
         
-        total = self._get_numeric_value(row, 'TOTAL')
-        if total < 0:
-            errors.append("TOTAL no puede ser negativo")
+        print(f"Fecha: {report_date}, Hora: {report_hour}, Serie: {report_seriereport}, Usuario: {report_user}, Municipio: {report_municipality}, Departamento: {report_department}")
         
-        return errors
+        # Encabezado - usar datos del Excel si están disponibles
+        return {
+            "siaf": "SERVICIOSGL",
+            "municipality": report_municipality,
+            "department": report_department,
+            "institutional_classification": 12100924,
+            "report": "Morosidad Servicio De Agua",
+            "date": report_date if report_date else datetime.now(),
+            "hour": report_hour if report_hour else datetime.now().time(),
+            "seriereport": report_seriereport if report_seriereport else "R00809001.rpt",
+            "user": report_user if report_user else (self.current_user.user if self.current_user else "SYSTEM"),
+            "status": True,
+        }
     
-    def _get_cell_value(self, row: pd.Series, column_name: str, default: str = "") -> str:
-        """Obtiene valor de celda como string limpio"""
-        value = row.get(column_name, default)
-        if pd.isna(value) or value is None:
-            return default
-        return str(value).strip()
+    def _normalize_columns(self, names: Sequence) -> Optional[List[str]]:
+        """Nombres de columna normalizados; None (y el error registrado) si faltan requeridas"""
+        # Eliminar espacios y convertir a mayúsculas
+        columns = [
+            f"UNNAMED: {idx}" if pd.isna(name) else str(name).strip().upper()
+            for idx, name in enumerate(names)
+        ]
+        
+        # Renombrar columnas según el mapeo
+        for old_name, new_name in COLUMN_MAPPING.items():
+            if old_name in columns and new_name not in columns:
+                columns[columns.index(old_name)] = new_name
+        
+        # Validar que el archivo tenga las columnas necesarias
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing_columns:
+            error_msg = f"El archivo Excel no tiene las columnas requeridas: {', '.join(missing_columns)}. Columnas encontradas: {', '.join(columns)}"
+            self.errors.append(error_msg)
+            print(f"Error: {error_msg}")
+            return None
+        return columns
     
-    def _get_numeric_value(self, row: pd.Series, column_name: str) -> float:
-        """Obtiene valor de celda como número"""
-        value = row.get(column_name, 0)
-        if pd.isna(value) or value is None:
-            return 0.0
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return 0.0
+    def _process_frame(self, df: pd.DataFrame, row_numbers: Sequence[int]) -> Tuple[List[Data_uploadCreate], List[str], int]:
+        """Valida un bloque de filas por columnas; devuelve (válidos, errores, filas rechazadas)"""
+        df = df.reset_index(drop=True)
+        row_numbers = pd.Series(row_numbers, index=df.index, dtype="int64")
+        
+        # Conversión y validación por columnas completas
+        columns = {
+            "identifier": self._text_column(df, 'IDENTIFICA', "AUTO-" + row_numbers.astype(str)),
+            "taxpayer": self._text_column(df, 'CONTRIBUYENTE'),
+            "cologne": self._text_column(df, 'COLONIA'),
+            "cat_service": self._text_column(df, 'CAT_SERVICIO'),
+            "cannon": self._numeric_column(df, 'CANON'),
+            "excess": self._numeric_column(df, 'EXCESO'),
+            "total": self._numeric_column(df, 'TOTAL'),
+        }
+        
+        error_masks = [
+            (columns["taxpayer"] == "", "CONTRIBUYENTE es requerido"),
+            (columns["cologne"] == "", "COLONIA es requerido"),
+            (columns["cannon"] < 0, "CANON no puede ser negativo"),
+            (columns["excess"] < 0, "EXCESO no puede ser negativo"),
+            (columns["total"] < 0, "TOTAL no puede ser negativo"),
+        ]
+        invalid = pd.Series(False, index=df.index)
+        for mask, _ in error_masks:
+            invalid |= mask
+        
+        # Mensajes agrupados por fila, en el mismo orden de las validaciones
+        errors = []
+        for position in invalid[invalid].index:
+            row_errors = [message for mask, message in error_masks if mask.iat[position]]
+            errors.extend(f"Fila {row_numbers.iat[position]}: {message}" for message in row_errors)
+        
+        # Las filas ya se validaron por columnas: se construyen sin volver a validar con pydantic
+        valid_rows = pd.DataFrame(columns)[~invalid].to_dict("records")
+        fields_set = set(self.report_fields) | set(columns)
+        valid = [
+            Data_uploadCreate.model_construct(_fields_set=fields_set, **self.report_fields, **row)
+            for row in valid_rows
+        ]
+        return valid, errors, int(invalid.sum())
+    
+    def _text_column(self, df: pd.DataFrame, column_name: str, default="") -> pd.Series:
+        """Columna como texto limpio (cell_text); las celdas vacías toman `default` (valor o Series)"""
+        if column_name not in df.columns:
+            return pd.Series(default, index=df.index, dtype=object)
+        text = df[column_name].map(cell_text)
+        return text.where(text.notna(), default)
+    
+    def _numeric_column(self, df: pd.DataFrame, column_name: str) -> pd.Series:
+        """Columna como número; vacíos y valores no numéricos quedan en 0.0"""
+        if column_name not in df.columns:
+            return pd.Series(0.0, index=df.index)
+        return pd.to_numeric(df[column_name], errors="coerce").fillna(0.0).astype(float)
 
 # funcion que usa el controlador
 def process_excel_from_content(file_content: bytes, current_user=None) -> Tuple[List[Data_uploadCreate], List[str]]:
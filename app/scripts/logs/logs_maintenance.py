@@ -0,0 +1,190 @@
+"""
+Mantenimiento de la tabla particionada `logs`
+- Crea por adelantado las particiones mensuales (logs_pYYYYMM). Si el
+  mantenimiento dejó de correr y hay filas en logs_default, crea la partición
+  de cada mes y mueve ahí esas filas para que se puedan archivar.
+- Archiva las particiones más antiguas que LOGS_RETENTION_MONTHS: se separan de
+  la tabla, se exportan a {LOGS_ARCHIVE_DIR}/logs_pYYYYMM.csv.gz y se eliminan.
+
+Uso: python -m app.scripts.logs.logs_maintenance [--retention-months N] [--dry-run]
+"""
+from datetime import date
+from typing import List, Optional
+import argparse
+import gzip
+import sys
+import os
+
+# ruta para imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+LOGS_RETENTION_MONTHS = int(os.getenv("LOGS_RETENTION_MONTHS", "12"))
+LOGS_PARTITIONS_AHEAD = int(os.getenv("LOGS_PARTITIONS_AHEAD", "3"))
+LOGS_ARCHIVE_DIR = os.getenv("LOGS_ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "../../../archive/logs"))
+
+# Llave de pg_advisory_xact_lock: cada worker llama ensure_partitions al arrancar
+# y el cron archiva; el candado evita que dos procesos creen o separen la misma partición
+PARTITIONS_LOCK_KEY = 7_216_501
+
+PARTITION_PREFIX = "logs_p"
+DEFAULT_PARTITION = "logs_default"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def _partition_month(name: str) -> Optional[date]:
+    suffix = name[len(PARTITION_PREFIX):]
+    if not name.startswith(PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def is_partitioned(conn) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'logs')"
+    ).scalar()
+
+
+def list_partitions(conn) -> List[str]:
+    rows = conn.exec_driver_sql(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'logs'::regclass ORDER BY c.relname"
+    )
+    return [name for (name,) in rows]
+
+
+def _lock_partitions(conn):
+    """Serializa el mantenimiento de particiones hasta el fin de la transacción"""
+    conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({PARTITIONS_LOCK_KEY})")
+
+
+def _default_partition_months(conn) -> List[date]:
+    """Meses que tienen filas en la partición por defecto"""
+    rows = conn.exec_driver_sql(
+        f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {DEFAULT_PARTITION}"
+    )
+    return [month for (month,) in rows]
+
+
+def _create_partition(conn, month: date, default_months: set):
+    name = _partition_name(month)
+    bounds = f"FROM ('{month}') TO ('{_add_months(month, 1)}')"
+    if month not in default_months:
+        conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF logs FOR VALUES {bounds}")
+        return
+
+    # PostgreSQL no permite crear la partición de un rango que ya tiene filas en la
+    # partición por defecto: se separa, se mueven las filas del mes y se vuelve a unir
+    conn.exec_driver_sql(f"ALTER TABLE logs DETACH PARTITION {DEFAULT_PARTITION}")
+    conn.exec_driver_sql(f"CREATE TABLE {name} PARTITION OF logs FOR VALUES {bounds}")
+    month_filter = f"created_at >= '{month}' AND created_at < '{_add_months(month, 1)}'"
+    conn.exec_driver_sql(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {month_filter}")
+    conn.exec_driver_sql(f"DELETE FROM {DEFAULT_PARTITION} WHERE {month_filter}")
+    conn.exec_driver_sql(f"ALTER TABLE logs ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+
+
+def ensure_partitions(conn, months_ahead: int = LOGS_PARTITIONS_AHEAD) -> List[str]:
+    """
+    Crea las particiones del mes actual y los `months_ahead` siguientes que
+    falten, y las de los meses que quedaron en la partición por defecto
+    """
+    existing = set(list_partitions(conn))
+    has_default = DEFAULT_PARTITION in existing
+    default_months = set(_default_partition_months(conn)) if has_default else set()
+
+    current = date.today().replace(day=1)
+    months = {_add_months(current, offset) for offset in range(months_ahead + 1)} | default_months
+    created = []
+    for month in sorted(months):
+        name = _partition_name(month)
+        if name in existing:
+            continue
+        _create_partition(conn, month, default_months)
+        created.append(name)
+    return created
+
+
+def _export_partition(conn, name: str, archive_dir: str) -> str:
+    """Copia la partición a un CSV comprimido con gzip usando COPY"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp_path = f"{path}.tmp"
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(tmp_path, "wb") as output:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", output)
+    finally:
+        cursor.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive_old_partitions(engine, retention_months: int = LOGS_RETENTION_MONTHS,
+                           archive_dir: str = LOGS_ARCHIVE_DIR, dry_run: bool = False) -> List[dict]:
+    """
+    Archiva las particiones cuyo mes completo es anterior a la retención.
+    Cada partición se procesa en su propia transacción: si la exportación
+    falla, la partición queda en la tabla.
+    """
+    cutoff = _add_months(date.today().replace(day=1), -retention_months)
+    with engine.connect() as conn:
+        names = list_partitions(conn)
+
+    archived = []
+    for name in names:
+        month = _partition_month(name)
+        if month is None or month >= cutoff:
+            continue
+        if dry_run:
+            archived.append({"partition": name, "archive": None})
+            continue
+        with engine.begin() as conn:
+            _lock_partitions(conn)
+            # Otro proceso pudo haberla archivado mientras se esperaba el candado
+            if name not in list_partitions(conn):
+                continue
+            conn.exec_driver_sql(f"ALTER TABLE logs DETACH PARTITION {name}")
+            path = _export_partition(conn, name, archive_dir)
+            conn.exec_driver_sql(f"DROP TABLE {name}")
+        archived.append({"partition": name, "archive": path})
+    return archived
+
+
+def run_maintenance(engine, retention_months: int = LOGS_RETENTION_MONTHS, dry_run: bool = False) -> dict:
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return {"partitioned": False, "created": [], "archived": []}
+        created = [] if dry_run else ensure_partitions(conn)
+    archived = archive_old_partitions(engine, retention_months, dry_run=dry_run)
+    return {"partitioned": True, "created": created, "archived": archived}
+
+
+def main():
+    from app.db.database import engine
+
+    parser = argparse.ArgumentParser(description="Particiones y retención de la tabla logs")
+    parser.add_argument("--retention-months", type=int, default=LOGS_RETENTION_MONTHS)
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra qué particiones se archivarían")
+    args = parser.parse_args()
+
+    result = run_maintenance(engine, args.retention_months, args.dry_run)
+    if not result["partitioned"]:
+        print("La tabla logs no está particionada; ejecuta 'alembic upgrade head'")
+        return
+    for name in result["created"]:
+        print(f"Partición creada: {name}")
+    for item in result["archived"]:
+        print(f"Partición archivada: {item['partition']} -> {item['archive'] or '(dry-run)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Escritura por lotes de la bitácora (tabla logs)
+create_log ya no abre su propia transacción: encola el evento y un hilo de
+fondo lo inserta junto con otros en un solo INSERT multi-fila cada
+AUDIT_LOG_FLUSH_MS milisegundos o cada AUDIT_LOG_BATCH_SIZE eventos.
+Si la cola está llena (o el escritor está detenido) el evento se escribe
+de forma síncrona en una transacción propia, nunca en la sesión del request.
+Desde el event loop (rutas async) encolar nunca espera: con la cola llena la
+escritura síncrona se hace en el pool de hilos de base de datos.
+"""
+from typing import List, Optional, Set
+import threading
+import asyncio
+import atexit
+import queue
+import time
+import sys
+import os
+
+AUDIT_LOG_ASYNC = os.getenv("AUDIT_LOG_ASYNC", "true").lower() in ("1", "true", "yes")
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000"))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "500"))
+AUDIT_LOG_FLUSH_MS = int(os.getenv("AUDIT_LOG_FLUSH_MS", "200"))
+# Espera máxima para encolar con la cola llena antes de escribir de forma síncrona
+# (solo fuera del event loop; en el loop se encola sin esperar)
+AUDIT_LOG_ENQUEUE_TIMEOUT_MS = int(os.getenv("AUDIT_LOG_ENQUEUE_TIMEOUT_MS", "50"))
+
+_STOP = object()
+
+
+def _insert_rows(rows: List[dict]):
+    from app.db.database import engine
+    from app.models.log.logs import Logs
+
+    with engine.begin() as conn:
+        conn.execute(Logs.__table__.insert(), rows)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AuditLogMetrics:
+    """Contadores del escritor (seguro entre hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.enqueued = 0
+            self.written = 0
+            self.batches = 0
+            self.sync_writes = 0
+            self.backpressure_events = 0
+            self.failed = 0
+            self.max_queue_depth = 0
+            self.total_flush_ms = 0.0
+            self.max_flush_ms = 0.0
+
+    def record_enqueue(self, depth: int):
+        with self._lock:
+            self.enqueued += 1
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_batch(self, size: int, flush_ms: float):
+        with self._lock:
+            self.written += size
+            self.batches += 1
+            self.total_flush_ms += flush_ms
+            self.max_flush_ms = max(self.max_flush_ms, flush_ms)
+
+    def record_sync_write(self, backpressure: bool):
+        with self._lock:
+            self.sync_writes += 1
+            self.written += 1
+            if backpressure:
+                self.backpressure_events += 1
+
+    def record_failure(self, size: int):
+        with self._lock:
+            self.failed += size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "avg_batch_size": round((self.written - self.sync_writes) / self.batches, 2) if self.batches else 0.0,
+                "sync_writes": self.sync_writes,
+                "backpressure_events": self.backpressure_events,
+                "failed": self.failed,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_flush_ms": round(self.total_flush_ms / self.batches, 3) if self.batches else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 3),
+            }
+
+
+class AuditLogWriter:
+    def __init__(self, insert=_insert_rows):
+        self._insert = insert
+        self._queue: queue.Queue = queue.Queue(maxsize=AUDIT_LOG_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+        # Escrituras síncronas enviadas al pool de BD desde el event loop
+        self._pending: Set[asyncio.Task] = set()
+        self.metrics = AuditLogMetrics()
+
+    def _ensure_started(self) -> bool:
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        with self._lock:
+            if self._stopped:
+                return False
+            if self._thread is None or not self._thread.is_alive():
+                # Se arranca con el primer evento, también en los procesos hijos de los trabajos
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+        return True
+
+    def write(self, row: dict):
+        """Encola un evento; si no se puede, lo escribe de forma síncrona"""
+        loop = _running_loop()
+        if AUDIT_LOG_ASYNC and self._ensure_started():
+            try:
+                if loop is not None:
+                    self._queue.put_nowait(row)
+                else:
+                    self._queue.put(row, timeout=AUDIT_LOG_ENQUEUE_TIMEOUT_MS / 1000)
+                self.metrics.record_enqueue(self._queue.qsize())
+                return
+            except queue.Full:
+                self._write_sync_from(loop, row, backpressure=True)
+                return
+        self._write_sync_from(loop, row, backpressure=False)
+
+    def _write_sync_from(self, loop: Optional[asyncio.AbstractEventLoop], row: dict, backpressure: bool):
+        if loop is None:
+            self._write_sync(row, backpressure)
+            return
+        # En el event loop el INSERT va al pool de hilos de BD, sin esperar el resultado
+        from app.db.database import run_in_db_thread
+
+        task = loop.create_task(run_in_db_thread(self._write_sync, row, backpressure))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _write_sync(self, row: dict, backpressure: bool):
+        try:
+            self._insert([row])
+            self.metrics.record_sync_write(backpressure)
+        except Exception as e:
+            self.metrics.record_failure(1)
+            print(f"Error al escribir la bitácora: {e}", file=sys.stderr)
+
+    def _flush(self, batch: List[dict]):
+        start = time.perf_counter()
+        try:
+            self._insert(batch)
+            self.metrics.record_batch(len(batch), (time.perf_counter() - start) * 1000)
+        except Exception as e:
+            self.metrics.record_failure(len(batch))
+            print(f"Error al escribir {len(batch)} eventos de la bitácora: {e}", file=sys.stderr)
+
+    def _run(self):
+        interval = AUDIT_LOG_FLUSH_MS / 1000
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + interval
+            # Junta eventos hasta llenar el lote o cumplir el intervalo
+            while len(batch) < AUDIT_LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Espera a que se escriban los eventos encolados"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self, timeout: float = 10):
+        """Detiene el hilo escribiendo lo pendiente; lo que llegue después se escribe síncrono"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        # Lo que haya quedado (hilo caído o tiempo agotado) se escribe aquí
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        for start in range(0, len(pending), AUDIT_LOG_BATCH_SIZE):
+            self._flush(pending[start:start + AUDIT_LOG_BATCH_SIZE])
+
+    def status(self) -> dict:
+        return {
+            "async": AUDIT_LOG_ASYNC,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queue_depth": self._queue.qsize(),
+            "pending_sync_writes": len(self._pending),
+            "queue_size": AUDIT_LOG_QUEUE_SIZE,
+            "batch_size": AUDIT_LOG_BATCH_SIZE,
+            "flush_ms": AUDIT_LOG_FLUSH_MS,
+            **self.metrics.snapshot()
+        }
+
+
+audit_log_writer = AuditLogWriter()
+
+
+def shutdown_audit_writer():
+    audit_log_writer.stop()
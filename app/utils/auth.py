@@ -1,21 +1,54 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Optional, Tuple
+import threading
+import asyncio
+import time
 import os
 
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Tokens de acceso ya verificados que se recuerdan por proceso
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+# Costo de bcrypt; los hashes con otro costo se regeneran al iniciar sesión
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Hashes simultáneos por proceso (bcrypt libera el GIL, cada hilo usa un núcleo)
+BCRYPT_MAX_WORKERS = int(os.getenv("BCRYPT_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 # Configuración para hash de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Pool dedicado: el hash (~250 ms de CPU) nunca corre en el event loop ni ocupa
+# los hilos de base de datos, y como mucho BCRYPT_MAX_WORKERS a la vez
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_MAX_WORKERS, thread_name_prefix="bcrypt")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _bcrypt_executor.submit(pwd_context.verify, plain_password, hashed_password).result()
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _bcrypt_executor.submit(pwd_context.hash, password).result()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica la contraseña y, si el hash usa otro costo, devuelve el hash nuevo"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, pwd_context.hash, password)
+
+def shutdown_password_executor():
+    _bcrypt_executor.shutdown(wait=False, cancel_futures=True)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -27,12 +60,73 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(email: str, jti: str, family_id: str, expires_at: datetime) -> str:
+    return jwt.encode(
+        {"sub": email, "jti": jti, "fam": family_id, "type": "refresh", "exp": expires_at},
+        SECRET_KEY, algorithm=ALGORITHM
+    )
+
+def decode_refresh_token(token: str, credentials_exception) -> dict:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        raise credentials_exception
+    return payload
+
+
+class VerifiedTokenCache:
+    """
+    LRU acotado de token de acceso -> (sub, exp). Un token repetido evita
+    verificar la firma HMAC y decodificar el JSON; cada entrada vale hasta su exp.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            subject, exp = entry
+            if exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return subject
+
+    def put(self, token: str, subject: str, exp: float):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (subject, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verified_token_cache = VerifiedTokenCache()
+
 def verify_token(token: str, credentials_exception):
+    username = verified_token_cache.get(token)
+    if username is not None:
+        return username
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        # Un refresh token no sirve como token de acceso
+        if username is None or payload.get("type") == "refresh":
             raise credentials_exception
+        if payload.get("exp") is not None:
+            verified_token_cache.put(token, username, float(payload["exp"]))
         return username
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
@@ -0,0 +1,39 @@
+"""
+Sparse fieldsets de los listados (?fields=id_pipes,coordinates,sector_id)
+- Cada listado declara sus columnas (nombre -> expresión SQL) y sus campos
+  de relación. Solo las columnas pedidas van al SELECT; no se cargan
+  entidades ORM completas.
+- Los campos de relación (tanks, pipes, id_tank...) se consultan en lote,
+  con una consulta por página, y solo si se piden.
+- La llave primaria siempre se incluye: la usan el cursor de paginación y
+  las relaciones.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+def parse_fields(fields: Optional[str], available: Sequence[str], key: str) -> List[str]:
+    """Campos pedidos en el orden de `available`; sin ?fields= son todos"""
+    if fields is None or not fields.strip():
+        return list(available)
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested.difference(available))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos: {', '.join(unknown)}. Disponibles: {', '.join(available)}"
+        )
+    requested.add(key)
+    return [name for name in available if name in requested]
+
+
+def project(db, columns: Dict[str, object], fields: Sequence[str]):
+    """db.query con solo las columnas pedidas, etiquetadas con el nombre del campo"""
+    return db.query(*[columns[name].label(name) for name in fields if name in columns])
+
+
+def rows_to_dicts(rows, columns: Dict[str, object], fields: Sequence[str]) -> List[dict]:
+    names = [name for name in fields if name in columns]
+    return [dict(zip(names, row)) for row in rows]
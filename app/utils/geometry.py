@@ -0,0 +1,149 @@
+"""
+Decodificación de geometrías en el proceso
+Las columnas Geometry de GeoAlchemy2 llegan como WKBElement (EWKB); aquí se
+leen directamente con struct para no pedirle a PostGIS ST_X/ST_Y/ST_AsText
+por cada fila.
+"""
+from typing import Any, List, Optional, Tuple
+import struct
+
+POINT, LINESTRING, POLYGON = 1, 2, 3
+MULTIPOINT, MULTILINESTRING, MULTIPOLYGON, GEOMETRYCOLLECTION = 4, 5, 6, 7
+
+_TYPE_NAMES = {
+    POINT: "Point", LINESTRING: "LineString", POLYGON: "Polygon",
+    MULTIPOINT: "MultiPoint", MULTILINESTRING: "MultiLineString",
+    MULTIPOLYGON: "MultiPolygon", GEOMETRYCOLLECTION: "GeometryCollection",
+}
+
+# Banderas de EWKB (PostGIS)
+_EWKB_Z = 0x80000000
+_EWKB_M = 0x40000000
+_EWKB_SRID = 0x20000000
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt: str):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def geometry(self) -> Tuple[int, Any]:
+        byte_order = "<" if self.unpack("B")[0] == 1 else ">"
+        (raw_type,) = self.unpack(byte_order + "I")
+
+        dims = 2
+        if raw_type & _EWKB_Z:
+            dims += 1
+        if raw_type & _EWKB_M:
+            dims += 1
+        if raw_type & _EWKB_SRID:
+            self.unpack(byte_order + "I")
+        raw_type &= 0x0FFFFFFF
+        # WKB ISO: 1000 = Z, 2000 = M, 3000 = ZM
+        if raw_type >= 1000:
+            dims += {1: 1, 2: 1, 3: 2}[raw_type // 1000]
+            raw_type %= 1000
+
+        point_fmt = byte_order + "d" * dims
+        point_size = 8 * dims
+
+        def points(count: int) -> List[Tuple[float, ...]]:
+            start = self.offset
+            self.offset += point_size * count
+            return [struct.unpack_from(point_fmt, self.data, start + i * point_size) for i in range(count)]
+
+        if raw_type == POINT:
+            return POINT, points(1)[0]
+        if raw_type == LINESTRING:
+            return LINESTRING, points(self.unpack(byte_order + "I")[0])
+        if raw_type == POLYGON:
+            return POLYGON, [points(self.unpack(byte_order + "I")[0]) for _ in range(self.unpack(byte_order + "I")[0])]
+        if raw_type in (MULTIPOINT, MULTILINESTRING, MULTIPOLYGON, GEOMETRYCOLLECTION):
+            parts = [self.geometry() for _ in range(self.unpack(byte_order + "I")[0])]
+            if raw_type == GEOMETRYCOLLECTION:
+                return raw_type, parts
+            return raw_type, [coords for _, coords in parts]
+        raise ValueError(f"Tipo de geometría WKB no soportado: {raw_type}")
+
+
+def _to_bytes(value) -> Optional[bytes]:
+    """Acepta WKBElement, bytes, memoryview o hex (como lo devuelve psycopg2)"""
+    if value is None:
+        return None
+    data = getattr(value, "data", value)
+    if isinstance(data, str):
+        return bytes.fromhex(data)
+    return bytes(data)
+
+
+def decode(value) -> Optional[Tuple[int, Any]]:
+    """Devuelve (tipo, coordenadas) de una geometría WKB/EWKB"""
+    data = _to_bytes(value)
+    if not data:
+        return None
+    return _Reader(data).geometry()
+
+
+def point_lon_lat(value) -> Tuple[Optional[float], Optional[float]]:
+    """(lon, lat) de un POINT, equivalente a ST_X/ST_Y"""
+    decoded = decode(value)
+    if decoded is None or decoded[0] != POINT:
+        return None, None
+    x, y = decoded[1][:2]
+    return x, y
+
+
+def line_coordinates(value) -> List[Tuple[float, float]]:
+    """Vértices (lon, lat) de un LINESTRING"""
+    decoded = decode(value)
+    if decoded is None or decoded[0] != LINESTRING:
+        return []
+    return [(point[0], point[1]) for point in decoded[1]]
+
+
+def _strip(coords):
+    if coords and isinstance(coords[0], float):
+        return [coords[0], coords[1]]
+    return [_strip(part) for part in coords]
+
+
+def to_geojson(value) -> Optional[dict]:
+    """Equivalente a json.loads(ST_AsGeoJSON(...)) para geometrías simples y multi"""
+    decoded = decode(value)
+    if decoded is None:
+        return None
+    geom_type, coords = decoded
+    if geom_type == GEOMETRYCOLLECTION:
+        return {"type": "GeometryCollection", "geometries": [
+            {"type": _TYPE_NAMES[part_type], "coordinates": _strip(part)} for part_type, part in coords
+        ]}
+    return {"type": _TYPE_NAMES[geom_type], "coordinates": _strip(coords)}
+
+
+def _num(value: float) -> str:
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _wkt_points(points) -> str:
+    return ",".join(" ".join(_num(v) for v in point) for point in points)
+
+
+def to_wkt(value) -> Optional[str]:
+    """Equivalente a ST_AsText para POINT, LINESTRING y POLYGON"""
+    decoded = decode(value)
+    if decoded is None:
+        return None
+    geom_type, coords = decoded
+    if geom_type == POINT:
+        return f"POINT({_wkt_points([coords])})"
+    if geom_type == LINESTRING:
+        return f"LINESTRING({_wkt_points(coords)})"
+    if geom_type == POLYGON:
+        return "POLYGON(" + ",".join(f"({_wkt_points(ring)})" for ring in coords) + ")"
+    raise ValueError(f"to_wkt no soporta el tipo {_TYPE_NAMES.get(geom_type, geom_type)}")
@@ -1,15 +1,18 @@
-from app.models.log.logs import Logs
 from datetime import datetime
+from app.utils.audit_writer import audit_log_writer
 
 def create_log(db, user_id: int, action: str, entity: str = None, entity_id: int = None, description: str = None):
-    new_log = Logs(
-        user_id=user_id,
-        action=action,
-        entity=entity,
-        entity_id=entity_id,
-        description=description,
-        created_at=datetime.now()
-    )
-    db.add(new_log)
-    db.commit()
-    
\ No newline at end of file
+    """
+    Registra un evento en la bitácora.
+    No usa ni confirma la sesión `db` del request: el evento se encola y se
+    inserta por lotes (ver app/utils/audit_writer.py). `db` se mantiene por
+    compatibilidad con los llamados existentes.
+    """
+    audit_log_writer.write({
+        "user_id": user_id,
+        "action": action,
+        "entity": entity,
+        "entity_id": entity_id,
+        "description": description,
+        "created_at": datetime.now()
+    })
@@ -0,0 +1,174 @@
+"""
+Paginación de los listados
+- Por página (?page=&limit=): OFFSET, con el sobre `pagination` de siempre.
+  El total sale en la misma consulta con count(*) OVER () (?total=exact),
+  de la estimación del planner en pg_class.reltuples para listados sin
+  filtros (?total=estimate) o no se calcula (?total=none, scroll infinito).
+- Por cursor (?cursor=): keyset sobre la llave primaria en orden descendente.
+  El cursor es opaco (base64 de la dirección y la última llave vista), así
+  la página 5000 cuesta lo mismo que la primera. `?cursor=` vacío pide la
+  primera página.
+"""
+from typing import Any, List, Literal, Optional, Tuple
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import func, text
+
+TotalMode = Literal["exact", "estimate", "none"]
+
+NEXT = "n"
+PREV = "p"
+
+
+def encode_cursor(direction: str, key: Any) -> str:
+    raw = json.dumps([direction, key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, key = json.loads(raw)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    if direction not in (NEXT, PREV) or not isinstance(key, (int, str)) or isinstance(key, bool):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    return direction, key
+
+
+def _row_key(row, key_column):
+    if hasattr(row, "_mapping"):
+        # Proyección de columnas (?fields=): la llave viene con su nombre
+        if key_column.key in row._mapping:
+            return row._mapping[key_column.key]
+        # Las consultas con columnas extra devuelven Row(entidad, ...)
+        row = row[0]
+    return getattr(row, key_column.key)
+
+
+def keyset_page(query, key_column, limit: int, cursor: str) -> Tuple[List, dict]:
+    """
+    Aplica la página de keyset a `query` (sin ORDER BY propio) y devuelve
+    las filas en orden descendente y los cursores siguiente/anterior.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="El límite debe ser mayor que 0")
+
+    direction, key = decode_cursor(cursor) if cursor else (NEXT, None)
+    if direction == NEXT:
+        paged = query.filter(key_column < key) if key is not None else query
+        paged = paged.order_by(key_column.desc())
+    else:
+        # Hacia atrás se lee en orden ascendente y se invierte
+        paged = query.filter(key_column > key).order_by(key_column.asc())
+
+    # Una fila extra indica si hay más en esa dirección
+    rows = paged.limit(limit + 1).all()
+    if direction == PREV and not rows:
+        # Nada antes del cursor: se devuelve la primera página
+        return keyset_page(query, key_column, limit, "")
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first_key, last_key = _row_key(rows[0], key_column), _row_key(rows[-1], key_column)
+        if direction == NEXT:
+            next_cursor = encode_cursor(NEXT, last_key) if has_more else None
+            prev_cursor = encode_cursor(PREV, first_key) if key is not None else None
+        else:
+            next_cursor = encode_cursor(NEXT, last_key)
+            prev_cursor = encode_cursor(PREV, first_key) if has_more else None
+
+    return rows, {"next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+
+def estimate_table_rows(db, table_name: str) -> Optional[int]:
+    """Filas estimadas por el planner (ANALYZE/autovacuum); None si nunca se analizó"""
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name}
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def _strip_total(rows, single_entity: bool):
+    # Quita la columna count(*) OVER () que se agregó al final de cada fila
+    if single_entity:
+        return [row[0] for row in rows]
+    return [tuple(row[:-1]) for row in rows]
+
+
+def paginate(query, key_column, page: int, limit: int, cursor: Optional[str] = None,
+             total: str = "exact", filtered: bool = True) -> Tuple[List, Optional[int], Optional[dict]]:
+    """
+    Pagina `query` (sin ORDER BY propio) en orden descendente de `key_column`.
+    Devuelve (filas, total, page_info); page_info lleva los cursores en modo
+    cursor o las marcas del total ({"estimated": True}, {"has_next": ...}).
+    `filtered` indica si el listado tiene filtros (búsqueda, bbox, estado...):
+    la estimación de pg_class solo vale para la tabla completa.
+    """
+    if cursor is not None:
+        rows, cursors = keyset_page(query, key_column, limit, cursor)
+        return rows, None, cursors
+
+    offset = (page - 1) * limit
+    ordered = query.order_by(key_column.desc())
+
+    if total == "none":
+        # Una fila extra basta para saber si hay página siguiente
+        rows = ordered.offset(offset).limit(limit + 1).all()
+        return rows[:limit], None, {"has_next": len(rows) > limit}
+
+    if total == "estimate" and not filtered:
+        estimate = estimate_table_rows(query.session, key_column.class_.__tablename__)
+        if estimate is not None:
+            rows = ordered.offset(offset).limit(limit).all()
+            return rows, estimate, {"estimated": True}
+
+    # Total exacto en el mismo viaje: el window se evalúa antes del LIMIT
+    descriptions = query.column_descriptions
+    single_entity = len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]
+    rows = ordered.add_columns(func.count().over().label("total_count")).offset(offset).limit(limit).all()
+    if rows:
+        return _strip_total(rows, single_entity), rows[0][-1], None
+    # Página fuera de rango: no hay filas de donde leer el total
+    return [], (query.order_by(None).count() if offset else 0), None
+
+
+def pagination_envelope(page: int, limit: int, total: Optional[int], page_info: Optional[dict] = None) -> dict:
+    """Sobre `pagination` de los listados; en modo cursor no hay páginas numeradas"""
+    page_info = page_info or {}
+    if "next_cursor" in page_info:
+        return {"limit": limit, **page_info}
+
+    prev_page = page - 1 if page > 1 else None
+    if total is None:
+        # ?total=none: sin total ni número de páginas
+        return {
+            "page": page,
+            "limit": limit,
+            "total_items": None,
+            "total_pages": None,
+            "next_page": page + 1 if page_info.get("has_next") else None,
+            "prev_page": prev_page
+        }
+
+    total_pages = (total + limit - 1) // limit
+    envelope = {
+        "page": page,
+        "limit": limit,
+        "total_items": total,
+        "total_pages": total_pages,
+        "next_page": page + 1 if page < total_pages else None,
+        "prev_page": prev_page
+    }
+    if page_info.get("estimated"):
+        envelope["total_estimated"] = True
+    return envelope
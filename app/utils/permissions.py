@@ -0,0 +1,51 @@
+"""
+Registro de permisos como bits
+Cada nombre de permiso recibe una posición de bit la primera vez que se usa
+(al declarar require_permission o al compilar un rol). Los permisos activos
+de un rol se compilan en un entero y la verificación por request es un AND.
+Las posiciones son locales al proceso, igual que la caché de principales
+donde se guardan las máscaras compiladas.
+"""
+from typing import Dict, Iterable
+import threading
+
+# Rol con todos los permisos, aunque se creen nuevos después del arranque
+ADMIN_ROLE_NAME = "Administrador"
+# -1 tiene todos los bits encendidos en un entero de Python
+ALL_PERMISSIONS = -1
+
+
+class PermissionRegistry:
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bit(self, name: str) -> int:
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(name)
+                if bit is None:
+                    bit = 1 << len(self._bits)
+                    self._bits[name] = bit
+        return bit
+
+    def mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+        return mask
+
+    def compile_role(self, rol) -> int:
+        """Máscara de los permisos activos de un rol activo"""
+        if rol is None or not rol.active:
+            return 0
+        if rol.name == ADMIN_ROLE_NAME:
+            return ALL_PERMISSIONS
+        return self.mask(perm.name for perm in rol.permissions if perm.active)
+
+    def names(self, mask: int) -> list:
+        return [name for name, bit in self._bits.items() if mask & bit]
+
+
+permission_registry = PermissionRegistry()
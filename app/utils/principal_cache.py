@@ -0,0 +1,153 @@
+"""
+Caché del usuario autenticado (principal) para get_current_user
+Guarda una copia del usuario con su rol y permisos por el `sub` del token,
+con expiración (PRINCIPAL_CACHE_TTL) y desalojo LRU (PRINCIPAL_CACHE_SIZE).
+Cada entrada recuerda la versión con la que se cargó; cualquier commit que
+modifique usuarios, roles, permisos o rol_permissions incrementa la versión
+y deja obsoletas todas las entradas de este proceso. En los demás workers
+el cambio se ve a más tardar al vencer el TTL.
+"""
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Optional
+import threading
+import time
+import os
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.utils.permissions import permission_registry
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+# Tablas cuyos cambios invalidan los principales en caché
+AUTH_TABLES = {"users", "roles", "permissions", "rol_permissions"}
+
+_SESSION_FLAG = "principal_cache_dirty"
+
+
+def _columns(obj) -> dict:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def snapshot_principal(user):
+    """
+    Copia desacoplada de la sesión con los mismos atributos que usan los
+    routers (user.rol.name, user.rol.permissions, ...), segura entre hilos,
+    más `permission_mask` para require_permission.
+    """
+    rol = None
+    if user.rol is not None:
+        permissions = [SimpleNamespace(**_columns(perm)) for perm in user.rol.permissions]
+        rol = SimpleNamespace(**_columns(user.rol), permissions=permissions)
+    # El rol se compila a bits al cargarse; un cambio de rol invalida la caché y se recompila
+    return SimpleNamespace(**_columns(user), rol=rol, permission_mask=permission_registry.compile_role(user.rol))
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_size: int = PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                principal, version, expires_at = entry
+                if version == self.version and now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return principal
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def current_version(self) -> int:
+        return self.version
+
+    def put(self, key: str, principal, version: int):
+        """Guarda el principal si no hubo una invalidación mientras se cargaba"""
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (principal, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def status(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ttl": self.ttl,
+                "max_size": self.max_size,
+                "size": len(self._entries),
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache()
+
+
+def _touches_auth_tables(objects) -> bool:
+    for obj in objects:
+        table = getattr(type(obj), "__tablename__", None)
+        if table in AUTH_TABLES:
+            return True
+    return False
+
+
+# ----- Invalidación por eventos de sesión -----
+# Las altas, cambios y bajas se detectan en el flush (incluye rol.permissions,
+# que marca al Rol como modificado) y se aplican al confirmar la transacción.
+@event.listens_for(Session, "after_flush")
+def _mark_auth_changes(session, flush_context):
+    if _touches_auth_tables(session.new) or _touches_auth_tables(session.dirty) or _touches_auth_tables(session.deleted):
+        session.info[_SESSION_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_auth_changes(orm_execute_state):
+    # db.query(...).update()/delete() y update()/delete() de SQLAlchemy 2.0
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in AUTH_TABLES:
+            orm_execute_state.session.info[_SESSION_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_SESSION_FLAG, False):
+        principal_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_SESSION_FLAG, None)
@@ -1,13 +1,47 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
 from fastapi.responses import JSONResponse
 
+
+def _orjson_default(value):
+    # Numeric (diámetros, profundidades, distancias) sale como texto, igual que en pydantic mode="json"
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson en una sola pasada: acepta directamente
+    datetime, date, time, UUID y Decimal, así los controladores entregan sus filas
+    sin pasar cada una por model_validate/model_dump.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+def dump_as(schema, value):
+    """model_validate + model_dump(mode="json") de un objeto ORM o de una lista de objetos"""
+    if isinstance(value, list):
+        return [schema.model_validate(item).model_dump(mode="json") for item in value]
+    return schema.model_validate(value).model_dump(mode="json")
+
+
 def success_response(data, message="OK"):
-    return JSONResponse(content={"status": "success", "message": message, "data": data} )
+    return ORJSONResponse(content={"status": "success", "message": message, "data": data} )
 
 def error_response(message="Error", status_code=400):
-    return JSONResponse(content={"status": "error", "message": message}, status_code=status_code)
+    return ORJSONResponse(content={"status": "error", "message": message}, status_code=status_code)
 
 def existence_response_dict(exists: bool, message_if_exists="Exists", message_if_not_exists="Does not exist"):
     if exists:
         return {"status": "success", "message": message_if_exists, "exists": True}
     else:
-        return {"status": "success", "message": message_if_not_exists, "exists": False}
\ No newline at end of file
+        return {"status": "success", "message": message_if_not_exists, "exists": False}
@@ -0,0 +1,74 @@
+"""
+Filtros espaciales para el modo de consulta por viewport (?bbox=&zoom=)
+"""
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from typing import Optional, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+# Por debajo de este zoom los puntos se agrupan en una rejilla y se devuelve uno por celda
+POINT_THINNING_MAX_ZOOM = 15
+# Tamaño de la celda de la rejilla en píxeles de pantalla
+POINT_THINNING_CELL_PX = 8
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[BBox]:
+    """Convierte 'minx,miny,maxx,maxy' (lon/lat, EPSG:4326) en una tupla"""
+    if bbox is None or not bbox.strip():
+        return None
+    try:
+        min_x, min_y, max_x, max_y = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox debe tener el formato minx,miny,maxx,maxy")
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(status_code=400, detail="bbox inválido: el mínimo es mayor que el máximo")
+    return min_x, min_y, max_x, max_y
+
+
+def envelope(bbox: BBox):
+    return func.ST_MakeEnvelope(*bbox, 4326)
+
+
+def intersects_bbox(geometry, bbox: BBox):
+    """Condición que usa el índice GiST (&&) y luego la intersección exacta"""
+    box = envelope(bbox)
+    return geometry.op("&&")(box) & func.ST_Intersects(geometry, box)
+
+
+def apply_bbox(query, geometry, bbox: Optional[BBox]):
+    if bbox is None:
+        return query
+    return query.filter(intersects_bbox(geometry, bbox))
+
+
+def _grid_cell_degrees(zoom: int) -> float:
+    return 360.0 / (256 * 2 ** zoom) * POINT_THINNING_CELL_PX
+
+
+def apply_point_thinning(query, geometry, pk, zoom: Optional[int]):
+    """
+    En zoom bajo deja un solo punto por celda de rejilla (el de menor id),
+    para que el número de puntos dependa del área visible y no de la densidad.
+    El ranking se calcula sobre las filas que ya pasan los filtros de `query`
+    (búsqueda, estado, bbox): si el punto de menor id de una celda no cumple
+    los filtros, la celda queda representada por el siguiente que sí.
+    """
+    if zoom is None or zoom >= POINT_THINNING_MAX_ZOOM:
+        return query
+
+    ranked = query.with_entities(
+        pk.label("id"),
+        func.row_number().over(
+            partition_by=func.ST_SnapToGrid(geometry, _grid_cell_degrees(zoom)),
+            order_by=pk
+        ).label("rank")
+    ).order_by(None).subquery()
+    return query.filter(pk.in_(select(ranked.c.id).where(ranked.c.rank == 1)))
+
+
+def apply_line_thinning(query, geometry, zoom: Optional[int]):
+    """En zoom bajo omite las líneas que medirían menos de un píxel en pantalla"""
+    if zoom is None or zoom >= POINT_THINNING_MAX_ZOOM:
+        return query
+    return query.filter(func.ST_Length(geometry) >= _grid_cell_degrees(zoom) / POINT_THINNING_CELL_PX)
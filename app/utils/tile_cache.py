@@ -0,0 +1,160 @@
+"""
+Caché en disco de vector tiles (MVT)
+Las teselas se guardan en {MAP_TILE_CACHE_DIR}/{z}/{x}/{y}.mvt y se eliminan
+cuando cambia un elemento cuya geometría cae dentro de ellas.
+- Cada invalidación cambia la generación ({MAP_TILE_CACHE_DIR}/generation)
+  antes de borrar: una tesela que se renderizó mientras se confirmaba el cambio
+  se descarta en vez de quedar guardada con los datos anteriores.
+- Las teselas vencen a los MAP_TILE_CACHE_TTL segundos, así los cambios hechos
+  fuera de los controladores (seed, migraciones, cargas) se ven a más tardar
+  en ese tiempo; clear_tiles() las descarta todas de inmediato.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional, Tuple
+import tempfile
+import shutil
+import math
+import time
+import uuid
+import os
+
+MAP_TILE_CACHE_DIR = os.getenv("MAP_TILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "sig_tiles"))
+MAP_TILE_CACHE_TTL = int(os.getenv("MAP_TILE_CACHE_TTL", "600"))
+MIN_ZOOM = 0
+MAX_ZOOM = 22
+
+# tabla -> (columna de geometría, llave primaria)
+_GEOMETRY_COLUMNS = {
+    "tanks": ("coordinates", "id_tank"),
+    "bombs": ("coordinates", "id_bombs"),
+    "pipes": ("coordinates", "id_pipes"),
+    "connections": ("coordenates", "id_connection"),
+}
+
+Bounds = Tuple[float, float, float, float]
+
+
+def _tile_path(z: int, x: int, y: int) -> str:
+    return os.path.join(MAP_TILE_CACHE_DIR, str(z), str(x), f"{y}.mvt")
+
+
+def _generation_path() -> str:
+    return os.path.join(MAP_TILE_CACHE_DIR, "generation")
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Escritura atómica para que otro worker nunca lea un archivo a medias
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def tile_generation() -> str:
+    """Generación vigente de la caché, compartida por todos los workers"""
+    try:
+        with open(_generation_path(), "rb") as f:
+            return f.read().decode()
+    except FileNotFoundError:
+        return ""
+
+
+def _bump_generation():
+    # Un valor único (no un contador): dos invalidaciones simultáneas nunca dejan la misma generación
+    _atomic_write(_generation_path(), uuid.uuid4().hex.encode())
+
+
+def read_tile(z: int, x: int, y: int) -> Optional[bytes]:
+    path = _tile_path(z, x, y)
+    try:
+        with open(path, "rb") as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > MAP_TILE_CACHE_TTL:
+                return None
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_tile(z: int, x: int, y: int, data: bytes, generation: str):
+    """
+    Guarda la tesela renderizada con la generación leída antes de consultar la
+    BD; si hubo una invalidación mientras tanto, la tesela se descarta
+    """
+    if tile_generation() != generation:
+        return
+    path = _tile_path(z, x, y)
+    _atomic_write(path, data)
+    # La invalidación cambia la generación antes de borrar: si cambió entre la
+    # verificación y la escritura, el borrado pudo ocurrir antes que os.replace
+    if tile_generation() != generation:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _lonlat_to_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def invalidate_bounds(*bounds_list: Optional[Bounds]):
+    """Elimina las teselas en caché que intersectan alguno de los rectángulos (lon/lat)"""
+    if not any(bounds_list):
+        return
+    _bump_generation()
+    for bounds in bounds_list:
+        if not bounds:
+            continue
+        min_lon, min_lat, max_lon, max_lat = bounds
+        for z in range(MIN_ZOOM, MAX_ZOOM + 1):
+            zoom_dir = os.path.join(MAP_TILE_CACHE_DIR, str(z))
+            if not os.path.isdir(zoom_dir):
+                continue
+            x0, y0 = _lonlat_to_tile(min_lon, max_lat, z)
+            x1, y1 = _lonlat_to_tile(max_lon, min_lat, z)
+            # Una tesela de margen por el buffer de ST_AsMVTGeom
+            x0, y0, x1, y1 = x0 - 1, y0 - 1, x1 + 1, y1 + 1
+            for x_name in os.listdir(zoom_dir):
+                if not x_name.isdigit() or not x0 <= int(x_name) <= x1:
+                    continue
+                x_dir = os.path.join(zoom_dir, x_name)
+                for file_name in os.listdir(x_dir):
+                    y_name = file_name[:-4]
+                    if file_name.endswith(".mvt") and y_name.isdigit() and y0 <= int(y_name) <= y1:
+                        try:
+                            os.remove(os.path.join(x_dir, file_name))
+                        except FileNotFoundError:
+                            pass
+
+
+def clear_tiles():
+    """Descarta toda la caché (para cambios hechos fuera de los controladores)"""
+    _bump_generation()
+    for name in os.listdir(MAP_TILE_CACHE_DIR):
+        path = os.path.join(MAP_TILE_CACHE_DIR, name)
+        if name.isdigit() and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def entity_bounds(db: Session, model, entity_id: int) -> Optional[Bounds]:
+    """Rectángulo envolvente (lon/lat) de la geometría de un elemento"""
+    geometry_name, pk_name = _GEOMETRY_COLUMNS[model.__tablename__]
+    geometry = getattr(model, geometry_name)
+    row = db.query(
+        func.ST_XMin(geometry), func.ST_YMin(geometry),
+        func.ST_XMax(geometry), func.ST_YMax(geometry)
+    ).filter(getattr(model, pk_name) == entity_id).first()
+    if not row or row[0] is None:
+        return None
+    return tuple(float(value) for value in row)
+
+
+def invalidate_entity_tiles(db: Session, model, entity_id: int, previous_bounds: Optional[Bounds] = None):
+    """Invalida las teselas de la geometría actual y, si se movió, de la anterior"""
+    invalidate_bounds(entity_bounds(db, model, entity_id), previous_bounds)
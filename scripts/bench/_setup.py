@@ -0,0 +1,50 @@
+"""
+Configuración común de los benchmarks de scripts/bench
+Agrega la raíz del repositorio al path y define las variables de entorno que
+la app lee al importarse, para poder correr los scripts sin un .env completo:
+    python scripts/bench/<script>.py ...
+"""
+from contextlib import contextmanager
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", os.getenv("BENCH_DATABASE_URL", "postgresql://localhost/sig_bench"))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+
+def database_url(arg=None):
+    """URL de la base de datos: --database-url, BENCH_DATABASE_URL o DATABASE_URL"""
+    url = arg or os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL")
+    if not url:
+        sys.exit("Falta --database-url (o BENCH_DATABASE_URL)")
+    return url
+
+
+@contextmanager
+def rollback_session(url):
+    """
+    Sesión dentro de una transacción que se revierte al terminar: los commit de
+    los controladores solo liberan un savepoint y la base queda como estaba
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            session = Session(bind=connection, join_transaction_mode="create_savepoint", autoflush=False)
+            try:
+                yield session
+            finally:
+                session.close()
+                transaction.rollback()
+    finally:
+        engine.dispose()
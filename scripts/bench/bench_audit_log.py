@@ -0,0 +1,112 @@
+"""
+Benchmark de la bitácora: INSERT por evento vs escritor por lotes
+
+Sin base de datos: el INSERT se simula con una función que duerme
+--insert-ms (más --row-us por fila), como el viaje a PostgreSQL. C
+"requests" concurrentes en el event loop registran --events eventos en total,
+en tres modos:
+  1. sync: un INSERT por evento dentro de la ruta (create_log de antes)
+  2. batched: AuditLogWriter con la cola de AUDIT_LOG_QUEUE_SIZE
+  3. backpressure: AuditLogWriter con una cola de --small-queue eventos, que
+     se llena y manda las escrituras síncronas al pool de hilos de BD
+Reporta la latencia de create_log dentro de la ruta (p50/p99/max), el
+retraso del event loop medido con un latido y las métricas del escritor.
+
+Uso:
+    python scripts/bench/bench_audit_log.py
+    python scripts/bench/bench_audit_log.py --events 20000 --clients 64 --insert-ms 2
+"""
+import argparse
+import asyncio
+import json
+import queue
+import statistics
+import time
+
+from _setup import ROOT  # noqa: F401  raíz del repositorio en el path
+from bench_login import heartbeat, latency_summary
+
+from app.utils.audit_writer import AuditLogWriter
+
+
+def fake_insert(insert_ms: float, row_us: float):
+    def insert(rows):
+        time.sleep(insert_ms / 1000 + len(rows) * row_us / 1e6)
+    return insert
+
+
+def event_row(n: int) -> dict:
+    return {"user_id": 1, "action": "READ", "entity": None, "entity_id": None,
+            "description": f"evento {n}", "created_at": None}
+
+
+async def run_requests(log, clients: int, events: int, heartbeat_ms: float):
+    latencies = []
+    counter = iter(range(events))
+
+    async def client():
+        for n in counter:
+            start = time.perf_counter()
+            log(event_row(n))
+            latencies.append((time.perf_counter() - start) * 1000)
+            # El resto del request: cede el loop como lo haría una ruta real
+            await asyncio.sleep(0)
+
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, heartbeat_ms / 1000, lags))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    seconds = time.perf_counter() - start
+    # Las escrituras enviadas al pool de BD terminan antes de cerrar el loop
+    while asyncio.all_tasks() - {asyncio.current_task(), beat}:
+        await asyncio.sleep(0.01)
+    stop.set()
+    await beat
+    return seconds, latencies, lags
+
+
+def bench_mode(name, args, insert, writer=None):
+    log = writer.write if writer else (lambda row: insert([row]))
+    seconds, latencies, lags = asyncio.run(run_requests(log, args.clients, args.events, args.heartbeat_ms))
+    result = {
+        "modo": name,
+        "eventos": args.events,
+        "eventos_s": round(args.events / seconds, 1),
+        "create_log": latency_summary(latencies),
+        "retraso_loop": latency_summary(lags),
+    }
+    if writer:
+        writer.stop()
+        metrics = writer.metrics.snapshot()
+        result["escritor"] = {key: metrics[key] for key in ("written", "batches", "avg_batch_size", "sync_writes", "backpressure_events", "failed")}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--insert-ms", type=float, default=1.0, help="costo fijo de cada INSERT (viaje y commit)")
+    parser.add_argument("--row-us", type=float, default=20.0, help="costo por fila de cada INSERT")
+    parser.add_argument("--small-queue", type=int, default=50)
+    parser.add_argument("--heartbeat-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    insert = fake_insert(args.insert_ms, args.row_us)
+    results = [bench_mode("sync", args, insert), bench_mode("batched", args, insert, AuditLogWriter(insert))]
+
+    small = AuditLogWriter(insert)
+    small._queue = queue.Queue(maxsize=args.small_queue)
+    results.append(bench_mode("backpressure", args, insert, small))
+
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    sync, batched = results[0], results[1]
+    print(f"create_log p99: {sync['create_log']['p99_ms']} ms -> {batched['create_log']['p99_ms']} ms; "
+          f"retraso máximo del loop: {sync['retraso_loop']['max_ms']} ms -> {batched['retraso_loop']['max_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
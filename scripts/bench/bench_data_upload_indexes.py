@@ -0,0 +1,143 @@
+"""
+Benchmark de índices de data_upload: carga y búsqueda antes/después de la auditoría
+
+Crea dos copias de la tabla data_upload dentro de una transacción que se
+revierte al final:
+  - legacy: llave primaria + un B-tree por columna (el esquema anterior a
+    la migración data_upload_index_audit)
+  - actual: llave primaria + ix date, ix cologne y los índices trigram de
+    taxpayer y cologne (el esquema del modelo)
+En cada una carga --rows filas con el mismo INSERT ... ON CONFLICT por lotes
+de create_bulk y mide filas/s. Después corre la búsqueda del listado
+(taxpayer ILIKE OR cologne ILIKE OR identifier =) --searches veces y reporta
+la mediana en ms y los nodos del plan (Seq Scan vs Bitmap Index Scan).
+
+Uso:
+    python scripts/bench/bench_data_upload_indexes.py --database-url postgresql://... --rows 50000
+    python scripts/bench/bench_data_upload_indexes.py --rows 200000 --search "Contribuyente 4321"
+"""
+import argparse
+import json
+import statistics
+import time
+
+from _setup import database_url, rollback_session
+
+from sqlalchemy import MetaData, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.controllers.data_upload.data_upload import BULK_UPSERT_BATCH_SIZE, _UPSERT_COLUMNS
+from app.models.data_upload.data_upload import Data_upload
+from bench_data_upload_ingest import synthetic_rows
+
+# Columnas con B-tree antes de data_upload_index_audit (además de la llave primaria)
+LEGACY_BTREE = [
+    "siaf", "municipality", "department", "institutional_classification",
+    "report", "date", "hour", "seriereport", "user", "identifier", "taxpayer",
+    "cologne", "cat_service", "cannon", "excess", "total", "status",
+]
+CURRENT_BTREE = ["date", "cologne"]
+CURRENT_TRGM = ["taxpayer", "cologne"]
+
+
+def create_copy(connection, name, btree, trgm):
+    table = Data_upload.__table__.to_metadata(MetaData(), name=name)
+    table.indexes.clear()
+    table.create(connection)
+    for column in btree:
+        connection.execute(text(f'CREATE INDEX ix_{name}_{column} ON {name} ("{column}")'))
+    for column in trgm:
+        connection.execute(text(f'CREATE INDEX ix_{name}_{column}_trgm ON {name} USING gin ("{column}" gin_trgm_ops)'))
+    return table
+
+
+def upsert_rows(connection, table, rows):
+    """El mismo upsert por lotes de create_bulk, sobre la copia de la tabla"""
+    stmt = pg_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.identifier],
+        set_={
+            **{column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            "updated_at": stmt.excluded.updated_at
+        }
+    ).returning(literal_column("xmax = 0").label("inserted"))
+    for start in range(0, len(rows), BULK_UPSERT_BATCH_SIZE):
+        connection.execute(stmt.values(rows[start:start + BULK_UPSERT_BATCH_SIZE])).scalars().all()
+
+
+def search_query(table, term):
+    pattern = f"%{term}%"
+    return (
+        select(table.c.identifier)
+        .where(or_(table.c.taxpayer.ilike(pattern), table.c.cologne.ilike(pattern), table.c.identifier == term))
+        .order_by(table.c.identifier.desc())
+        .limit(20)
+    )
+
+
+def plan_nodes(plan):
+    nodes = [plan["Node Type"] + (f" ({plan['Index Name']})" if "Index Name" in plan else "")]
+    for child in plan.get("Plans", []):
+        nodes += plan_nodes(child)
+    return nodes
+
+
+def bench_table(connection, name, btree, trgm, rows, term, searches):
+    table = create_copy(connection, name, btree, trgm)
+
+    start = time.perf_counter()
+    upsert_rows(connection, table, rows)
+    load_seconds = time.perf_counter() - start
+    connection.execute(text(f"ANALYZE {name}"))
+
+    query = search_query(table, term)
+    timings = []
+    for _ in range(searches):
+        start = time.perf_counter()
+        connection.execute(query).all()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    compiled = query.compile(connection)
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()[0]["Plan"]
+    return {
+        "esquema": name,
+        "indices": len(btree) + len(trgm) + 1,
+        "filas": len(rows),
+        "carga_s": round(load_seconds, 3),
+        "filas_s": round(len(rows) / load_seconds, 1),
+        "busqueda_p50_ms": round(statistics.median(timings), 2),
+        "plan": plan_nodes(plan),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--search", default="Contribuyente 4321")
+    parser.add_argument("--searches", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    for data in synthetic_rows(args.rows, "BENCH-I-"):
+        row = {column: getattr(data, column) for column in _UPSERT_COLUMNS}
+        row.update(identifier=data.identifier, status=True)
+        rows.append(row)
+
+    with rollback_session(database_url(args.database_url)) as db:
+        connection = db.connection()
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        results = [
+            bench_table(connection, "bench_data_upload_legacy", LEGACY_BTREE, [], rows, args.search, args.searches),
+            bench_table(connection, "bench_data_upload_current", CURRENT_BTREE, CURRENT_TRGM, rows, args.search, args.searches),
+        ]
+
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    legacy, current = results
+    print(f"carga: {current['filas_s'] / legacy['filas_s']:.2f}x filas/s; "
+          f"búsqueda: {legacy['busqueda_p50_ms'] / max(current['busqueda_p50_ms'], 0.001):.1f}x más rápida")
+
+
+if __name__ == "__main__":
+    main()
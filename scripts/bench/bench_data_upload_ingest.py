@@ -0,0 +1,123 @@
+"""
+Benchmark de carga de data_upload: ruta por fila vs upsert por lotes
+
+Genera N filas sintéticas (Data_uploadCreate) y mide, dentro de una
+transacción que se revierte al final:
+  1. legacy: la implementación anterior de create_bulk (un SELECT por fila,
+     un objeto ORM por fila, commit y db.refresh de cada registro), sobre una
+     muestra de --legacy-rows filas porque con 50k tarda minutos
+  2. create_bulk: INSERT ... ON CONFLICT por lotes (filas nuevas)
+  3. create_bulk otra vez con los mismos identifier (todas actualizaciones)
+Reporta filas/s de cada fase y el factor de mejora (filas/s, así la muestra
+más pequeña del legacy es comparable).
+
+Requiere PostgreSQL; si la tabla data_upload no existe se crea dentro de la
+transacción. Los identifier llevan el prefijo BENCH- para no chocar con datos
+reales, y nada queda guardado.
+
+Uso:
+    python scripts/bench/bench_data_upload_ingest.py --database-url postgresql://... --rows 50000
+    python scripts/bench/bench_data_upload_ingest.py --rows 50000 --legacy-rows 50000 --min-speedup 50
+
+Termina con código 1 si la mejora es menor que --min-speedup.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, time as dtime, timedelta
+from types import SimpleNamespace
+
+from _setup import database_url, rollback_session
+
+from app.controllers.data_upload.data_upload import create_bulk
+from app.models.data_upload.data_upload import Data_upload
+from app.schemas.data_upload.data_upload import Data_uploadCreate
+
+CURRENT_USER = SimpleNamespace(id_user=None, user="bench")
+
+
+def synthetic_rows(count: int, prefix: str):
+    base = datetime(2024, 1, 1)
+    return [
+        Data_uploadCreate(
+            siaf="SIAF-BENCH", municipality="Municipio", department="Departamento",
+            institutional_classification=12010101, report="Reporte de cobros",
+            date=base + timedelta(days=n % 365), hour=dtime(8, 30), seriereport="A",
+            user="bench", identifier=f"{prefix}{n:08d}", taxpayer=f"Contribuyente {n}",
+            cologne=f"Colonia {n % 250}", cat_service="Domiciliar",
+            cannon=25.0, excess=float(n % 7), total=25.0 + n % 7
+        )
+        for n in range(count)
+    ]
+
+
+def legacy_create_bulk(db, data_list):
+    """create_bulk antes del upsert por lotes (referencia para el benchmark)"""
+    created_records = []
+    updated_records = []
+    for data in data_list:
+        existing = db.query(Data_upload).filter(Data_upload.identifier == data.identifier).first()
+        if existing:
+            for column, value in data.model_dump(exclude={"identifier", "status"}).items():
+                setattr(existing, column, value)
+            existing.updated_at = datetime.now()
+            updated_records.append(existing)
+            continue
+        new_data_upload = Data_upload(**data.model_dump(), created_at=datetime.now(), updated_at=datetime.now())
+        db.add(new_data_upload)
+        created_records.append(new_data_upload)
+    db.commit()
+    for record in created_records + updated_records:
+        db.refresh(record)
+    return len(created_records), len(updated_records)
+
+
+def timed(name, rows, fn, *args):
+    start = time.perf_counter()
+    created, updated = fn(*args)
+    seconds = time.perf_counter() - start
+    return {
+        "fase": name,
+        "filas": rows,
+        "creadas": created,
+        "actualizadas": updated,
+        "segundos": round(seconds, 3),
+        "filas_s": round(rows / seconds, 1) if seconds else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--legacy-rows", type=int, default=2_000, help="filas para la ruta legacy (0 la omite)")
+    parser.add_argument("--min-speedup", type=float, default=0.0)
+    args = parser.parse_args()
+
+    results = []
+    with rollback_session(database_url(args.database_url)) as db:
+        Data_upload.__table__.create(db.connection(), checkfirst=True)
+
+        if args.legacy_rows:
+            legacy = synthetic_rows(args.legacy_rows, "BENCH-L-")
+            results.append(timed("legacy", len(legacy), legacy_create_bulk, db, legacy))
+            db.expunge_all()
+
+        rows = synthetic_rows(args.rows, "BENCH-B-")
+        results.append(timed("create_bulk (insert)", len(rows), create_bulk, db, rows, CURRENT_USER, False))
+        results.append(timed("create_bulk (update)", len(rows), create_bulk, db, rows, CURRENT_USER, False))
+
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+
+    if args.legacy_rows:
+        speedup = results[1]["filas_s"] / results[0]["filas_s"]
+        print(f"mejora create_bulk vs legacy: {speedup:.1f}x")
+        if speedup < args.min_speedup:
+            print(f"FALLA: mejora menor que {args.min_speedup}x", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark de inicio de sesión: bcrypt en el event loop vs en su pool
+
+Sin base de datos: C clientes concurrentes verifican la misma contraseña
+--logins veces en total, en dos modos:
+  1. inline: pwd_context.verify_and_update dentro de la corrutina (como
+     antes, bloquea el event loop durante cada hash)
+  2. pool: verify_and_update_password_async (pool de BCRYPT_MAX_WORKERS hilos)
+Mientras tanto un latido duerme --heartbeat-ms en bucle; el retraso de cada
+latido es cuánto tiempo estuvo bloqueado el event loop (lo que esperaría
+cualquier otro request del worker). Reporta logins/s y el retraso p50/p99/max.
+BCRYPT_ROUNDS se toma de --rounds antes de importar app.utils.auth.
+
+Con --base-url hace POST /auth/token contra un servidor en ejecución con C
+clientes concurrentes y reporta logins/s y latencia p50/p99.
+
+Uso:
+    python scripts/bench/bench_login.py --rounds 12 --clients 16 --logins 64
+    python scripts/bench/bench_login.py --base-url http://127.0.0.1:8000/api/v1 --user admin@example.com --password secreto
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from _setup import ROOT  # noqa: F401  raíz del repositorio en el path
+from load_event_loop import percentile
+
+
+def latency_summary(samples):
+    return {
+        "p50_ms": round(statistics.median(samples), 2) if samples else 0.0,
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2) if samples else 0.0,
+    }
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_logins(verify, clients: int, logins: int, heartbeat_ms: float):
+    queue = asyncio.Queue()
+    for _ in range(logins):
+        queue.put_nowait(None)
+
+    async def client():
+        while not queue.empty():
+            queue.get_nowait()
+            valid, _ = await verify()
+            assert valid
+
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, heartbeat_ms / 1000, lags))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await beat
+    return seconds, lags
+
+
+def bench_local(args):
+    # app.utils.auth lee BCRYPT_ROUNDS al importarse
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    from app.utils.auth import BCRYPT_MAX_WORKERS, pwd_context, verify_and_update_password_async
+
+    password = "bench-password"
+    hashed = pwd_context.hash(password)
+
+    async def inline():
+        return pwd_context.verify_and_update(password, hashed)
+
+    async def pool():
+        return await verify_and_update_password_async(password, hashed)
+
+    for mode, verify in (("inline", inline), ("pool", pool)):
+        seconds, lags = asyncio.run(run_logins(verify, args.clients, args.logins, args.heartbeat_ms))
+        print(json.dumps({
+            "modo": mode,
+            "rounds": args.rounds,
+            "workers": BCRYPT_MAX_WORKERS if mode == "pool" else 1,
+            "clientes": args.clients,
+            "logins": args.logins,
+            "logins_s": round(args.logins / seconds, 2),
+            "retraso_loop": latency_summary(lags),
+        }, ensure_ascii=False))
+
+
+async def bench_server(args):
+    import httpx
+
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(args.logins):
+        queue.put_nowait(None)
+
+    async def client(http: httpx.AsyncClient):
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await http.post("/auth/token", data={"username": args.user, "password": args.password})
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(args.clients)))
+        seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "servidor": args.base_url,
+        "clientes": args.clients,
+        "logins": args.logins,
+        "logins_s": round(args.logins / seconds, 2),
+        **latency_summary(latencies),
+    }, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=int(os.getenv("BCRYPT_ROUNDS", "12")))
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--heartbeat-ms", type=float, default=5.0)
+    parser.add_argument("--base-url", help="servidor en ejecución, p. ej. http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    if args.base_url:
+        if not (args.user and args.password):
+            parser.error("--base-url requiere --user y --password")
+        asyncio.run(bench_server(args))
+    else:
+        bench_local(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de la verificación de permisos: recorrido de rol.permissions vs bitset
+
+Arma un principal como el de la caché (rol con --permissions permisos y
+permission_mask compilada) y mide, sin base de datos:
+  1. walk: buscar el nombre recorriendo rol.permissions (O(n), lo que hacía
+     cada endpoint antes de require_permission)
+  2. mask: permission_mask & bit
+  3. require_permission: await de la dependencia real
+  4. compile_role: compilar la máscara (una vez por principal cargado)
+El permiso buscado es el último del rol (peor caso del recorrido).
+Con --requests N también mide el costo por request con TestClient en una app
+mínima con dos rutas: una con require_permission y otra con el recorrido,
+sobrescribiendo get_current_active_user para devolver el principal.
+
+Uso:
+    python scripts/bench/bench_permissions.py
+    python scripts/bench/bench_permissions.py --permissions 200 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+import timeit
+from types import SimpleNamespace
+
+from _setup import ROOT  # noqa: F401  raíz del repositorio en el path
+
+from fastapi import Depends, FastAPI, HTTPException
+
+from app.controllers.auth.auth_controller import get_current_active_user, require_permission
+from app.utils.permissions import permission_registry
+
+
+def build_principal(count: int):
+    permissions = [SimpleNamespace(name=f"bench_permiso_{n}", active=True) for n in range(count)]
+    rol = SimpleNamespace(name="Bench", active=True, permissions=permissions)
+    return SimpleNamespace(
+        id_user=1, user="bench", active=True, rol=rol,
+        permission_mask=permission_registry.compile_role(rol)
+    )
+
+
+def has_permission_walk(user, name: str) -> bool:
+    return bool(user.rol) and any(perm.name == name and perm.active for perm in user.rol.permissions)
+
+
+def per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def bench_dependency(dependency, user, number: int) -> float:
+    async def run():
+        start = time.perf_counter()
+        for _ in range(number):
+            await dependency(current_user=user)
+        return time.perf_counter() - start
+    return min(asyncio.run(run()) for _ in range(5)) / number * 1e6
+
+
+def bench_requests(user, name: str, requests: int):
+    from fastapi.testclient import TestClient
+
+    async def walk_dependency(current_user=Depends(get_current_active_user)):
+        if not has_permission_walk(current_user, name):
+            raise HTTPException(status_code=403, detail=f"No tiene el permiso requerido: {name}")
+        return current_user
+
+    app = FastAPI()
+
+    @app.get("/mask")
+    async def mask_route(current_user=Depends(require_permission(name))):
+        return {"ok": True}
+
+    @app.get("/walk")
+    async def walk_route(current_user=Depends(walk_dependency)):
+        return {"ok": True}
+
+    async def principal():
+        return user
+
+    # async en ambas rutas: ninguna dependencia pasa por el threadpool
+    app.dependency_overrides[get_current_active_user] = principal
+    results = {}
+    with TestClient(app) as client:
+        for path in ("/walk", "/mask"):
+            for _ in range(min(100, requests)):
+                client.get(path).raise_for_status()
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.get(path).raise_for_status()
+            results[path] = (time.perf_counter() - start) / requests * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--permissions", type=int, default=60)
+    parser.add_argument("--number", type=int, default=100_000, help="llamadas por medición")
+    parser.add_argument("--requests", type=int, default=0, help="requests por ruta con TestClient (0 lo omite)")
+    args = parser.parse_args()
+
+    user = build_principal(args.permissions)
+    name = user.rol.permissions[-1].name
+    bit = permission_registry.bit(name)
+    dependency = require_permission(name)
+
+    results = {
+        "permisos": args.permissions,
+        "walk_us": per_call_us(lambda: has_permission_walk(user, name), args.number),
+        "mask_us": per_call_us(lambda: bool(user.permission_mask & bit), args.number),
+        "require_permission_us": bench_dependency(dependency, user, args.number),
+        "compile_role_us": per_call_us(lambda: permission_registry.compile_role(user.rol), max(1, args.number // 10)),
+    }
+    if args.requests:
+        per_request = bench_requests(user, name, args.requests)
+        results["request_walk_us"] = per_request["/walk"]
+        results["request_mask_us"] = per_request["/mask"]
+
+    print(json.dumps({key: round(value, 3) if isinstance(value, float) else value for key, value in results.items()}, ensure_ascii=False))
+    print(f"mask vs walk: {results['walk_us'] / results['mask_us']:.1f}x más rápido por verificación")
+
+
+if __name__ == "__main__":
+    main()
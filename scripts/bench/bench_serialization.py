@@ -0,0 +1,118 @@
+"""
+Benchmark de serialización de listados: pydantic + JSONResponse vs ORJSONResponse
+
+Arma una página de --items filas como las entregan los controladores de
+pipes y data_upload y mide, sin base de datos, el tiempo de producir el
+cuerpo de la respuesta:
+  1. antes: Schema.model_validate(fila).model_dump(mode="json") por fila y
+     el sobre con fastapi.responses.JSONResponse (data_upload valida objetos
+     ORM, como hacía el controlador)
+  2. después: las filas tal cual en el sobre de success_response (ORJSONResponse)
+Reporta el mejor de --repeat ejecuciones en ms y verifica que ambos cuerpos
+sean el mismo JSON.
+
+Uso:
+    python scripts/bench/bench_serialization.py
+    python scripts/bench/bench_serialization.py --items 50000 --repeat 3
+"""
+import argparse
+import json
+import time
+from datetime import datetime, time as dtime, timedelta
+from decimal import Decimal
+
+from _setup import ROOT  # noqa: F401  raíz del repositorio en el path
+
+from fastapi.responses import JSONResponse
+
+from app.controllers.data_upload.data_upload import RESPONSE_FIELDS
+from app.models.data_upload.data_upload import Data_upload
+from app.schemas.data_upload.data_upload import Data_uploadResponse
+from app.schemas.pipes.pipes import PipesResponse
+from app.utils.response import success_response
+
+
+def pipe_rows(count: int):
+    base = datetime(2024, 1, 1, 8, 30)
+    return [
+        {
+            "id_pipes": n, "material": "PVC", "diameter": Decimal("2.500000"), "active": True,
+            "size": Decimal("6.000000"), "installation_date": base + timedelta(days=n % 365),
+            "coordinates": [[-90.5 + n * 1e-5, 14.6], [-90.49 + n * 1e-5, 14.61]],
+            "distance": Decimal("152.340000"), "sector_id": n % 20 + 1, "observations": None,
+            "created_at": base, "updated_at": base,
+            "tanks": [{"id_tank": n % 10 + 1, "name": f"Tanque {n % 10 + 1}"}],
+            "start_connection_id": None, "end_connection_id": None,
+        }
+        for n in range(count)
+    ]
+
+
+def data_upload_rows(count: int):
+    base = datetime(2024, 1, 1)
+    rows = [
+        {
+            "siaf": "SIAF", "municipality": "Municipio", "department": "Departamento",
+            "institutional_classification": 12010101, "report": "Reporte de cobros",
+            "date": base + timedelta(days=n % 365), "hour": dtime(8, 30), "seriereport": "A",
+            "user": "bench", "identifier": f"ID-{n:08d}", "taxpayer": f"Contribuyente {n}",
+            "cologne": f"Colonia {n % 250}", "cat_service": "Domiciliar",
+            "cannon": 25.0, "excess": float(n % 7), "total": 25.0 + n % 7, "status": True,
+            "created_at": base, "updated_at": base,
+        }
+        for n in range(count)
+    ]
+    # El controlador entrega dicts con estos campos; antes entregaba objetos ORM
+    return [{field: row[field] for field in RESPONSE_FIELDS} for row in rows], [Data_upload(**row) for row in rows]
+
+
+def before(schema, items):
+    data = [schema.model_validate(item).model_dump(mode="json") for item in items]
+    return JSONResponse(content={"status": "success", "message": "OK", "data": data}).body
+
+
+def after(items):
+    return success_response(items).body
+
+
+def best_ms(fn, *args, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), body
+
+
+def compare(name, schema, before_items, after_items, repeat):
+    before_ms, before_body = best_ms(before, schema, before_items, repeat=repeat)
+    after_ms, after_body = best_ms(after, after_items, repeat=repeat)
+    return {
+        "listado": name,
+        "filas": len(after_items),
+        "antes_ms": round(before_ms, 1),
+        "despues_ms": round(after_ms, 1),
+        "mejora": round(before_ms / after_ms, 1),
+        "bytes": len(after_body),
+        "mismo_json": json.loads(before_body) == json.loads(after_body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pipes = pipe_rows(args.items)
+    uploads, upload_models = data_upload_rows(args.items)
+    results = [
+        compare("pipes", PipesResponse, pipes, pipes, args.repeat),
+        compare("data_upload", Data_uploadResponse, upload_models, uploads, args.repeat),
+    ]
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
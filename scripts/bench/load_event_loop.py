@@ -0,0 +1,118 @@
+"""
+Prueba de carga: latencia de /auth/me mientras corren reportes pesados
+
+Mide p50/p95/p99 de GET /api/v1/auth/me en dos fases contra un servidor en
+ejecución:
+  1. base: solo peticiones a /auth/me
+  2. carga: las mismas peticiones mientras N clientes piden en bucle
+     /report/sectors/comparative
+Si los controladores síncronos bloquearan el event loop, el p99 de la fase
+con carga crecería con la duración del reporte. Con run_in_db_thread debe
+mantenerse plano.
+
+Uso:
+    uvicorn main:app --workers 1 &
+    python scripts/bench/load_event_loop.py --user admin@example.com --password secreto
+    python scripts/bench/load_event_loop.py --token <JWT> --report-clients 8 --duration 30
+
+Termina con código 1 si p99(carga) > --max-ratio * p99(base).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summary(name, samples):
+    return {
+        "fase": name,
+        "peticiones": len(samples),
+        "p50_ms": round(statistics.median(samples), 2) if samples else 0.0,
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2) if samples else 0.0,
+    }
+
+
+async def login(client: httpx.AsyncClient, user: str, password: str) -> str:
+    response = await client.post("/auth/token", data={"username": user, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def probe_me(client, headers, stop: asyncio.Event, samples: list, interval: float):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/auth/me", headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+
+
+async def hammer_report(client, headers, stop: asyncio.Event, counter: list):
+    while not stop.is_set():
+        response = await client.get("/report/sectors/comparative", headers=headers)
+        response.raise_for_status()
+        counter.append(1)
+
+
+async def run_phase(client, headers, duration, probes, interval, report_clients):
+    stop = asyncio.Event()
+    samples, reports = [], []
+    tasks = [asyncio.create_task(probe_me(client, headers, stop, samples, interval)) for _ in range(probes)]
+    tasks += [asyncio.create_task(hammer_report(client, headers, stop, reports)) for _ in range(report_clients)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples, len(reports)
+
+
+async def main(args) -> int:
+    limits = httpx.Limits(max_connections=args.probes + args.report_clients + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        token = args.token or await login(client, args.user, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # Calentamiento: caché de principal, pool de conexiones, planes de consulta
+        await run_phase(client, headers, 2, args.probes, args.interval, 0)
+
+        base, _ = await run_phase(client, headers, args.duration, args.probes, args.interval, 0)
+        loaded, reports = await run_phase(client, headers, args.duration, args.probes, args.interval, args.report_clients)
+
+    rows = [summary("base", base), summary(f"carga ({args.report_clients} clientes de reporte)", loaded)]
+    for row in rows:
+        print(" | ".join(f"{key}={value}" for key, value in row.items()))
+    print(f"reportes completados durante la carga: {reports}")
+
+    ratio = rows[1]["p99_ms"] / rows[0]["p99_ms"] if rows[0]["p99_ms"] else float("inf")
+    print(f"p99 carga / p99 base = {ratio:.2f} (máximo permitido {args.max_ratio})")
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--user", help="email o usuario para /auth/token")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="access token ya emitido (en lugar de --user/--password)")
+    parser.add_argument("--duration", type=float, default=15.0, help="segundos por fase")
+    parser.add_argument("--probes", type=int, default=4, help="clientes concurrentes de /auth/me")
+    parser.add_argument("--interval", type=float, default=0.05, help="pausa entre peticiones de cada cliente de /auth/me")
+    parser.add_argument("--report-clients", type=int, default=4, help="clientes concurrentes del reporte comparativo")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+    if not args.token and not (args.user and args.password):
+        parser.error("se requiere --token o --user y --password")
+    sys.exit(asyncio.run(main(args)))
@@ -25,6 +25,7 @@ from app.models.files.files import Files
 from app.models.pipes.pipe_connections import pipe_connections
 from app.models.tanks.tanks_pipes import tank_pipes
 from app.utils.auth import get_password_hash
+from app.utils.tile_cache import clear_tiles
 
 
 # ========== CONFIGURACIÓN ==========
@@ -474,6 +475,8 @@ def main():
         
         # Commit
         db.commit()
+        # Las teselas del mapa en caché ya no corresponden a la red sembrada
+        clear_tiles()
         
         print("\n" + "="*70)
         print("✅ PROCESO COMPLETADO EXITOSAMENTE")
@@ -0,0 +1,132 @@
+"""
+Datos de prueba para las pruebas de conteo de consultas
+Cada llamada a NetworkSeeder.add_sector() agrega un sector completo: un tanque,
+dos tuberías, dos conexiones, intervenciones sobre cada entidad y un empleado
+de cada tipo con asignaciones. Las pruebas miden una vez, agregan sectores y
+vuelven a medir: el número de consultas no debe cambiar.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from geoalchemy2 import WKTElement
+
+from app.models.assignments.assignments import Assignment
+from app.models.connection.connections import Connection
+from app.models.employee.employee import Employee
+from app.models.intervention_entities.intervention_entities import Intervention_entities
+from app.models.interventions.interventions import Interventions
+from app.models.pipes.pipes import Pipes
+from app.models.sector.sector import Sector
+from app.models.tanks.tanks import Tank
+from app.models.type_employee.type_employees import TypeEmployee
+
+EMPLOYEE_TYPES = ("Fontanero", "Operador", "Lector", "Encargado de limpieza")
+
+DATE_START = "2000-01-01"
+DATE_FINISH = "2100-01-01"
+
+
+def point(lon: float, lat: float) -> WKTElement:
+    return WKTElement(f"POINT({lon} {lat})", srid=4326)
+
+
+def line(start, end) -> WKTElement:
+    return WKTElement(f"LINESTRING({start[0]} {start[1]}, {end[0]} {end[1]})", srid=4326)
+
+
+@dataclass
+class SeededSector:
+    sector_id: int
+    tank_id: int
+    pipe_ids: List[int]
+    connection_ids: List[int]
+    employee_ids: dict
+
+
+@dataclass
+class NetworkSeeder:
+    db: object
+    sectors: List[SeededSector] = field(default_factory=list)
+    _types: dict = field(default_factory=dict)
+
+    def _employee_type(self, name: str) -> TypeEmployee:
+        if name not in self._types:
+            type_employee = TypeEmployee(name=name, description=name)
+            self.db.add(type_employee)
+            self._types[name] = type_employee
+        return self._types[name]
+
+    def add_tank(self, name: str, sector_id=None) -> int:
+        tank = Tank(name=name, coordinates=point(-90.5, 14.6), photography=[], sector_id=sector_id)
+        self.db.add(tank)
+        self.db.flush()
+        return tank.id_tank
+
+    def add_sector(self) -> SeededSector:
+        index = len(self.sectors) + 1
+        base_lon, base_lat = -90.5 + index * 0.01, 14.6
+
+        sector = Sector(name=f"Sector {index}")
+        tank = Tank(name=f"Tanque {index}", coordinates=point(base_lon, base_lat), photography=[], sector=sector)
+        connections = [
+            Connection(
+                coordenates=point(base_lon + offset, base_lat + offset),
+                material="PVC", diameter_mn=2, connection_type="Domiciliar",
+                installed_date=datetime(2020, 1, 1), sector=sector
+            )
+            for offset in (0.001, 0.002)
+        ]
+        start = (base_lon, base_lat)
+        pipes = []
+        for connection, offset in zip(connections, (0.001, 0.002)):
+            end = (base_lon + offset, base_lat + offset)
+            pipe = Pipes(
+                material="PVC", diameter=2, size=6, coordinates=line(start, end),
+                distance=100, sector=sector, installation_date=datetime(2020, 1, 1)
+            )
+            pipe.tanks.append(tank)
+            pipe.connections.append(connection)
+            pipes.append(pipe)
+            start = end
+
+        employees = {}
+        for type_name in EMPLOYEE_TYPES:
+            employees[type_name] = Employee(
+                first_name=type_name, last_name=str(index), phone_number="0000",
+                type_employee=self._employee_type(type_name)
+            )
+
+        self.db.add_all([sector, tank, *connections, *pipes, *employees.values()])
+
+        # Dos intervenciones por entidad, con asignaciones para cada tipo de empleado
+        created_at = datetime.utcnow() - timedelta(days=1)
+        entities = [{"tank": tank}] + [{"pipe": pipe} for pipe in pipes] + [{"connection": conn} for conn in connections]
+        for entity in entities:
+            for _ in range(2):
+                intervention = Interventions(
+                    description=f"Mantenimiento {index}", status="SIN INICIAR", photography=[],
+                    start_date=created_at, end_date=created_at + timedelta(hours=2), created_at=created_at
+                )
+                self.db.add(intervention)
+                self.db.add(Intervention_entities(intervention=intervention, created_at=created_at, **entity))
+                for employee in employees.values():
+                    self.db.add(Assignment(
+                        employee=employee, intervention=intervention,
+                        assigned_at=created_at, status="ASIGNADO"
+                    ))
+
+        self.db.flush()
+        seeded = SeededSector(
+            sector_id=sector.id_sector,
+            tank_id=tank.id_tank,
+            pipe_ids=[pipe.id_pipes for pipe in pipes],
+            connection_ids=[conn.id_connection for conn in connections],
+            employee_ids={name: employee.id_employee for name, employee in employees.items()}
+        )
+        self.sectors.append(seeded)
+        return seeded
+
+    def grow(self, sectors: int = 3):
+        for _ in range(sectors):
+            self.add_sector()
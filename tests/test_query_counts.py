@@ -0,0 +1,100 @@
+"""
+Regresión de consultas por fila (N+1) en los endpoints con geometrías
+Cada prueba mide un controlador, agrega filas y vuelve a medir: el número de
+sentencias debe ser el mismo sin importar cuántas filas devuelva.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.controllers.Report.report import report_deviations, report_tank_status, report_tanks
+from app.controllers.map.map import get_all_tank_with_pipes_and_connections, get_interventions_in_range
+from app.controllers.pipes import pipes
+from app.models.tanks.tanks_pipes import tank_pipes
+from app.schemas.pipes.pipes import PipesResponseCreate, PipesUpdate
+
+CURRENT_USER = SimpleNamespace(id_user=1, user="pruebas")
+
+
+def assert_constant(small, large):
+    assert large.count == small.count, f"antes: {small!r}\n\ndespués: {large!r}"
+
+
+def test_map_tanks_with_pipes_and_connections(seeder, measure, db):
+    seeder.add_sector()
+    small = measure(get_all_tank_with_pipes_and_connections, db)
+    seeder.grow()
+    large = measure(get_all_tank_with_pipes_and_connections, db)
+    assert_constant(small, large)
+
+
+def test_map_interventions_in_range(seeder, measure, db):
+    start, end = datetime(2000, 1, 1), datetime(2100, 1, 1)
+    seeder.add_sector()
+    small = measure(get_interventions_in_range, db, start, end)
+    seeder.grow()
+    large = measure(get_interventions_in_range, db, start, end)
+    assert_constant(small, large)
+
+
+def test_pipe_get_by_id(seeder, measure, db):
+    pipe_id = seeder.add_sector().pipe_ids[0]
+    small = measure(pipes.get_by_id, db, pipe_id)
+
+    tank_ids = [seeder.add_tank(f"Tanque extra {n}") for n in range(3)]
+    db.execute(tank_pipes.insert(), [{"tank_id": tank_id, "pipe_id": pipe_id} for tank_id in tank_ids])
+    large = measure(pipes.get_by_id, db, pipe_id)
+    assert_constant(small, large)
+
+
+def _pipe_payload(sector, tank_ids):
+    return PipesResponseCreate(
+        material="PVC", diameter=2, size=6, installation_date=datetime(2024, 1, 1),
+        coordinates=[(-90.5, 14.6), (-90.49, 14.61)], sector_id=sector.sector_id,
+        tank_ids=tank_ids, start_connection_id=sector.connection_ids[0], end_connection_id=sector.connection_ids[1]
+    )
+
+
+def test_pipe_create(seeder, measure):
+    sector = seeder.add_sector()
+    tank_ids = [seeder.add_tank(f"Tanque extra {n}") for n in range(3)]
+    small = measure(pipes.create, seeder.db, _pipe_payload(sector, [sector.tank_id]), CURRENT_USER)
+    large = measure(pipes.create, seeder.db, _pipe_payload(sector, [sector.tank_id, *tank_ids]), CURRENT_USER)
+    assert_constant(small, large)
+
+
+def test_pipe_update(seeder, measure):
+    sector = seeder.add_sector()
+    tank_ids = [seeder.add_tank(f"Tanque extra {n}") for n in range(3)]
+    pipe_id = sector.pipe_ids[0]
+
+    def update(ids):
+        data = PipesUpdate(tank_ids=ids, start_connection_id=sector.connection_ids[0])
+        return pipes.update(seeder.db, pipe_id, data, CURRENT_USER)
+
+    small = measure(update, [sector.tank_id])
+    large = measure(update, [sector.tank_id, *tank_ids])
+    assert_constant(small, large)
+
+
+def test_report_tanks(seeder, measure, db):
+    seeder.add_sector()
+    small = measure(report_tanks, db)
+    seeder.grow()
+    large = measure(report_tanks, db)
+    assert_constant(small, large)
+
+
+def test_report_tank_status(seeder, measure, db):
+    seeder.add_sector()
+    small = measure(report_tank_status, db)
+    seeder.grow()
+    large = measure(report_tank_status, db)
+    assert_constant(small, large)
+
+
+def test_report_deviations(seeder, measure, db):
+    seeder.add_sector()
+    small = measure(report_deviations, db)
+    seeder.grow()
+    large = measure(report_deviations, db)
+    assert_constant(small, large)
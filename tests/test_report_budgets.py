@@ -0,0 +1,47 @@
+"""
+Presupuesto de consultas por reporte (app/controllers/Report/report.py)
+Cada reporte usa un número fijo de sentencias: se verifica el número exacto
+con un sector sembrado y otra vez después de agregar más sectores.
+"""
+import pytest
+
+from app.controllers.Report import report
+from tests.seed import DATE_FINISH, DATE_START
+
+RANGE = (DATE_START, DATE_FINISH)
+
+# (reporte, llamada con la sesión y el primer sector sembrado, sentencias)
+REPORT_BUDGETS = [
+    ("pipes_by_sector", lambda db, s: report.report_pipes_by_sector(db, s.sector_id), 2),
+    ("interventions_by_pipes", lambda db, s: report.report_interventions_by_pipes(db, s.pipe_ids[0], *RANGE), 2),
+    ("interventions_by_connections", lambda db, s: report.report_interventions_by_connections(db, s.connection_ids[0], *RANGE), 2),
+    ("sector_comparative", lambda db, s: report.report_sector_comparative(db), 1),
+    ("interventions", lambda db, s: report.report_interventions(db, *RANGE), 1),
+    ("interventions_by_sector", lambda db, s: report.report_interventions_by_sector(db, *RANGE), 3),
+    ("intervention_frequency", lambda db, s: report.report_intervention_frequency(db, *RANGE), 1),
+    ("tanks", lambda db, s: report.report_tanks(db), 1),
+    ("tank_status", lambda db, s: report.report_tank_status(db), 1),
+    ("deviations", lambda db, s: report.report_deviations(db), 1),
+    ("assigned_jobs", lambda db, s: report.report_assigned_jobs(db, *RANGE), 1),
+    ("assigned_jobs_by_status", lambda db, s: report.report_assigned_jobs_by_status(db, *RANGE), 1),
+    ("plumber", lambda db, s: report.report_plumber(db, s.employee_ids["Fontanero"], *RANGE), 2),
+    ("top_plumbers", lambda db, s: report.report_top_plumbers(db, *RANGE), 1),
+    ("operator", lambda db, s: report.report_operator(db, s.employee_ids["Operador"], *RANGE), 2),
+    ("top_operators", lambda db, s: report.report_top_operators(db, *RANGE), 1),
+    ("readers", lambda db, s: report.report_readers(db, *RANGE), 1),
+    ("top_readers", lambda db, s: report.report_top_readers(db, *RANGE), 1),
+    ("encargados_limpieza", lambda db, s: report.report_encargados_limpieza(db), 2),
+    ("top_cleaners", lambda db, s: report.report_top_cleaners(db, *RANGE), 1),
+]
+
+
+@pytest.mark.parametrize("call, budget", [(call, budget) for _, call, budget in REPORT_BUDGETS],
+                         ids=[name for name, _, _ in REPORT_BUDGETS])
+def test_report_query_budget(seeder, measure, db, call, budget):
+    first = seeder.add_sector()
+    small = measure(call, db, first)
+    assert small.count == budget, repr(small)
+
+    seeder.grow()
+    large = measure(call, db, first)
+    assert large.count == budget, repr(large)